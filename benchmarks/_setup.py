@@ -0,0 +1,47 @@
+"""基准脚本的公共引导，各脚本在导入 core 之前先导入本模块
+
+- 把仓库根目录加入 sys.path，直接 python benchmarks/bench_xxx.py 即可运行
+- AstrBot 未安装时用最小桩模块替代其 logger / 配置，仅用于加载被测模块；
+  警告和错误照常打印，基准中途出错时能看到原因
+- 关闭 tqdm 进度条，不干扰基准输出
+"""
+
+import os
+import sys
+import types
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _stub_astrbot() -> None:
+    if "astrbot" in sys.modules:
+        return
+    logger = SimpleNamespace(
+        debug=lambda *a, **k: None,
+        info=lambda *a, **k: None,
+        warning=print,
+        error=print,
+        exception=print,
+    )
+    astrbot_pkg = types.ModuleType("astrbot")
+    astrbot_pkg.__path__ = []
+    api_module = types.ModuleType("astrbot.api")
+    api_module.logger = logger
+    config_module = types.ModuleType("core.config")
+    config_module.PluginConfig = object
+    config_module.ParserItem = object
+    sys.modules.update(
+        {
+            "astrbot": astrbot_pkg,
+            "astrbot.api": api_module,
+            "core.config": config_module,
+        }
+    )
+
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+os.environ.setdefault("TQDM_DISABLE", "1")
+_stub_astrbot()
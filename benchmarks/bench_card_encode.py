@@ -0,0 +1,166 @@
+"""卡片编码基准
+
+用渲染器排版绘制几类典型卡片，比较各编码方式的耗时与体积：
+- bilibili: 视频卡片，大封面 + 简介
+- weibo:    正文 + 九宫格 + 带图转发
+- xhs:      标题 + 正文 + 6 张竖图
+- zhihu:    纯文字长回答
+
+照片用平滑渐变叠加噪点合成，压缩特性接近真实照片（纯色图会让 PNG 显得过好）。
+"auto" 行为 CardEncoder 按照片面积占比实际选中的格式。
+
+AstrBot 未安装时用最小桩模块替代其 logger / 配置，仅用于加载渲染器。
+
+用法: python benchmarks/bench_card_encode.py
+"""
+
+import asyncio
+import tempfile
+import timeit
+from functools import partial
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+
+import _setup  # noqa: F401
+from PIL import Image, ImageFilter
+
+from core.data import (
+    Author,
+    ImageContent,
+    ParseResult,
+    Platform,
+    VideoContent,
+)
+from core.encode import CardEncoder
+from core.render import Renderer
+
+TEXT = "这是一段用于基准测试的正文内容，mixed with some latin words。"
+
+
+class _NullIndex:
+    def record(self, path: Path, url: str | None = None) -> None:
+        pass
+
+    def touch(self, path: Path) -> None:
+        pass
+
+
+def make_photo(path: Path, size: tuple[int, int], seed: int) -> Path:
+    r = Image.linear_gradient("L").resize(size).rotate(seed * 40)
+    g = Image.radial_gradient("L").resize(size)
+    b = Image.effect_noise(size, 60).filter(ImageFilter.GaussianBlur(8))
+    img = Image.merge("RGB", (r, g, b))
+    grain = Image.effect_noise(size, 12).convert("RGB")
+    Image.blend(img, grain, 0.15).save(path, quality=92)
+    return path
+
+
+def make_cards(src: Path) -> dict[str, ParseResult]:
+    avatar = make_photo(src / "avatar.jpg", (200, 200), 0)
+    land = [make_photo(src / f"l{i}.jpg", (1600, 1200), i) for i in range(9)]
+    port = [make_photo(src / f"p{i}.jpg", (1080, 1440), i) for i in range(6)]
+    return {
+        "bilibili": ParseResult(
+            platform=Platform("bilibili", "哔哩哔哩"),
+            author=Author("UP主", avatar),
+            title="【基准】一个视频标题 video title",
+            text=TEXT * 3,
+            timestamp=1700000000,
+            contents=[VideoContent(src / "video.mp4", cover=land[0])],
+            extra={"info": "播放 1.2万 · 弹幕 300"},
+        ),
+        "weibo": ParseResult(
+            platform=Platform("weibo", "微博"),
+            author=Author("博主", avatar),
+            text=TEXT * 4,
+            timestamp=1700000000,
+            contents=[ImageContent(p) for p in land],
+            repost=ParseResult(
+                platform=Platform("weibo", "微博"),
+                author=Author("原博主", avatar),
+                text=TEXT * 2,
+                contents=[ImageContent(p) for p in land[:3]],
+            ),
+        ),
+        "xhs": ParseResult(
+            platform=Platform("xiaohongshu", "小红书"),
+            author=Author("薯名", avatar),
+            title="周末探店笔记",
+            text=TEXT * 6,
+            timestamp=1700000000,
+            contents=[ImageContent(p) for p in port],
+        ),
+        "zhihu": ParseResult(
+            platform=Platform("zhihu", "知乎"),
+            author=Author("答主", avatar),
+            title="如何评价某个问题？",
+            text=(TEXT * 12 + "\n") * 8,
+            timestamp=1700000000,
+        ),
+    }
+
+
+def png(level: int, optimize: bool = False):
+    def save(img: Image.Image) -> bytes:
+        buf = BytesIO()
+        img.save(buf, format="PNG", compress_level=level, optimize=optimize)
+        return buf.getvalue()
+
+    return save
+
+
+def encoder(fmt: str):
+    enc = CardEncoder(fmt)
+    return lambda img: enc.encode(img)[0]
+
+
+METHODS = {
+    "png (旧: level 6)": png(6),
+    "png level 9 optimize": png(9, optimize=True),
+    "png level 3 (新)": encoder("png"),
+    "png level 1": png(1),
+    "png8": encoder("png8"),
+    "jpeg q90 4:4:4": encoder("jpeg"),
+    "webp q88 m3": encoder("webp"),
+}
+
+
+async def render(renderer: Renderer, result: ParseResult):
+    width = renderer.DEFAULT_CARD_WIDTH - 2 * renderer.PADDING
+    media = await renderer._prepare_media(result, width)
+    img = renderer._create_card_image(result, media, {})
+    return img, renderer._photo_area(media) / (img.width * img.height)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp)
+        Renderer.load_resources()
+        cfg = SimpleNamespace(
+            emoji_cdn="",
+            emoji_style="FACEBOOK",
+            cache_dir=src,
+            emoji_atlas_dir=src / "emoji_atlas",
+            render_workers=1,
+            render_queue_size=4,
+            card_cache_bytes=0,
+            card_format="auto",
+            card_png_compress_level=3,
+        )
+        renderer = Renderer(cfg, _NullIndex())  # type: ignore[arg-type]
+        for name, result in make_cards(src).items():
+            img, ratio = asyncio.run(render(renderer, result))
+            print(
+                f"{name} {img.width}x{img.height} 照片占比 {ratio:.0%} "
+                f"auto -> {renderer.encoder.choose(ratio)}"
+            )
+            for label, save in METHODS.items():
+                cost = min(timeit.repeat(partial(save, img), number=1, repeat=3))
+                size = len(save(img))
+                print(f"  {label:<22} {cost * 1000:7.1f}ms {size / 1024:8.1f} KB")
+        renderer.close()
+
+
+if __name__ == "__main__":
+    main()
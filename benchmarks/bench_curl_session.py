@@ -0,0 +1,163 @@
+"""curl_cffi 会话复用基准
+
+本地起一个 HTTPS 服务（openssl 生成临时自签名证书，每个请求约 20ms），
+模拟小黑盒一次解析的请求链（tokenid → deviceprofile → link/tree，依次发出），
+同时解析若干条链接，对比：
+- to_thread: 每个请求在线程中调用 curl_requests.get（原行为，每次新建连接和 TLS 握手）
+- session:   BaseParser.curl_session 的共享 AsyncSession（连接复用、异步 I/O）
+
+统计耗时、服务端看到的新建连接数，以及期间进程内出现过的最大线程数
+（默认线程池在单核机器上只有 5 个线程，并发请求多了就要排队）。
+AstrBot 未安装时用最小桩模块替代其 logger / 配置，仅用于加载解析器基类。
+
+用法: python benchmarks/bench_curl_session.py [并发解析数] [每次解析的请求数]
+"""
+
+import asyncio
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import _setup  # noqa: F401
+from aiohttp import web
+from curl_cffi import requests as curl_requests
+
+from core.data import Platform
+from core.parsers.base import BaseParser
+
+IMPERSONATE = "chrome131"
+DELAY = 0.02
+
+
+class _BenchParser(BaseParser):
+    platform = Platform(name="bench", display_name="基准")
+
+
+BaseParser._registry.remove(_BenchParser)
+
+
+def make_ssl_context(tmp: Path) -> ssl.SSLContext:
+    cert, key = tmp / "cert.pem", tmp / "key.pem"
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-subj",
+            "/CN=127.0.0.1",
+            "-days",
+            "1",
+            "-keyout",
+            str(key),
+            "-out",
+            str(cert),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def make_app(peers: set[tuple[str, int]]) -> web.Application:
+    async def handler(request: web.Request) -> web.Response:
+        peers.add(request.transport.get_extra_info("peername"))  # type: ignore[union-attr]
+        await asyncio.sleep(DELAY)
+        return web.json_response({"status": "ok"})
+
+    app = web.Application()
+    app.router.add_get("/{step}", handler)
+    return app
+
+
+async def run_mode(
+    mode: str, base: str, parses: int, chain: int, tmp: Path
+) -> tuple[float, int]:
+    cfg = SimpleNamespace(
+        data_dir=tmp,
+        common_timeout=30,
+        curl_max_clients=8,
+        parser=SimpleNamespace(),
+        proxy=None,
+    )
+    parser = _BenchParser(cfg, SimpleNamespace(http=None))  # type: ignore[arg-type]
+
+    async def request(url: str) -> None:
+        if mode == "to_thread":
+            await asyncio.to_thread(
+                curl_requests.get,
+                url,
+                impersonate=IMPERSONATE,
+                verify=False,
+                timeout=30,
+            )
+        else:
+            session = parser.curl_session(IMPERSONATE)
+            await session.get(url, verify=False)
+
+    async def parse(i: int) -> None:
+        for step in range(chain):
+            await request(f"{base}/{i}-{step}")
+
+    max_threads = threading.active_count()
+    stop = asyncio.Event()
+
+    async def watch_threads() -> None:
+        nonlocal max_threads
+        while not stop.is_set():
+            max_threads = max(max_threads, threading.active_count())
+            await asyncio.sleep(0.005)
+
+    watcher = asyncio.create_task(watch_threads())
+    began = time.perf_counter()
+    await asyncio.gather(*(parse(i) for i in range(parses)))
+    elapsed = time.perf_counter() - began
+    stop.set()
+    await watcher
+    await parser.close_session()
+    return elapsed, max_threads
+
+
+async def run(parses: int, chain: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        peers: set[tuple[str, int]] = set()
+        runner = web.AppRunner(make_app(peers))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=make_ssl_context(tmp))
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        base = f"https://127.0.0.1:{port}"
+        print(
+            f"{parses} 条链接同时解析，每条依次请求 {chain} 次（HTTPS，每次约 {DELAY * 1000:g}ms）"
+        )
+        try:
+            # 先跑 session：默认线程池的线程创建后不会退出，后跑会干扰线程数统计
+            for mode in ("session", "to_thread"):
+                peers.clear()
+                elapsed, max_threads = await run_mode(mode, base, parses, chain, tmp)
+                print(
+                    f"{mode:9} | {elapsed:5.2f}s | 新建连接 {len(peers):3d} | "
+                    f"最大线程数 {max_threads}"
+                )
+        finally:
+            await runner.cleanup()
+
+
+def main() -> None:
+    parses = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    chain = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    asyncio.run(run(parses, chain))
+
+
+if __name__ == "__main__":
+    main()
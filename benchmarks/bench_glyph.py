@@ -0,0 +1,110 @@
+"""字形宽度查询基准
+
+对比 FontInfo 旧的宽度查询（5 个字号共用一个 lru_cache(maxsize=400)，
+只有 U+4E00–U+9FFF 走等宽快路径）与 core.glyph.GlyphWidths（按块懒加载的宽度表）
+在多语种文本上的耗时：
+- text_width: 整段求宽（FontInfo.get_text_width，用于居中、对齐）
+- wrap_text:  逐字符宽度回调驱动换行（Renderer._wrap_text）
+
+每轮依次用 5 个字号处理同一段文本，与渲染一张卡片时各字体交替使用的情形一致。
+
+用法: python benchmarks/bench_glyph.py
+"""
+
+import random
+import timeit
+from functools import lru_cache, partial
+
+from _setup import ROOT
+from PIL import ImageFont
+
+from core.glyph import GlyphWidths
+from core.wrap import wrap_text
+
+FONT_PATH = ROOT / "core" / "resources" / "HYSongYunLangHeiW-1.ttf"
+FONT_SIZES = (28, 30, 24, 24, 60)
+MAX_WIDTH = 750
+SIZE = 20_000
+
+
+class LegacyFont:
+    """FontInfo 的旧实现"""
+
+    def __init__(self, size: int):
+        self.font = ImageFont.truetype(FONT_PATH, size)
+        self.cjk_width = size
+
+    # 原样保留旧实现的方法级缓存作为对照
+    @lru_cache(maxsize=400)  # noqa: B019
+    def get_char_width(self, char: str) -> int:
+        return int(self.font.getlength(char))
+
+    def get_char_width_fast(self, char: str) -> int:
+        if "一" <= char <= "鿿":
+            return self.cjk_width
+        return self.get_char_width(char)
+
+    def get_text_width(self, text: str) -> int:
+        total_width = 0
+        for char in text:
+            total_width += self.get_char_width_fast(char)
+        return total_width
+
+
+def make_inputs() -> dict[str, str]:
+    rng = random.Random(0)
+
+    def sample(*ranges: tuple[int, int], extra: str = "") -> str:
+        pool = [chr(c) for lo, hi in ranges for c in range(lo, hi)] + list(extra)
+        return "".join(rng.choice(pool) for _ in range(SIZE))
+
+    return {
+        "中文": sample((0x4E00, 0x9FA5), extra="，。！？、"),
+        "日文": sample((0x3041, 0x3097), (0x30A1, 0x30FB), (0x4E00, 0x4F00)),
+        "韩文": sample((0xAC00, 0xD7A4), extra=" .,"),
+        "emoji+全角": sample((0xFF01, 0xFF5F), extra="😀🎉👍🔥❤️✨"),
+        "混合": sample(
+            (0x20, 0x7F),
+            (0x3041, 0x3097),
+            (0xAC00, 0xAD00),
+            (0x4E00, 0x4F00),
+            (0xFF01, 0xFF5F),
+            extra="😀🎉👍",
+        ),
+    }
+
+
+def run(fonts: list, text: str, kind: str) -> None:
+    for font in fonts:
+        if isinstance(font, LegacyFont):
+            text_width, char_width = font.get_text_width, font.get_char_width_fast
+        else:
+            text_width, char_width = font.text_width, font.char_width
+        if kind == "text_width":
+            text_width(text)
+        else:
+            wrap_text(text, MAX_WIDTH, char_width)
+
+
+def main() -> None:
+    legacy = [LegacyFont(size) for size in FONT_SIZES]
+    tables = [GlyphWidths(f.font, f.cjk_width) for f in legacy]
+
+    for name, text in make_inputs().items():
+        for kind in ("text_width", "wrap_text"):
+            old = min(
+                timeit.repeat(partial(run, legacy, text, kind), number=1, repeat=3)
+            )
+            cold = [GlyphWidths(f.font, f.cjk_width) for f in legacy]
+            first = timeit.timeit(partial(run, cold, text, kind), number=1)
+            new = min(
+                timeit.repeat(partial(run, tables, text, kind), number=1, repeat=3)
+            )
+            print(
+                f"{name:<10} {kind:<10} | lru_cache {old * 1000:7.1f}ms | "
+                f"GlyphWidths 首次 {first * 1000:6.1f}ms 之后 {new * 1000:6.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
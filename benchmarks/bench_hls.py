@@ -0,0 +1,146 @@
+"""HLS 分片下载基准
+
+本地起一个 aiohttp 服务提供 m3u8 播放列表和 TS 分片，每个分片请求都有固定的
+首字节延迟（模拟跨地域 CDN 的往返时间），对比：
+- legacy:  旧 AcfunParser.download_video 的做法，逐个分片串行请求并追加写入
+- hls-N:   Downloader.download_hls，最多 N 个分片同时在途，按顺序拼接
+
+AstrBot 未安装时用最小桩模块替代其 logger / 配置，仅用于加载下载器。
+
+用法: python benchmarks/bench_hls.py [分片数] [单分片KB] [往返延迟ms]
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import _setup  # noqa: F401
+from aiohttp import ClientSession, web
+
+from core.download import Downloader
+from core.http import HttpClientFactory
+
+
+def make_app(pieces: list[bytes], latency: float) -> web.Application:
+    playlist = "#EXTM3U\n#EXT-X-TARGETDURATION:4\n" + "".join(
+        f"#EXTINF:4.000000,\nseg{i:05d}.ts\n" for i in range(len(pieces))
+    )
+    playlist += "#EXT-X-ENDLIST\n"
+
+    async def index(request: web.Request) -> web.Response:
+        return web.Response(text=playlist)
+
+    async def segment(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.Response(body=pieces[int(request.match_info["i"])])
+
+    app = web.Application()
+    app.router.add_get("/v/index.m3u8", index)
+    app.router.add_get(r"/v/seg{i:\d+}.ts", segment)
+    return app
+
+
+async def legacy(url: str, out: Path) -> Path:
+    """旧做法：正则切分 m3u8 后逐个分片串行下载"""
+    import re
+
+    async with ClientSession() as session:
+        async with session.get(url) as resp:
+            text = await resp.text()
+        links = re.split(r"\n#EXTINF:.{8},\n", text)[1:]
+        links[-1] = links[-1].split("\n")[0]
+        prefix = "/".join(url.split("/")[0:-1])
+        with out.open("wb") as f:
+            for link in links:
+                async with session.get(f"{prefix}/{link}") as resp:
+                    async for chunk in resp.content.iter_chunked(1024 * 1024):
+                        f.write(chunk)
+    return out
+
+
+class _NullIndex:
+    def record(self, path: Path, url: str | None = None) -> None:
+        pass
+
+    def touch(self, path: Path) -> None:
+        pass
+
+
+def make_config(cache_dir: Path, concurrency: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        cache_dir=cache_dir,
+        source_max_size=2048,
+        download_timeout=600,
+        download_retry_times=0,
+        download_concurrency=32,
+        download_host_concurrency=concurrency,
+        download_host_limits={},
+        download_segments=1,
+        download_host_segments={},
+        hls_concurrency=concurrency,
+        common_timeout=30,
+        http_pool_limit=100,
+        http_pool_limit_per_host=32,
+        http_dns_ttl=300,
+        http_keepalive_timeout=30,
+        ytdlp_info_dir=cache_dir / "ytdlp_info",
+        ytdlp_info_ttl=0,
+        ytdlp_info_cache_size=0,
+        ytdlp_process=False,
+        ytdlp_workers=1,
+        ytdlp_queue_size=0,
+        ytdlp_extract_timeout=30,
+        ytdlp_download_timeout=30,
+    )
+
+
+async def run(count: int, size_kb: int, latency_ms: float) -> None:
+    pieces = [os.urandom(size_kb * 1024) for _ in range(count)]
+    digest = hashlib.sha256(b"".join(pieces)).hexdigest()
+    runner = web.AppRunner(make_app(pieces, latency_ms / 1000))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    url = f"http://127.0.0.1:{port}/v/index.m3u8"
+    print(f"{count} 个分片 × {size_kb} KB，每个请求往返 {latency_ms:.0f}ms")
+
+    def report(name: str, elapsed: float, path: Path) -> None:
+        ok = hashlib.sha256(path.read_bytes()).hexdigest() == digest
+        print(f"{name:>8} | {elapsed:6.2f}s | 校验 {'通过' if ok else '失败'}")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            began = time.perf_counter()
+            path = await legacy(url, Path(tmp) / "legacy.ts")
+            report("legacy", time.perf_counter() - began, path)
+        for concurrency in (1, 4, 8, 16):
+            with tempfile.TemporaryDirectory() as tmp:
+                cfg = make_config(Path(tmp), concurrency)
+                downloader = Downloader(cfg, _NullIndex(), HttpClientFactory(cfg))  # type: ignore[arg-type]
+                began = time.perf_counter()
+                # 分片是随机字节，不做 ffmpeg 封装，只比较下载与拼接
+                path = await downloader.download_hls(
+                    url, file_name="hls.mp4", remux=False
+                )
+                report(f"hls-{concurrency}", time.perf_counter() - began, path)
+                await downloader.close()
+                await downloader.http.close()
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    size_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 50
+    asyncio.run(run(count, size_kb, latency_ms))
+
+
+if __name__ == "__main__":
+    main()
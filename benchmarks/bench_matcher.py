@@ -0,0 +1,97 @@
+"""关键词-正则匹配器微基准
+
+对比 main.py 旧的逐条线性扫描与 KeywordMatcher 在「普通闲聊（不含链接）」上的单条耗时。
+正则取自 core/parsers 下所有 @handle 装饰器（通过 ast 静态提取，无需加载 AstrBot）。
+
+用法: python benchmarks/bench_matcher.py
+"""
+
+import ast
+import random
+import re
+import string
+import timeit
+
+from _setup import ROOT
+
+from core.matcher import KeywordMatcher
+
+TARGET_RATE = 10_000  # msgs/s
+
+
+def load_key_patterns() -> list[tuple[str, str]]:
+    pairs: list[tuple[str, str]] = []
+    for file in sorted((ROOT / "core" / "parsers").rglob("*.py")):
+        if file.name == "example.py":
+            continue
+        tree = ast.parse(file.read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call):
+                continue
+            func = node.func
+            if not (isinstance(func, ast.Name) and func.id == "handle"):
+                continue
+            try:
+                kw, pat = (ast.literal_eval(arg) for arg in node.args[:2])
+            except ValueError:
+                continue
+            pairs.append((kw, pat))
+    return pairs
+
+
+def linear_search(key_pattern_list, text):
+    for kw, pat in key_pattern_list:
+        if kw not in text:
+            continue
+        if m := pat.search(text):
+            return kw, m
+    return None
+
+
+def make_chatter(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    cjk = [chr(c) for c in range(0x4E00, 0x4E00 + 2000)]
+    alphabet = string.ascii_letters + string.digits + " ,.!?"
+    msgs = []
+    for _ in range(n):
+        length = rng.randint(4, 120)
+        pool = cjk if rng.random() < 0.7 else alphabet
+        msgs.append("".join(rng.choice(pool) for _ in range(length)))
+    return msgs
+
+
+def main():
+    raw = load_key_patterns()
+    compiled = [(kw, re.compile(pat)) for kw, pat in raw]
+    compiled.sort(key=lambda x: -len(x[0]))
+    matcher = KeywordMatcher(raw)
+    msgs = make_chatter(5000)
+
+    for text in msgs:
+        expected = linear_search(compiled, text)
+        got = matcher.search(text)
+        assert (got and (got[0], got[1].span())) == (
+            expected and (expected[0], expected[1].span())
+        )
+
+    def run_linear():
+        for text in msgs:
+            linear_search(compiled, text)
+
+    def run_matcher():
+        for text in msgs:
+            matcher.search(text)
+
+    print(f"patterns: {len(raw)}, chatter msgs: {len(msgs)}")
+    for name, fn in (("linear", run_linear), ("matcher", run_matcher)):
+        best = min(timeit.repeat(fn, number=1, repeat=5))
+        per_msg = best / len(msgs)
+        load = per_msg * TARGET_RATE
+        print(
+            f"{name:>8}: {per_msg * 1e6:7.2f} us/msg, "
+            f"{load * 100:5.1f}% of one core at {TARGET_RATE} msgs/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""分段并发下载基准
+
+本地起一个按连接限速的 aiohttp 服务（模拟按连接限速的视频 CDN，支持 Range），
+对比 Downloader.streamd 在不同分段连接数下下载同一个视频文件的耗时：
+- 1:  单连接流式下载（原行为）
+- N:  首个请求带 Range 头，服务端返回 206 后按 4MB 一块多连接并发下载
+
+AstrBot 未安装时用最小桩模块替代其 logger / 配置，仅用于加载下载器。
+
+用法: python benchmarks/bench_ranged_download.py [文件MB] [单连接限速MB/s]
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import _setup  # noqa: F401
+from aiohttp import web
+
+from core.download import Downloader
+from core.http import HttpClientFactory
+from core.scheduler import DownloadPriority
+
+CHUNK = 64 * 1024
+
+
+def make_app(payload: bytes, rate: float) -> web.Application:
+    """按连接限速、支持单区间 Range 的文件服务"""
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        start, end = 0, len(payload)
+        status = 200
+        headers = {"Accept-Ranges": "bytes", "Content-Type": "video/mp4"}
+        if spec := request.headers.get("Range"):
+            first, _, last = spec.removeprefix("bytes=").partition("-")
+            start = int(first)
+            end = min(int(last) + 1 if last else len(payload), len(payload))
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{len(payload)}"
+        resp = web.StreamResponse(status=status, headers=headers)
+        resp.content_length = end - start
+        await resp.prepare(request)
+        began = time.monotonic()
+        for offset in range(start, end, CHUNK):
+            await resp.write(payload[offset : min(offset + CHUNK, end)])
+            # 按本连接已发送的字节数限速
+            ahead = (offset + CHUNK - start) / rate - (time.monotonic() - began)
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+        await resp.write_eof()
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/video.mp4", handler)
+    return app
+
+
+class _NullIndex:
+    def record(self, path: Path, url: str | None = None) -> None:
+        pass
+
+    def touch(self, path: Path) -> None:
+        pass
+
+
+def make_config(cache_dir: Path, segments: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        cache_dir=cache_dir,
+        source_max_size=2048,
+        download_timeout=600,
+        download_retry_times=0,
+        download_concurrency=16,
+        download_host_concurrency=8,
+        download_host_limits={},
+        download_segments=segments,
+        download_host_segments={},
+        common_timeout=30,
+        http_pool_limit=100,
+        http_pool_limit_per_host=16,
+        http_dns_ttl=300,
+        http_keepalive_timeout=30,
+        ytdlp_info_dir=cache_dir / "ytdlp_info",
+        ytdlp_info_ttl=0,
+        ytdlp_info_cache_size=0,
+        ytdlp_process=False,
+        ytdlp_workers=1,
+        ytdlp_queue_size=0,
+        ytdlp_extract_timeout=30,
+        ytdlp_download_timeout=30,
+    )
+
+
+async def run(size_mb: int, rate_mb: float) -> None:
+    payload = os.urandom(size_mb * 1024 * 1024)
+    digest = hashlib.sha256(payload).hexdigest()
+    runner = web.AppRunner(make_app(payload, rate_mb * 1024 * 1024))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    url = f"http://127.0.0.1:{port}/video.mp4"
+    print(f"{size_mb} MB 文件，单连接限速 {rate_mb} MB/s")
+    try:
+        for segments in (1, 2, 4, 8):
+            with tempfile.TemporaryDirectory() as tmp:
+                cfg = make_config(Path(tmp), segments)
+                downloader = Downloader(cfg, _NullIndex(), HttpClientFactory(cfg))  # type: ignore[arg-type]
+                began = time.perf_counter()
+                path = await downloader.streamd(
+                    url,
+                    file_name="video.mp4",
+                    proxy=None,
+                    priority=DownloadPriority.VIDEO,
+                )
+                elapsed = time.perf_counter() - began
+                ok = hashlib.sha256(path.read_bytes()).hexdigest() == digest
+                await downloader.close()
+                await downloader.http.close()
+            print(
+                f"分段 {segments} | {elapsed:6.2f}s | "
+                f"{size_mb / elapsed:6.2f} MB/s | 校验 {'通过' if ok else '失败'}"
+            )
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    rate_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 4.0
+    asyncio.run(run(size_mb, rate_mb))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""渲染期间的事件循环延迟基准
+
+并发渲染多张九宫格卡片，同时用一个 5ms 周期的心跳协程测量事件循环被阻塞的时长。
+对比两种模式：
+- loop: 解码在工作线程，排版、绘制、编码在事件循环上（渲染线程池引入之前的做法）
+- pool: 整条排版绘制流水线都在渲染线程池中执行（当前做法）
+
+AstrBot 未安装时用最小桩模块替代其 logger / 配置，仅用于加载渲染器。
+
+用法: python benchmarks/bench_render_lag.py [卡片数]
+"""
+
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import _setup  # noqa: F401
+from PIL import Image
+
+from core.data import Author, ImageContent, ParseResult, Platform
+from core.render import Renderer, RenderExecutor
+
+TICK = 0.005
+DOWNLOAD_DELAY = 0.05
+
+
+class LoopComposeExecutor(RenderExecutor):
+    """解码走工作线程，排版绘制编码留在事件循环上"""
+
+    async def run(self, func, *args):
+        if getattr(func, "__name__", "") == "_render_encoded":
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+
+class _NullIndex:
+    def record(self, path: Path, url: str | None = None) -> None:
+        path.unlink(missing_ok=True)
+
+
+async def _arrive(path: Path) -> Path:
+    await asyncio.sleep(DOWNLOAD_DELAY)
+    return path
+
+
+def make_result(src: Path) -> ParseResult:
+    loop = asyncio.get_running_loop()
+    return ParseResult(
+        platform=Platform("weibo", "微博"),
+        title="渲染基准 render benchmark",
+        text="正文内容，mixed with some latin words。" * 40,
+        timestamp=1700000000,
+        author=Author("bench", loop.create_task(_arrive(src / "0.jpg"))),
+        contents=[
+            ImageContent(loop.create_task(_arrive(src / f"{i}.jpg"))) for i in range(9)
+        ],
+    )
+
+
+async def heartbeat(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def run_mode(mode: str, renderer: Renderer, src: Path, cards: int) -> None:
+    if mode == "loop":
+        renderer.executor = LoopComposeExecutor(1, 0)
+    lags: list[float] = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    start = time.perf_counter()
+    paths = await asyncio.gather(
+        *(renderer.render_card(make_result(src)) for _ in range(cards))
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    assert all(paths), "render failed"
+
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    print(
+        f"{mode:>5} | {cards} cards {elapsed:6.2f}s | "
+        f"lag max {max(lags) * 1000:7.1f}ms  "
+        f"p99 {p99 * 1000:7.1f}ms  "
+        f"mean {statistics.fmean(lags) * 1000:6.2f}ms"
+    )
+
+
+def main() -> None:
+    cards = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp)
+        for i in range(9):
+            Image.new("RGB", (1600, 1200), (i * 25, 120, 180)).save(
+                src / f"{i}.jpg", quality=90
+            )
+        Renderer.load_resources()
+        cfg = SimpleNamespace(
+            emoji_cdn="",
+            emoji_style="FACEBOOK",
+            cache_dir=src,
+            emoji_atlas_dir=src / "emoji_atlas",
+            render_workers=2,
+            render_queue_size=16,
+            card_cache_bytes=0,
+            card_format="auto",
+            card_png_compress_level=3,
+        )
+        for mode in ("loop", "pool"):
+            renderer = Renderer(cfg, _NullIndex())  # type: ignore[arg-type]
+            asyncio.run(run_mode(mode, renderer, src, cards))
+            renderer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""转发卡片渲染基准
+
+微博转发链（主贴 → 转发 → 转发）各层都带正文和九宫格，对比：
+- legacy: 每层转发先按 800px 全尺寸绘制整张卡片，再 LANCZOS 缩小 0.88 倍（逐层递归）
+- scaled: 每层转发用缩放后的常量和字体直接按最终尺寸排版绘制，媒体也按最终尺寸解码
+
+分别统计媒体解码（缩略图缓存关闭）与排版绘制的耗时。
+
+AstrBot 未安装时用最小桩模块替代其 logger / 配置，仅用于加载渲染器。
+
+用法: python benchmarks/bench_repost.py [转发层数]
+"""
+
+import asyncio
+import sys
+import tempfile
+import timeit
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+
+import _setup  # noqa: F401
+from PIL import Image
+
+from core.data import Author, ImageContent, ParseResult, Platform
+from core.render import CardMedia, Renderer, RepostSectionData
+
+TEXT = "转发理由和正文内容，mixed with some latin words。"
+
+
+class _NullIndex:
+    def record(self, path: Path, url: str | None = None) -> None:
+        pass
+
+    def touch(self, path: Path) -> None:
+        pass
+
+
+class _NoThumbnails:
+    """每次都从原图解码，测量真实的解码开销"""
+
+    def get_or_build(self, build, src, *args):
+        return build(src, *args), None, False
+
+
+class LegacyRenderer(Renderer):
+    """旧做法：转发内容按全尺寸绘制后整体缩小"""
+
+    def _repost_renderer(self) -> Renderer:
+        return self
+
+    def _calculate_repost_section(
+        self, repost: ParseResult, media: CardMedia
+    ) -> RepostSectionData:
+        repost_image = self._create_card_image(repost, media, False)
+        repost_image = repost_image.resize(
+            (
+                int(repost_image.width * self.REPOST_SCALE),
+                int(repost_image.height * self.REPOST_SCALE),
+            ),
+            Image.Resampling.LANCZOS,
+        )
+        return RepostSectionData(
+            height=repost_image.height + self.REPOST_PADDING * 2,
+            scaled_image=repost_image,
+        )
+
+
+def make_chain(src: Path, depth: int) -> ParseResult:
+    avatar = src / "avatar.jpg"
+    images = [src / f"{i}.jpg" for i in range(9)]
+    result: ParseResult | None = None
+    for level in range(depth, -1, -1):
+        result = ParseResult(
+            platform=Platform("weibo", "微博"),
+            author=Author(f"博主{level}", avatar),
+            text=TEXT * 4,
+            timestamp=1700000000,
+            contents=[ImageContent(p) for p in images],
+            repost=result,
+        )
+    assert result is not None
+    return result
+
+
+def main() -> None:
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp)
+        for i in range(9):
+            Image.effect_mandelbrot((2000, 1500), (-2, -1.2, 1, 1.2), 40 + i).convert(
+                "RGB"
+            ).save(src / f"{i}.jpg", quality=90)
+        Image.new("RGB", (400, 400), (80, 120, 200)).save(src / "avatar.jpg")
+        Renderer.load_resources()
+        cfg = SimpleNamespace(
+            emoji_cdn="",
+            emoji_style="FACEBOOK",
+            cache_dir=src,
+            emoji_atlas_dir=src / "emoji_atlas",
+            render_workers=1,
+            render_queue_size=4,
+            card_cache_bytes=0,
+            card_format="auto",
+            card_png_compress_level=3,
+        )
+        result = make_chain(src, depth)
+        print(f"主贴 + {depth} 层转发，每层 9 图")
+        for name, cls in (("legacy", LegacyRenderer), ("scaled", Renderer)):
+            renderer = cls(cfg, _NullIndex())  # type: ignore[arg-type]
+            renderer.thumbnails = _NoThumbnails()  # type: ignore[assignment]
+            prepare = partial(renderer._prepare_media, result, renderer.content_width)
+            decode = min(
+                timeit.repeat(
+                    lambda prepare=prepare: asyncio.run(prepare()), number=1, repeat=3
+                )
+            )
+            media = asyncio.run(prepare())
+            renderer._create_card_image(result, media)  # 预热缩放字体
+            draw = min(
+                timeit.repeat(
+                    partial(renderer._create_card_image, result, media),
+                    number=1,
+                    repeat=5,
+                )
+            )
+            img = renderer._create_card_image(result, media)
+            print(
+                f"{name:>6} | 解码 {decode * 1000:7.1f}ms | "
+                f"排版绘制 {draw * 1000:7.1f}ms | 卡片 {img.width}x{img.height}"
+            )
+            renderer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""DASH 音视频边下载边合并基准
+
+用 ffmpeg 生成一对 DASH 分离的 fMP4 音视频（默认视频约 100MB），本地起一个
+按连接限速的 aiohttp 服务提供下载，对比 Downloader.download_av_and_merge：
+- download-merge: 先把视频、音频完整下载到缓存目录，再用 ffmpeg 读两份文件合并
+- stream-merge:   两路流边下载边经管道送入 ffmpeg，不落中间文件
+
+落盘字节只统计插件写入缓存目录的数据（中间文件 + 成片）。
+需要 ffmpeg；AstrBot 未安装时用最小桩模块替代其 logger / 配置。
+
+用法: python benchmarks/bench_stream_merge.py [视频MB] [单连接限速MB/s]
+"""
+
+import asyncio
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import _setup  # noqa: F401
+from aiohttp import web
+
+from core.download import Downloader
+from core.http import HttpClientFactory
+
+CHUNK = 64 * 1024
+SECONDS = 30
+
+
+def make_dash(src: Path, video_mb: int) -> tuple[Path, Path]:
+    """生成 B 站同款的分离 fMP4（视频 H.264，音频 AAC）"""
+    video, audio = src / "video.m4s", src / "audio.m4s"
+    dash = ["-movflags", "+frag_keyframe+empty_moov+default_base_moof+dash"]
+    bitrate = f"{video_mb * 8 // SECONDS}M"
+    common = ["ffmpeg", "-v", "error", "-y", "-f", "lavfi"]
+    subprocess.run(
+        [
+            *common,
+            "-i",
+            f"testsrc2=size=1280x720:rate=30:duration={SECONDS}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-b:v",
+            bitrate,
+            "-minrate",
+            bitrate,
+            "-maxrate",
+            bitrate,
+            "-bufsize",
+            bitrate,
+            "-x264-params",
+            "nal-hrd=cbr",
+            *dash,
+            "-f",
+            "mp4",
+            str(video),
+        ],
+        check=True,
+    )
+    subprocess.run(
+        [
+            *common,
+            "-i",
+            f"sine=frequency=440:duration={SECONDS}",
+            "-c:a",
+            "aac",
+            "-b:a",
+            "192k",
+            *dash,
+            "-f",
+            "mp4",
+            str(audio),
+        ],
+        check=True,
+    )
+    return video, audio
+
+
+def make_app(files: dict[str, bytes], rate: float) -> web.Application:
+    """按连接限速的静态文件服务"""
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        payload = files[request.match_info["name"]]
+        resp = web.StreamResponse(headers={"Content-Type": "video/mp4"})
+        resp.content_length = len(payload)
+        await resp.prepare(request)
+        began = time.monotonic()
+        for offset in range(0, len(payload), CHUNK):
+            await resp.write(payload[offset : offset + CHUNK])
+            ahead = (offset + CHUNK) / rate - (time.monotonic() - began)
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+        await resp.write_eof()
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    return app
+
+
+class _NullIndex:
+    def record(self, path: Path, url: str | None = None) -> None:
+        pass
+
+    def touch(self, path: Path) -> None:
+        pass
+
+
+def make_config(cache_dir: Path, stream_merge: bool) -> SimpleNamespace:
+    return SimpleNamespace(
+        cache_dir=cache_dir,
+        source_max_size=2048,
+        download_timeout=600,
+        download_retry_times=0,
+        download_concurrency=16,
+        download_host_concurrency=8,
+        download_host_limits={},
+        download_segments=1,
+        download_host_segments={},
+        stream_merge=stream_merge,
+        common_timeout=30,
+        http_pool_limit=100,
+        http_pool_limit_per_host=16,
+        http_dns_ttl=300,
+        http_keepalive_timeout=30,
+        ytdlp_info_dir=cache_dir / "ytdlp_info",
+        ytdlp_info_ttl=0,
+        ytdlp_info_cache_size=0,
+        ytdlp_process=False,
+        ytdlp_workers=1,
+        ytdlp_queue_size=0,
+        ytdlp_extract_timeout=30,
+        ytdlp_download_timeout=30,
+    )
+
+
+async def run(video_mb: int, rate_mb: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        video, audio = make_dash(Path(tmp), video_mb)
+        files = {p.name: p.read_bytes() for p in (video, audio)}
+        size_v, size_a = len(files[video.name]), len(files[audio.name])
+        runner = web.AppRunner(make_app(files, rate_mb * 1024 * 1024))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        base = f"http://127.0.0.1:{port}"
+        print(
+            f"视频 {size_v / 2**20:.1f} MB + 音频 {size_a / 2**20:.1f} MB，"
+            f"单连接限速 {rate_mb} MB/s"
+        )
+        try:
+            for name, stream_merge in (
+                ("download-merge", False),
+                ("stream-merge", True),
+            ):
+                cache = Path(tmp) / name
+                cache.mkdir()
+                cfg = make_config(cache, stream_merge)
+                downloader = Downloader(cfg, _NullIndex(), HttpClientFactory(cfg))  # type: ignore[arg-type]
+                began = time.perf_counter()
+                out = await downloader.download_av_and_merge(
+                    f"{base}/{video.name}",
+                    f"{base}/{audio.name}",
+                    output_path=cache / "merged.mp4",
+                )
+                elapsed = time.perf_counter() - began
+                await downloader.close()
+                await downloader.http.close()
+                size_out = out.stat().st_size
+                written = size_out + (0 if stream_merge else size_v + size_a)
+                print(
+                    f"{name:>14} | {elapsed:6.2f}s | 落盘 {written / 2**20:6.1f} MB | "
+                    f"成片 {size_out / 2**20:.1f} MB | 缓存目录残留 "
+                    f"{len(list(cache.iterdir())) - 1} 个文件"
+                )
+        finally:
+            await runner.cleanup()
+
+
+def main() -> None:
+    if shutil.which("ffmpeg") is None:
+        sys.exit("需要 ffmpeg")
+    video_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rate_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    asyncio.run(run(video_mb, rate_mb))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""文本换行微基准
+
+对比 Renderer 旧的逐字符换行（remaining_text[1:] 切片 + 字符串拼接，O(n²)）
+与 core.wrap.wrap_text（前缀和 + 一次切片，O(n)）在 100 KB 输入上的耗时。
+字符宽度取自插件自带字体，与渲染时一致。
+
+用法: python benchmarks/bench_wrap.py
+"""
+
+import random
+import timeit
+from functools import lru_cache, partial
+
+from _setup import ROOT
+from PIL import ImageFont
+
+from core.wrap import wrap_text
+
+FONT_PATH = ROOT / "core" / "resources" / "HYSongYunLangHeiW-1.ttf"
+FONT_SIZE = 24
+MAX_WIDTH = 750
+SIZE = 100 * 1024
+
+font = ImageFont.truetype(FONT_PATH, FONT_SIZE)
+
+
+@lru_cache(maxsize=400)
+def _char_width(char: str) -> int:
+    return int(font.getlength(char))
+
+
+def char_width(char: str) -> int:
+    if "\u4e00" <= char <= "\u9fff":
+        return FONT_SIZE
+    return _char_width(char)
+
+
+def legacy_wrap(text: str, max_width: int) -> list[str]:
+    """Renderer._wrap_text 的旧实现"""
+    lines: list[str] = []
+
+    def is_punctuation(char: str) -> bool:
+        return char in "，。！？；：、）】》〉」』〕〗〙〛…—·" or char in ",.;:!?)]}"
+
+    for paragraph in text.splitlines():
+        if not paragraph:
+            lines.append("")
+            continue
+        current_line = ""
+        current_line_width = 0
+        remaining_text = paragraph
+        while remaining_text:
+            next_char = remaining_text[0]
+            w = char_width(next_char)
+            if not current_line:
+                current_line = next_char
+                current_line_width = w
+                remaining_text = remaining_text[1:]
+                continue
+            if is_punctuation(next_char):
+                current_line += next_char
+                current_line_width += w
+                remaining_text = remaining_text[1:]
+                continue
+            test_width = current_line_width + w
+            if test_width <= max_width:
+                current_line += next_char
+                current_line_width = test_width
+                remaining_text = remaining_text[1:]
+            else:
+                lines.append(current_line)
+                current_line = next_char
+                current_line_width = w
+                remaining_text = remaining_text[1:]
+        if current_line:
+            lines.append(current_line)
+    return lines
+
+
+def make_inputs() -> dict[str, str]:
+    rng = random.Random(0)
+    cjk = "".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(SIZE // 3))
+    words = ["the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog,"]
+    latin = " ".join(rng.choice(words) for _ in range(SIZE // 5))[:SIZE]
+    mixed = "".join(
+        rng.choice(["知乎回答", "NGA 帖子", "some words ", "，", "。", "😀"])
+        for _ in range(SIZE // 5)
+    )
+    return {
+        "cjk(1 段)": cjk,
+        "latin(1 段)": latin,
+        "mixed(1 段)": mixed,
+        "mixed(多段)": "\n".join(mixed[i : i + 2000] for i in range(0, SIZE, 2000)),
+    }
+
+
+def main() -> None:
+    for name, text in make_inputs().items():
+        legacy = timeit.timeit(partial(legacy_wrap, text, MAX_WIDTH), number=1)
+        new = min(
+            timeit.repeat(
+                partial(wrap_text, text, MAX_WIDTH, char_width), number=1, repeat=3
+            )
+        )
+        capped = min(
+            timeit.repeat(
+                partial(wrap_text, text, MAX_WIDTH, char_width, max_lines=200),
+                number=1,
+                repeat=3,
+            )
+        )
+        print(
+            f"{name:<12} {len(text.encode()) // 1024:>4} KB | "
+            f"legacy {legacy * 1000:9.1f}ms | "
+            f"wrap_text {new * 1000:7.1f}ms | "
+            f"max_lines=200 {capped * 1000:6.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
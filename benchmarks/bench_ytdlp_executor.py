@@ -0,0 +1,112 @@
+"""yt-dlp 任务执行方式基准
+
+本地起一个响应较慢的直链视频服务（yt-dlp 走 generic 提取器，每次解析约 1 秒），
+同时发起一批解析任务，期间每 50ms 探测一次：
+- 默认线程池里一个小任务（os.stat）从提交到完成的耗时（文件删除、PIL 保存等都在这里排队）
+- 事件循环的调度延迟
+
+对比两种执行方式：
+- to_thread: 在默认线程池中执行 yt-dlp（原行为）
+- executor:  YtdlpExecutor，独立工作进程执行、限制并发并排队
+
+AstrBot 未安装时用最小桩模块替代其 logger，仅用于加载执行器。
+
+用法: python benchmarks/bench_ytdlp_executor.py [并发解析数] [工作进程数]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import _setup  # noqa: F401
+from aiohttp import web
+
+from core import ytdlp_worker
+from core.ytdlp import YtdlpExecutor
+
+DELAY = 1.0
+OPTS = {"quiet": True, "no_warnings": True}
+
+
+def make_app() -> web.Application:
+    async def clip(request: web.Request) -> web.Response:
+        await asyncio.sleep(DELAY)
+        return web.Response(body=b"\0" * 4096, content_type="video/mp4")
+
+    app = web.Application()
+    app.router.add_get("/{name}.mp4", clip)
+    return app
+
+
+async def probe(stop: asyncio.Event) -> tuple[list[float], list[float]]:
+    """周期性测量默认线程池小任务耗时和事件循环延迟（毫秒）"""
+    pool_ms: list[float] = []
+    loop_ms: list[float] = []
+    while not stop.is_set():
+        began = time.perf_counter()
+        await asyncio.sleep(0.05)
+        loop_ms.append((time.perf_counter() - began - 0.05) * 1000)
+        began = time.perf_counter()
+        await asyncio.to_thread(os.stat, __file__)
+        pool_ms.append((time.perf_counter() - began) * 1000)
+    return pool_ms, loop_ms
+
+
+async def run_mode(mode: str, base: str, jobs: int, workers: int) -> None:
+    executor = YtdlpExecutor(workers=workers, queue_size=jobs)
+    if mode == "executor":
+        # 预热工作进程（常驻进程只在首次任务时启动）
+        await asyncio.gather(
+            *(
+                executor.extract(OPTS, f"{base}/warm{i}.mp4", "fp", timeout=60)
+                for i in range(workers)
+            )
+        )
+
+    async def extract(i: int) -> None:
+        url = f"{base}/clip{i}.mp4"
+        if mode == "to_thread":
+            await asyncio.to_thread(ytdlp_worker.extract, OPTS, url, "fp")
+        else:
+            await executor.extract(OPTS, url, "fp", timeout=60)
+
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(stop))
+    began = time.perf_counter()
+    await asyncio.gather(*(extract(i) for i in range(jobs)))
+    elapsed = time.perf_counter() - began
+    stop.set()
+    pool_ms, loop_ms = await prober
+    await executor.close()
+    print(
+        f"{mode:9} | 完成 {elapsed:5.2f}s | "
+        f"线程池小任务 中位 {statistics.median(pool_ms):7.1f}ms 最大 {max(pool_ms):7.1f}ms | "
+        f"事件循环延迟 最大 {max(loop_ms):6.1f}ms"
+    )
+
+
+async def run(jobs: int, workers: int) -> None:
+    runner = web.AppRunner(make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    base = f"http://127.0.0.1:{port}"
+    print(f"{jobs} 个并发解析，每次约 {DELAY:g}s，工作进程 {workers} 个")
+    try:
+        for mode in ("to_thread", "executor"):
+            await run_mode(mode, base, jobs, workers)
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    asyncio.run(run(jobs, workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import time
+from asyncio import Task
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+
+from .data import LazyPath, ParseResult, PathSource, VideoContent
+
+PathLike = PathSource | None
+
+
+def _settle(value: PathLike) -> PathLike:
+    """已成功完成的下载 Task 固化为 Path，其余原样返回"""
+    task = value.task if isinstance(value, LazyPath) else value
+    if (
+        isinstance(task, Task)
+        and task.done()
+        and not task.cancelled()
+        and task.exception() is None
+    ):
+        return task.result()
+    return value
+
+
+def _alive(value: PathLike) -> bool:
+    """媒体是否仍可复用：文件未被清理，任务未被取消（延迟下载可重新发起）"""
+    if isinstance(value, Path):
+        return value.exists()
+    if isinstance(value, Task):
+        return not value.cancelled()
+    return True
+
+
+def _iter_results(result: ParseResult) -> Iterator[ParseResult]:
+    while result is not None:
+        yield result
+        result = result.repost  # type: ignore[assignment]
+
+
+class ParseResultCache:
+    """
+    跨会话解析结果缓存
+
+    - 以规范化资源键（见 BaseParser.get_resource_key）为键
+    - TTL 过期 + LRU 淘汰
+    - 命中前校验媒体文件仍在磁盘上，被清理过的结果视为未命中
+    """
+
+    def __init__(self, ttl: float, max_size: int = 256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[float, ParseResult]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, key: str) -> ParseResult | None:
+        """取缓存，未命中/过期/媒体失效返回 None"""
+        if not self.enabled:
+            return None
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expire_at, result = item
+        if expire_at < time.monotonic() or not self._is_alive(result):
+            self._data.pop(key, None)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self._settle_result(result)
+        self.hits += 1
+        return result
+
+    def set(self, key: str, result: ParseResult) -> None:
+        if not self.enabled:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, result)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: str) -> ParseResult | None:
+        item = self._data.pop(key, None)
+        return item[1] if item else None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    @staticmethod
+    def _is_alive(result: ParseResult) -> bool:
+        for res in _iter_results(result):
+            if res.author and not _alive(res.author.avatar):
+                return False
+        for cont in result.iter_contents():
+            if not _alive(cont.path_task):
+                return False
+            if isinstance(cont, VideoContent) and not _alive(cont.cover):
+                return False
+        return True
+
+    @staticmethod
+    def _settle_result(result: ParseResult) -> None:
+        """把已完成的下载固化为 Path，后续命中无需再经由 Task"""
+        for res in _iter_results(result):
+            if res.author:
+                res.author.avatar = _settle(res.author.avatar)
+        for cont in result.iter_contents():
+            cont.path_task = _settle(cont.path_task)  # type: ignore[assignment]
+            if isinstance(cont, VideoContent):
+                cont.cover = _settle(cont.cover)
+
+
+class CardCache:
+    """
+    渲染卡片缓存（内容寻址）
+
+    - 键由调用方根据解析结果指纹 + 渲染器指纹生成，同一输入只渲染一次
+    - 磁盘上为 card_<key><后缀>，后缀随编码格式而定，由媒体缓存索引统一按 LRU 淘汰
+    - 内存中按总字节数限额保留最近的编码结果，磁盘文件被淘汰后无需重新渲染
+    """
+
+    SUFFIXES = (".png", ".jpg", ".webp")
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[str, tuple[bytes, str]] = OrderedDict()
+        self._bytes = 0
+        self.disk_hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def path(self, key: str, suffix: str = ".png") -> Path:
+        return self.root / f"card_{key}{suffix}"
+
+    def get_path(self, key: str) -> Path | None:
+        """磁盘上已有的卡片"""
+        for suffix in self.SUFFIXES:
+            path = self.path(key, suffix)
+            if path.exists():
+                self.disk_hits += 1
+                return path
+        return None
+
+    def get(self, key: str) -> tuple[bytes, str] | None:
+        """内存中的卡片 (字节, 后缀)"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.memory_hits += 1
+        return entry
+
+    def set(self, key: str, data: bytes, suffix: str = ".png") -> None:
+        if len(data) > self.max_bytes:
+            return
+        if (old := self._data.pop(key, None)) is not None:
+            self._bytes -= len(old[0])
+        self._data[key] = (data, suffix)
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+            _, (evicted, _) = self._data.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, float]:
+        hits = self.disk_hits + self.memory_hits
+        total = hits + self.misses
+        return {
+            "size": len(self._data),
+            "bytes": self._bytes,
+            "disk_hits": self.disk_hits,
+            "memory_hits": self.memory_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
@@ -1,23 +1,29 @@
-import asyncio
-import shutil
+import sqlite3
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-
+from apscheduler.triggers.interval import IntervalTrigger
 from astrbot.api import logger
 
 from .config import PluginConfig
+from .media_index import MediaCacheIndex
 
 
 class CacheCleaner:
     """
-    每天固定时间自动清理插件缓存目录的调度器封装。
+    缓存维护调度器封装。
+
+    - 周期任务：写回索引并增量淘汰超出预算的文件
+    - Cron 任务：对账缓存目录（收录未登记文件、清理残留中间文件）后淘汰
     """
 
     JOBNAME = "CacheCleaner"
+    MAINTAIN_INTERVAL = 300
+    """周期维护间隔（秒）"""
 
-    def __init__(self, config: PluginConfig):
+    def __init__(self, config: PluginConfig, index: MediaCacheIndex):
         self.cfg = config
+        self.index = index
         self.scheduler = AsyncIOScheduler(timezone=self.cfg.timezone)
         self.scheduler.start()
 
@@ -26,6 +32,12 @@ class CacheCleaner:
         logger.info(f"{self.JOBNAME} 已启动，任务周期：{self.cfg.clean_cron}")
 
     def register_task(self):
+        self.scheduler.add_job(
+            func=self._maintain,
+            trigger=IntervalTrigger(seconds=self.MAINTAIN_INTERVAL),
+            name=f"{self.JOBNAME}_maintain",
+            max_instances=1,
+        )
         try:
             self.trigger = CronTrigger.from_crontab(self.cfg.clean_cron)
             self.scheduler.add_job(
@@ -37,13 +49,19 @@ class CacheCleaner:
         except Exception as e:
             logger.error(f"[{self.JOBNAME}] Cron 格式错误：{e}")
 
+    async def _maintain(self) -> None:
+        """写回索引并淘汰到预算以内"""
+        try:
+            await self.index.evict()
+        except (OSError, sqlite3.Error):
+            logger.exception("Error while evicting media cache.")
+
     async def _clean_plugin_cache(self) -> None:
-        """删除并重建缓存目录"""
-        loop = asyncio.get_running_loop()
+        """对账缓存目录并淘汰到预算以内"""
         try:
-            await loop.run_in_executor(None, shutil.rmtree, self.cfg.cache_dir)
-            self.cfg.cache_dir.mkdir(parents=True, exist_ok=True)
-            logger.info("Cache directory cleaned and recreated.")
+            await self.index.rescan()
+            await self.index.evict()
+            logger.info(f"Cache directory reconciled: {self.index.stats()}")
         except Exception:
             logger.exception("Error while cleaning cache directory.")
 
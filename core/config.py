@@ -198,13 +198,16 @@ class PluginConfig(ConfigNode):
 
     arbiter: bool
     debounce_interval: int
+    parse_cache_ttl: int
 
     source_max_size: int
     source_max_minute: int
 
     audio_to_file: bool
     single_heavy_render_card: bool
+    card_format: str
     forward_threshold: int
+    pipeline_send: bool
 
     show_download_fail_tip: bool
     download_timeout: int
@@ -213,6 +216,7 @@ class PluginConfig(ConfigNode):
 
     proxy: str | None
 
+    cache_max_size: int
     clean_cron: str
 
     parsers_template: list[dict[str, Any]]
@@ -227,11 +231,45 @@ class PluginConfig(ConfigNode):
         # ---------- 内置配置 ----------
         self.emoji_cdn = "https://cdn.jsdelivr.net/npm/emoji-datasource-facebook@14.0.0/img/facebook/64/"
         self.emoji_style = "FACEBOOK"  # 可选：APPLE、FACEBOOK、GOOGLE、TWITTER
+        self.parse_cache_size = 256  # 解析结果缓存条数上限
+        self.download_concurrency = 16  # 全局同时下载数上限
+        self.download_host_concurrency = 4  # 单个 host 同时下载数上限
+        self.download_host_limits: dict[str, int] = {}  # 个别 host 的并发上限覆盖
+        self.download_segments = 1  # 重媒体分段并发下载的连接数（1 为不分段）
+        # 按连接限速的 CDN 默认分段下载（按域名后缀匹配，覆盖 download_segments）
+        self.download_host_segments: dict[str, int] = {
+            "bilivideo.com": 4,
+            "bilivideo.cn": 4,
+            "douyinvod.com": 4,
+            "zjcdn.com": 4,
+            "kwaicdn.com": 4,
+            "yximgs.com": 4,
+        }
+        self.ytdlp_info_ttl = 3600  # yt-dlp 解析结果缓存秒数（0 为不缓存）
+        self.ytdlp_info_cache_size = 512  # yt-dlp 解析结果缓存条数上限
+        self.ytdlp_process = True  # 在独立进程中执行 yt-dlp 任务（False 时用专用线程）
+        self.ytdlp_workers = 2  # 同时执行的 yt-dlp 任务数（工作进程数）
+        self.ytdlp_queue_size = 16  # yt-dlp 任务排队上限，超出时直接拒绝
+        self.ytdlp_extract_timeout = 90  # 单次 yt-dlp 解析的超时秒数
+        self.ytdlp_download_timeout = 900  # 单次 yt-dlp 下载的超时秒数
+        self.stream_merge = True  # 边下载边用 ffmpeg 合并 DASH 音视频（仅 POSIX）
+        self.hls_concurrency = 8  # 单个 HLS 视频同时在途的分片数
+        self.http_pool_limit = 100  # 单个连接池的连接总数上限
+        self.http_pool_limit_per_host = 8  # 单个连接池对同一 host 的连接上限
+        self.http_dns_ttl = 300  # DNS 缓存秒数
+        self.http_keepalive_timeout = 30  # 空闲连接保活秒数
+        self.curl_max_clients = 8  # 单个 curl_cffi 会话同时在途的请求数上限
+        self.render_workers = 2  # 渲染线程数
+        self.render_queue_size = 16  # 渲染任务排队上限，超出时在事件循环上等待
+        self.card_cache_size = 32  # 渲染卡片内存缓存上限（MB）
+        self.card_png_compress_level = 3  # PNG 卡片的 zlib 压缩级别（0-9）
 
         # ---------- 派生字段 ----------
         self.proxy = self.proxy or None
         self.max_duration = self.source_max_minute * 60
         self.max_size = self.source_max_size * 1024 * 1024
+        self.cache_max_bytes = self.cache_max_size * 1024 * 1024
+        self.card_cache_bytes = self.card_cache_size * 1024 * 1024
 
         tz = context.get_config().get("timezone")
         self.timezone = (
@@ -243,8 +281,11 @@ class PluginConfig(ConfigNode):
         self.plugin_dir = Path(get_astrbot_plugin_path()) / self._plugin_name
         self.cache_dir = self.data_dir / "cache"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.media_index_file = self.data_dir / "media_index.db"
         self.cookie_dir = self.data_dir / "cookies"
         self.cookie_dir.mkdir(parents=True, exist_ok=True)
+        self.emoji_atlas_dir = self.data_dir / "emoji_atlas"
+        self.ytdlp_info_dir = self.data_dir / "ytdlp_info"
         self.default_template_file = self.plugin_dir / "default_template.json"
 
         # ---------- Parser ----------
@@ -1,28 +1,110 @@
 import hashlib
-from asyncio import Task
+from asyncio import CancelledError, Task, ensure_future
+from collections.abc import Awaitable, Callable, Iterator
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any, TypedDict
 
+from .exception import DownloadException
+from .scope import adopt, cancel_task, was_cancelled
 
-def repr_path_task(path_task: Path | Task[Path]) -> str:
+
+class LazyPath:
+    """
+    延迟下载描述
+
+    - 只记录如何下载（返回 Task 或协程的无参工厂），解析阶段不发起任何请求
+    - 发送/渲染真正需要路径时才 start()，生成下载 Task
+    - cancel() 取消进行中的下载并回到未开始状态，之后仍可再次发起；
+      已完成的下载不受影响
+    """
+
+    __slots__ = ("_factory", "_task", "name")
+
+    def __init__(self, factory: Callable[[], Awaitable[Path]], name: str = ""):
+        self._factory = factory
+        self._task: Task[Path] | None = None
+        self.name = name
+
+    @property
+    def task(self) -> Task[Path] | None:
+        """已发起的下载 Task，未发起时为 None"""
+        return self._task
+
+    def start(self) -> Task[Path]:
+        """发起下载（已发起且未被取消时复用同一个 Task），由当前任务域托管"""
+        if self._task is None or self._task.cancelled():
+            self._task = ensure_future(self._factory())
+            adopt(self._task)
+        return self._task
+
+    def cancel(self) -> bool:
+        """取消进行中的下载，返回是否确实取消了"""
+        task = self._task
+        if task is None or task.done():
+            return False
+        cancel_task(task)
+        self._task = None
+        return True
+
+
+PathSource = Path | Task[Path] | LazyPath
+"""媒体来源：本地路径 / 进行中的下载 / 尚未发起的下载"""
+
+
+async def resolve_path(source: PathSource) -> Path:
+    """等待媒体就绪，延迟下载在此时才真正发起
+
+    下载被其它请求主动取消（任务域退出、资源防抖，而不是当前请求被取消）时：
+    延迟下载重新发起，已创建的 Task 视为下载失败
+    """
+    if isinstance(source, Path):
+        return source
+    task = source.start() if isinstance(source, LazyPath) else source
+    try:
+        return await task
+    except CancelledError:
+        # 下载不是被主动取消的，说明是当前请求自身被取消（等待时取消会传递给下载）
+        if not was_cancelled(task):
+            raise
+    if isinstance(source, LazyPath):
+        return await source.start()
+    raise DownloadException("下载已被取消")
+
+
+def cancel_path(source: PathSource | None) -> bool:
+    """取消进行中的下载，返回是否确实取消了"""
+    if isinstance(source, LazyPath):
+        return source.cancel()
+    if isinstance(source, Task) and not source.done():
+        cancel_task(source)
+        return True
+    return False
+
+
+def repr_path_task(path_task: PathSource) -> str:
     if isinstance(path_task, Path):
         return f"path={path_task.name}"
-    else:
-        return f"task={path_task.get_name()}, done={path_task.done()}"
+    if isinstance(path_task, LazyPath):
+        if path_task.task is None:
+            return f"lazy={path_task.name}"
+        path_task = path_task.task
+    return f"task={path_task.get_name()}, done={path_task.done()}"
 
 
 @dataclass(repr=False, slots=True)
 class MediaContent:
-    path_task: Path | Task[Path]
+    path_task: PathSource
 
     async def get_path(self) -> Path:
-        if isinstance(self.path_task, Path):
-            return self.path_task
-        self.path_task = await self.path_task
+        self.path_task = await resolve_path(self.path_task)
         return self.path_task
 
+    def cancel(self) -> int:
+        """取消本项进行中的下载，返回取消的个数"""
+        return int(cancel_path(self.path_task))
+
     def __repr__(self) -> str:
         prefix = self.__class__.__name__
         return f"{prefix}({repr_path_task(self.path_task)})"
@@ -47,7 +129,7 @@ class FileContent(MediaContent):
 class VideoContent(MediaContent):
     """视频内容"""
 
-    cover: Path | Task[Path] | None = None
+    cover: PathSource | None = None
     """视频封面"""
     duration: float = 0.0
     """时长 单位: 秒"""
@@ -55,11 +137,12 @@ class VideoContent(MediaContent):
     async def get_cover_path(self) -> Path | None:
         if self.cover is None:
             return None
-        if isinstance(self.cover, Path):
-            return self.cover
-        self.cover = await self.cover
+        self.cover = await resolve_path(self.cover)
         return self.cover
 
+    def cancel(self) -> int:
+        return int(cancel_path(self.path_task)) + int(cancel_path(self.cover))
+
     @property
     def display_duration(self) -> str:
         minutes = int(self.duration) // 60
@@ -138,7 +221,7 @@ class Author:
 
     name: str
     """作者名称"""
-    avatar: Path | Task[Path] | None = None
+    avatar: PathSource | None = None
     """作者头像 URL 或本地路径"""
     description: str | None = None
     """作者个性签名等"""
@@ -146,9 +229,7 @@ class Author:
     async def get_avatar_path(self) -> Path | None:
         if self.avatar is None:
             return None
-        if isinstance(self.avatar, Path):
-            return self.avatar
-        self.avatar = await self.avatar
+        self.avatar = await resolve_path(self.avatar)
         return self.avatar
 
     def __repr__(self) -> str:
@@ -256,6 +337,46 @@ class ParseResult:
                 return await cont.get_cover_path()
         return None
 
+    def iter_contents(self) -> Iterator[MediaContent]:
+        """本条及转发链上的全部媒体内容（含发送分组中的内容）"""
+        res: ParseResult | None = self
+        while res is not None:
+            yield from res.contents
+            for group in res.send_groups:
+                yield from group.contents
+            res = res.repost
+
+    def iter_sources(self) -> Iterator[PathSource]:
+        """本条及转发链上全部媒体来源（内容、视频封面、作者头像）"""
+        for cont in self.iter_contents():
+            yield cont.path_task
+            if isinstance(cont, VideoContent) and cont.cover is not None:
+                yield cont.cover
+        res: ParseResult | None = self
+        while res is not None:
+            if res.author and res.author.avatar is not None:
+                yield res.author.avatar
+            res = res.repost
+
+    def iter_download_tasks(self) -> Iterator[Task[Path]]:
+        """本条及转发链上已直接创建的下载 Task（不含延迟下载）"""
+        for source in self.iter_sources():
+            if isinstance(source, Task):
+                yield source
+
+    def cancel_downloads(self, keep_tasks: bool = False) -> int:
+        """取消本条及转发链上所有进行中的下载，返回取消的个数
+
+        延迟下载会回到未开始状态，结果仍可被复用；
+        已创建的下载 Task 取消后无法重新发起，keep_tasks 为 True 时保留它们
+        （结果在跨会话缓存中、仍会被后续会话取用时）
+        """
+        return sum(
+            cancel_path(source)
+            for source in self.iter_sources()
+            if not (keep_tasks and isinstance(source, Task))
+        )
+
     def formatted_datetime(self, fmt: str = "%Y-%m-%d %H:%M:%S") -> str | None:
         """格式化时间戳"""
         return (
@@ -1,27 +1,62 @@
-from asyncio import Task, TimeoutError, create_task, gather, sleep, to_thread
-from collections.abc import Callable, Coroutine
+import os
+from asyncio import (
+    CancelledError,
+    Task,
+    create_subprocess_exec,
+    create_task,
+    current_task,
+    gather,
+    sleep,
+    to_thread,
+)
+from asyncio.subprocess import DEVNULL, PIPE
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Coroutine
+from contextlib import aclosing
 from functools import wraps
+from itertools import islice
 from pathlib import Path
+from shutil import which
 from typing import Any, ParamSpec, TypeVar
 
 import aiofiles
-import yt_dlp
-from aiohttp import ClientError, ClientSession, ClientTimeout
+from aiohttp import ClientError, ClientResponse, ClientSession
+from astrbot.api import logger
 from msgspec import Struct, convert
 from tqdm.asyncio import tqdm
 
-from astrbot.api import logger
-
 from .config import PluginConfig
 from .constants import COMMON_HEADER
 from .exception import (
     DownloadException,
     DurationLimitException,
-    ParseException,
     SizeLimitException,
     ZeroSizeException,
 )
-from .utils import LimitedSizeDict, generate_file_name, merge_av, safe_unlink
+from .hls import (
+    HlsPlaylist,
+    HlsSegment,
+    is_master,
+    parse_master,
+    parse_media,
+    select_variant,
+)
+from .http import HttpClientFactory
+from .media_index import MediaCacheIndex
+from .scheduler import DownloadPriority, DownloadScheduler
+from .scope import adopt, record_cancelled
+from .utils import (
+    TIMEOUT_ERRORS,
+    SingleFlight,
+    fmt_size,
+    generate_file_name,
+    merge_av,
+    part_path,
+    remux_to_mp4,
+    safe_unlink,
+    write_pipe,
+)
+from .ytdlp import YtdlpExecutor, YtdlpInfoCache, options_fingerprint
 
 P = ParamSpec("P")
 T = TypeVar("T")
@@ -34,7 +69,10 @@ def auto_task(func: Callable[P, Coroutine[Any, Any, T]]) -> Callable[P, Task[T]]
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> Task[T]:
         coro = func(*args, **kwargs)
         name = " | ".join(str(arg) for arg in args if isinstance(arg, str))
-        return create_task(coro, name=func.__name__ + " | " + name)
+        task = create_task(coro, name=func.__name__ + " | " + name)
+        # 交给当前请求的任务域托管，请求结束时未完成的下载会被取消
+        adopt(task)
+        return task
 
     return wrapper
 
@@ -65,20 +103,60 @@ class VideoInfo(Struct):
 class Downloader:
     """下载器，支持youtube-dlp 和 流式下载"""
 
-    def __init__(self, config: PluginConfig):
+    RANGE_PIECE_SIZE = 4 * 1024 * 1024
+    """分段下载时每块的字节数"""
+    RANGE_WRITE_SIZE = 1024 * 1024
+    """分段下载时攒够多少字节写一次文件"""
+
+    def __init__(
+        self,
+        config: PluginConfig,
+        media_index: MediaCacheIndex,
+        http: HttpClientFactory,
+    ):
         self.cfg = config
+        # 共享连接池的 HTTP 客户端工厂（解析器也经由下载器取用）
+        self.http = http
+        # 媒体缓存索引（落盘登记、命中刷新）
+        self.media_index = media_index
         self.max_size = self.cfg.source_max_size
         self.default_headers: dict[str, str] = COMMON_HEADER.copy()
-        # 视频信息缓存
-        self.info_cache: LimitedSizeDict[str, VideoInfo] = LimitedSizeDict()
-        # 用于流式下载的客户端
-        self.client = ClientSession(
-            timeout=ClientTimeout(total=self.cfg.download_timeout)
+        # yt-dlp 解析结果缓存（持久化，带 TTL）与任务执行器（独立进程，限并发、排队）
+        self.ytdlp_cache = YtdlpInfoCache(
+            self.cfg.ytdlp_info_dir,
+            ttl=self.cfg.ytdlp_info_ttl,
+            max_entries=self.cfg.ytdlp_info_cache_size,
+        )
+        self.ytdlp_executor = YtdlpExecutor(
+            workers=self.cfg.ytdlp_workers,
+            queue_size=self.cfg.ytdlp_queue_size,
+            use_process=self.cfg.ytdlp_process,
         )
+        self._ytdlp_flights: SingleFlight[str, tuple[dict[str, Any], Path | None]] = (
+            SingleFlight()
+        )
+        # 进行中的下载（按目标文件路径合并并发请求）
+        self._flights: SingleFlight[Path, Path] = SingleFlight()
+        # 并发调度（全局 / 按 host 限流，按优先级放行）
+        self.scheduler = DownloadScheduler(
+            max_concurrency=self.cfg.download_concurrency,
+            per_host=self.cfg.download_host_concurrency,
+            host_limits=self.cfg.download_host_limits,
+        )
+        self._client: ClientSession | None = None
+
+    @property
+    def client(self) -> ClientSession:
+        """用于流式下载的客户端，惰性创建"""
+        if self._client is None or self._client.closed:
+            self._client = self.http.session(timeout=self.cfg.download_timeout)
+        return self._client
 
     async def close(self):
-        """关闭网络客户端"""
-        await self.client.close()
+        """关闭网络客户端和 yt-dlp 工作进程"""
+        if self._client and not self._client.closed:
+            await self._client.close()
+        await self.ytdlp_executor.close()
 
     @auto_task
     async def streamd(
@@ -88,25 +166,75 @@ class Downloader:
         file_name: str | None = None,
         headers: dict[str, str] | None = None,
         proxy: str | None | object = ...,
+        priority: DownloadPriority = DownloadPriority.IMAGE,
     ) -> Path:
-        """流式下载"""
+        """流式下载, 同一目标文件的并发下载会合并为一次"""
         if not file_name:
             file_name = generate_file_name(url)
         file_path = self.cfg.cache_dir / file_name
         # 如果文件存在，则直接返回
         if file_path.exists():
+            self.media_index.touch(file_path)
             return file_path
+        return await self._flights.do(
+            file_path,
+            lambda: self._streamd(
+                url, file_path, headers=headers, proxy=proxy, priority=priority
+            ),
+        )
+
+    async def _streamd(
+        self,
+        url: str,
+        file_path: Path,
+        *,
+        headers: dict[str, str] | None = None,
+        proxy: str | None | object = ...,
+        priority: DownloadPriority = DownloadPriority.IMAGE,
+    ) -> Path:
+        """流式下载到临时文件，完成后原子替换为目标文件
+
+        视频、音频等重媒体在 host 开启分段下载时，首个请求带 Range 头：
+        服务端返回 206 则按字节区间多连接并发下载，否则照常单连接读完
+        """
+        if file_path.exists():
+            return file_path
+        tmp_path = part_path(file_path)
         headers = headers or self.default_headers
         retries = self.cfg.download_retry_times
+        segments = self.segments_for(url) if priority >= DownloadPriority.AUDIO else 1
+        if not hasattr(os, "pwrite"):
+            # 分段按偏移写入依赖 os.pwrite（Windows 上没有），只能单连接顺序下载
+            segments = 1
+        max_bytes = self.max_size * 1024 * 1024
         for attempt in range(retries + 1):
+            downloaded, content_length = 0, None
+
+            def progress(size: int) -> None:
+                nonlocal downloaded
+                downloaded += size
+                bar.update(size)
+
+            request_headers = headers
+            if segments > 1:
+                request_headers = {
+                    **headers,
+                    "Range": f"bytes=0-{self.RANGE_PIECE_SIZE - 1}",
+                }
             try:
-                async with self.client.get(
-                    url, headers=headers, allow_redirects=True, proxy=proxy
-                ) as response:
+                async with (
+                    self.scheduler.slot(url, priority),
+                    self.client.get(
+                        url, headers=request_headers, allow_redirects=True, proxy=proxy
+                    ) as response,
+                ):
                     if response.status >= 400:
                         raise ClientError(f"HTTP {response.status} {response.reason}")
-                    content_length = response.content_length
-                    max_bytes = self.max_size * 1024 * 1024
+                    ranged = response.status == 206
+                    if ranged:
+                        content_length = self._content_range_total(response)
+                    else:
+                        content_length = response.content_length
 
                     if content_length == 0:
                         logger.warning(f"媒体 url: {url}, 大小为 0, 取消下载")
@@ -117,17 +245,29 @@ class Downloader:
                         )
                         raise SizeLimitException
 
-                    downloaded = 0
-                    with self.get_progress_bar(file_name, content_length) as bar:
-                        async with aiofiles.open(file_path, "wb") as file:
-                            async for chunk in response.content.iter_chunked(
-                                1024 * 1024
-                            ):
-                                downloaded += len(chunk)
-                                if downloaded > max_bytes:
-                                    raise SizeLimitException
-                                await file.write(chunk)
-                                bar.update(len(chunk))
+                    with self.get_progress_bar(file_path.name, content_length) as bar:
+                        if ranged:
+                            assert content_length is not None
+                            await self._download_ranges(
+                                url,
+                                tmp_path,
+                                response,
+                                content_length,
+                                segments=segments,
+                                headers=headers,
+                                proxy=proxy,
+                                priority=priority,
+                                progress=progress,
+                            )
+                        else:
+                            async with aiofiles.open(tmp_path, "wb") as file:
+                                async for chunk in response.content.iter_chunked(
+                                    1024 * 1024
+                                ):
+                                    if downloaded + len(chunk) > max_bytes:
+                                        raise SizeLimitException
+                                    await file.write(chunk)
+                                    progress(len(chunk))
 
                     if downloaded == 0:
                         logger.warning(f"媒体 url: {url}, 实际大小为 0, 取消下载")
@@ -137,19 +277,205 @@ class Downloader:
                             f"HTTP payload incomplete {downloaded}/{content_length}"
                         )
 
+                await to_thread(tmp_path.replace, file_path)
+                self.media_index.record(file_path, url)
                 return file_path
             except (ZeroSizeException, SizeLimitException):
-                await safe_unlink(file_path)
+                await safe_unlink(tmp_path)
                 raise
-            except (ClientError, TimeoutError) as exc:
-                await safe_unlink(file_path)
+            except (ClientError, *TIMEOUT_ERRORS) as exc:
+                await safe_unlink(tmp_path)
                 if attempt < retries:
                     await sleep(1 + attempt)
                     continue
                 logger.exception(f"下载失败 | url: {url}, file_path: {file_path}")
                 raise DownloadException("媒体下载失败") from exc
+            except CancelledError:
+                record_cancelled(downloaded, content_length)
+                await safe_unlink(tmp_path)
+                raise
+            except BaseException:
+                await safe_unlink(tmp_path)
+                raise
         raise DownloadException("媒体下载失败")
 
+    def segments_for(self, url: str) -> int:
+        """url 所在 host 的分段下载连接数，按域名后缀匹配，1 为不分段"""
+        host = self.scheduler.host_of(url)
+        for domain, segments in self.cfg.download_host_segments.items():
+            if host == domain or host.endswith("." + domain):
+                return max(1, segments)
+        return max(1, self.cfg.download_segments)
+
+    @staticmethod
+    def _content_range_total(response: ClientResponse) -> int:
+        """从 206 响应的 Content-Range（bytes 0-x/total）取文件总大小"""
+        content_range = response.headers.get("Content-Range", "")
+        _, _, total = content_range.rpartition("/")
+        if not content_range.startswith("bytes 0-") or not total.isdigit():
+            raise ClientError(f"无法识别的 Content-Range: {content_range!r}")
+        return int(total)
+
+    async def _download_ranges(
+        self,
+        url: str,
+        tmp_path: Path,
+        first: ClientResponse,
+        total: int,
+        *,
+        segments: int,
+        headers: dict[str, str],
+        proxy: str | None | object,
+        priority: DownloadPriority,
+        progress: Callable[[int], None],
+    ) -> None:
+        """
+        按字节区间多连接并发下载到预分配的文件
+
+        - 文件按 RANGE_PIECE_SIZE 切块，first 是已发起的首块响应
+        - 持有调度名额的当前连接先读首块，再与其余连接一起从队列领取后续块；
+          其余连接各自排队申请名额，拿不到名额时由当前连接独自下完，不会互相等死
+        - 各块攒满 RANGE_WRITE_SIZE 后用 pwrite 写入各自偏移，
+          块长度与总长度都要与 Content-Range 一致
+        """
+        piece = self.RANGE_PIECE_SIZE
+        queue = deque(
+            (start, min(start + piece, total)) for start in range(piece, total, piece)
+        )
+        fd = await to_thread(
+            os.open, tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644
+        )
+
+        async def flush(buffer: bytearray, offset: int) -> int:
+            if buffer:
+                await to_thread(os.pwrite, fd, buffer, offset)
+                offset += len(buffer)
+                buffer.clear()
+            return offset
+
+        async def write(response: ClientResponse, start: int, end: int) -> None:
+            # 网络读到的小块先攒在内存里，攒够 RANGE_WRITE_SIZE 再交给线程写入
+            offset, buffer = start, bytearray()
+            async for chunk in response.content.iter_chunked(1024 * 1024):
+                if offset + len(buffer) + len(chunk) > end:
+                    raise ClientError(f"分段长度超出 {start}-{end}")
+                buffer += chunk
+                progress(len(chunk))
+                if len(buffer) >= self.RANGE_WRITE_SIZE:
+                    offset = await flush(buffer, offset)
+            offset = await flush(buffer, offset)
+            if offset != end:
+                raise ClientError(f"分段不完整 {offset - start}/{end - start}")
+
+        async def drain() -> None:
+            while queue:
+                start, end = queue.popleft()
+                range_headers = {**headers, "Range": f"bytes={start}-{end - 1}"}
+                async with self.client.get(
+                    url, headers=range_headers, allow_redirects=True, proxy=proxy
+                ) as response:
+                    if response.status != 206:
+                        raise ClientError(f"分段请求返回 HTTP {response.status}")
+                    await write(response, start, end)
+
+        idle: set[Task[None]] = set()
+
+        async def helper() -> None:
+            async with self.scheduler.slot(url, priority):
+                idle.discard(current_task())  # type: ignore[arg-type]
+                await drain()
+
+        helpers = [
+            create_task(helper()) for _ in range(min(segments, len(queue) + 1) - 1)
+        ]
+        idle.update(helpers)
+        try:
+            await to_thread(os.ftruncate, fd, total)
+            await write(first, 0, min(piece, total))
+            await drain()
+            # 队列已领完：还在排队申请名额的连接不再需要，等已开工的连接写完
+            for task in idle:
+                task.cancel()
+            for outcome in await gather(*helpers, return_exceptions=True):
+                if isinstance(outcome, Exception):
+                    raise outcome
+        finally:
+            for task in helpers:
+                task.cancel()
+            await gather(*helpers, return_exceptions=True)
+            await to_thread(os.close, fd)
+
+    async def iter_stream(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str],
+        proxy: str | None | object = ...,
+        priority: DownloadPriority = DownloadPriority.VIDEO,
+    ) -> AsyncIterator[bytes]:
+        """
+        按顺序产出 url 的内容，不落盘
+
+        host 开启分段下载且服务端返回 206 时，首块还在读的同时其余块多连接并发获取，
+        先到的块排队等前面的块产出（最多 segments 块在途）；否则单连接流式读取
+        """
+        segments = self.segments_for(url)
+        piece = self.RANGE_PIECE_SIZE
+        request_headers = headers
+        if segments > 1:
+            request_headers = {**headers, "Range": f"bytes=0-{piece - 1}"}
+        in_flight: deque[tuple[int, Task[bytes]]] = deque()
+
+        def fetch(start: int, total: int) -> tuple[int, Task[bytes]]:
+            end = min(start + piece, total)
+            range_headers = {**headers, "Range": f"bytes={start}-{end - 1}"}
+            task = create_task(self._fetch_bytes(url, range_headers, proxy, priority))
+            return end - start, task
+
+        try:
+            async with (
+                self.scheduler.slot(url, priority),
+                self.client.get(
+                    url, headers=request_headers, allow_redirects=True, proxy=proxy
+                ) as response,
+            ):
+                if response.status >= 400:
+                    raise ClientError(f"HTTP {response.status} {response.reason}")
+                if response.status == 206:
+                    total = self._content_range_total(response)
+                    expected = min(piece, total)
+                else:
+                    total = expected = response.content_length or 0
+                if total > self.max_size * 1024 * 1024:
+                    raise SizeLimitException
+                remaining = iter(range(piece, total, piece))
+                if response.status == 206:
+                    for start in islice(remaining, segments - 1):
+                        in_flight.append(fetch(start, total))
+                else:
+                    remaining = iter(())
+
+                received = 0
+                async for chunk in response.content.iter_chunked(1024 * 1024):
+                    received += len(chunk)
+                    yield chunk
+                if expected and received != expected:
+                    raise ClientError(f"HTTP payload incomplete {received}/{expected}")
+
+            while in_flight:
+                length, task = in_flight[0]
+                data = await task
+                in_flight.popleft()
+                if len(data) != length:
+                    raise ClientError(f"分段长度不符 {len(data)}/{length}")
+                if (start := next(remaining, None)) is not None:
+                    in_flight.append(fetch(start, total))
+                yield data
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+            await gather(*(task for _, task in in_flight), return_exceptions=True)
+
     @staticmethod
     def get_progress_bar(desc: str, total: int | None = None) -> tqdm:
         """获取进度条 bar
@@ -179,11 +505,12 @@ class Downloader:
         video_name: str | None = None,
         headers: dict[str, str] | None = None,
         proxy: str | None = None,
+        priority: DownloadPriority = DownloadPriority.VIDEO,
     ) -> Path:
         if video_name is None:
             video_name = generate_file_name(url, ".mp4")
         return await self.streamd(
-            url, file_name=video_name, headers=headers, proxy=proxy
+            url, file_name=video_name, headers=headers, proxy=proxy, priority=priority
         )
 
     @auto_task
@@ -194,11 +521,12 @@ class Downloader:
         audio_name: str | None = None,
         headers: dict[str, str] | None = None,
         proxy: str | None = None,
+        priority: DownloadPriority = DownloadPriority.AUDIO,
     ) -> Path:
         if audio_name is None:
             audio_name = generate_file_name(url, ".mp3")
         return await self.streamd(
-            url, file_name=audio_name, headers=headers, proxy=proxy
+            url, file_name=audio_name, headers=headers, proxy=proxy, priority=priority
         )
 
     @auto_task
@@ -209,11 +537,12 @@ class Downloader:
         file_name: str | None = None,
         headers: dict[str, str] | None = None,
         proxy: str | None | object = ...,
+        priority: DownloadPriority = DownloadPriority.AUDIO,
     ) -> Path:
         if file_name is None:
             file_name = generate_file_name(url, ".zip")
         return await self.streamd(
-            url, file_name=file_name, headers=headers, proxy=proxy
+            url, file_name=file_name, headers=headers, proxy=proxy, priority=priority
         )
 
     @auto_task
@@ -224,10 +553,13 @@ class Downloader:
         img_name: str | None = None,
         headers: dict[str, str] | None = None,
         proxy: str | None | object = ...,
+        priority: DownloadPriority = DownloadPriority.IMAGE,
     ) -> Path:
         if img_name is None:
             img_name = generate_file_name(url, ".jpg")
-        return await self.streamd(url, file_name=img_name, headers=headers, proxy=proxy)
+        return await self.streamd(
+            url, file_name=img_name, headers=headers, proxy=proxy, priority=priority
+        )
 
     async def download_imgs_without_raise(
         self,
@@ -235,9 +567,13 @@ class Downloader:
         *,
         headers: dict[str, str] | None = None,
         proxy: str | None | object = ...,
+        priority: DownloadPriority = DownloadPriority.IMAGE,
     ) -> list[Path]:
         paths_or_errs = await gather(
-            *[self.download_img(url, headers=headers, proxy=proxy) for url in urls],
+            *[
+                self.download_img(url, headers=headers, proxy=proxy, priority=priority)
+                for url in urls
+            ],
             return_exceptions=True,
         )
         return [p for p in paths_or_errs if isinstance(p, Path)]
@@ -254,26 +590,346 @@ class Downloader:
     ) -> Path:
         """
         download video and audio file by url with stream and merge
+
+        开启 stream_merge 时边下载边把音视频流送入 ffmpeg 合并，不落中间文件；
+        不支持（非 POSIX、没有 ffmpeg）或中途失败时退回先下载再合并
         """
-        v_path, a_path = await gather(
-            self.download_video(v_url, headers=headers, proxy=proxy),
-            self.download_audio(a_url, headers=headers, proxy=proxy),
-        )
-        await merge_av(v_path=v_path, a_path=a_path, output_path=output_path)
+        if output_path.exists():
+            self.media_index.touch(output_path)
+            return output_path
+
+        async def download_and_merge() -> Path:
+            if self.cfg.stream_merge and os.name == "posix" and which("ffmpeg"):
+                try:
+                    return await self._stream_merge(
+                        v_url,
+                        a_url,
+                        output_path,
+                        headers=headers or self.default_headers,
+                        proxy=proxy,
+                    )
+                except (SizeLimitException, ZeroSizeException):
+                    raise
+                except (
+                    ClientError,
+                    *TIMEOUT_ERRORS,
+                    DownloadException,
+                    RuntimeError,
+                ) as e:
+                    logger.warning(f"边下载边合并失败，改为下载后合并: {e!r}")
+            v_path, a_path = await gather(
+                self.download_video(v_url, headers=headers, proxy=proxy),
+                self.download_audio(a_url, headers=headers, proxy=proxy),
+            )
+            await merge_av(v_path=v_path, a_path=a_path, output_path=output_path)
+            self.media_index.record(output_path, v_url)
+            return output_path
+
+        return await self._flights.do(output_path, download_and_merge)
+
+    async def _stream_merge(
+        self,
+        v_url: str,
+        a_url: str,
+        output_path: Path,
+        *,
+        headers: dict[str, str],
+        proxy: str | None,
+    ) -> Path:
+        """
+        边下载边合并音视频
+
+        - 两路流分别写入各自的管道，ffmpeg 以 pipe:<fd> 读入并 -c copy 封装，
+          省去两个中间文件以及合并时的整份读盘和写盘
+        - 管道写满时暂停写入（连带暂停读网络），由 ffmpeg 的读取速度反压下载
+        - 任一路下载失败或 ffmpeg 出错都会结束另一方并删除半成品
+        """
+        tmp_path = part_path(output_path)
+        max_bytes = self.max_size * 1024 * 1024
+        downloaded = 0
+        (v_read, v_write), (a_read, a_write) = os.pipe(), os.pipe()
+        try:
+            process = await create_subprocess_exec(
+                "ffmpeg",
+                "-nostdin",
+                "-loglevel",
+                "error",
+                "-y",
+                "-i",
+                f"pipe:{v_read}",
+                "-i",
+                f"pipe:{a_read}",
+                "-c",
+                "copy",
+                "-map",
+                "0:v:0",
+                "-map",
+                "1:a:0",
+                "-f",
+                "mp4",
+                str(tmp_path),
+                stdin=DEVNULL,
+                stdout=DEVNULL,
+                stderr=PIPE,
+                pass_fds=(v_read, a_read),
+            )
+        except BaseException:
+            for fd in (v_write, a_write):
+                os.close(fd)
+            raise
+        finally:
+            for fd in (v_read, a_read):
+                os.close(fd)
+
+        # 写端由各自的 pump 写完后关闭（ffmpeg 据此得到 EOF），没关的最后统一关闭
+        unclosed = {v_write, a_write}
+
+        async def pump(url: str, fd: int, priority: DownloadPriority) -> None:
+            nonlocal downloaded
+            try:
+                os.set_blocking(fd, False)
+                stream = self.iter_stream(
+                    url, headers=headers, proxy=proxy, priority=priority
+                )
+                async with aclosing(stream) as chunks:
+                    async for chunk in chunks:
+                        downloaded += len(chunk)
+                        if downloaded > max_bytes:
+                            raise SizeLimitException
+                        await write_pipe(fd, chunk)
+                        bar.update(len(chunk))
+            finally:
+                unclosed.discard(fd)
+                os.close(fd)
+
+        logger.info(f"边下载边合并 {output_path.name}")
+        communicate = create_task(process.communicate())
+        with self.get_progress_bar(output_path.name) as bar:
+            pumps = [
+                create_task(pump(v_url, v_write, DownloadPriority.VIDEO)),
+                create_task(pump(a_url, a_write, DownloadPriority.AUDIO)),
+            ]
+            broken = False
+            try:
+                try:
+                    await gather(*pumps)
+                except BrokenPipeError:
+                    # ffmpeg 提前退出，错误信息以它的输出为准
+                    broken = True
+                _, stderr = await communicate
+                if process.returncode != 0 or broken:
+                    raise RuntimeError(f"ffmpeg 执行失败: {stderr.decode().strip()}")
+                if downloaded == 0:
+                    raise ZeroSizeException
+            except BaseException as e:
+                if isinstance(e, CancelledError):
+                    record_cancelled(downloaded)
+                for task in pumps:
+                    task.cancel()
+                if process.returncode is None:
+                    process.kill()
+                await gather(*pumps, communicate, return_exceptions=True)
+                await safe_unlink(tmp_path)
+                raise
+            finally:
+                for fd in unclosed:
+                    os.close(fd)
+
+        await to_thread(tmp_path.replace, output_path)
+        self.media_index.record(output_path, v_url)
+        logger.info(f"Merged {output_path.name}, {fmt_size(output_path)}")
         return output_path
 
-    async def ytdlp_extract_info(
+    @auto_task
+    async def download_hls(
         self,
         url: str,
         *,
-        cookiefile: Path | None = None,
+        file_name: str | None = None,
         headers: dict[str, str] | None = None,
         proxy: str | None = None,
+        priority: DownloadPriority = DownloadPriority.VIDEO,
+        max_height: int = 0,
+        remux: bool = True,
+    ) -> Path:
+        """下载 HLS（m3u8）视频, 同一目标文件的并发下载会合并为一次
+
+        Args:
+            url (str): 主播放列表或媒体播放列表地址
+            max_height (int): 主播放列表中选择码流的最高分辨率，0 为不限
+            remux (bool): 是否用 ffmpeg 把拼接好的 TS 无损封装为 mp4
+        """
+        if not file_name:
+            file_name = generate_file_name(url, ".mp4")
+        file_path = self.cfg.cache_dir / file_name
+        if file_path.exists():
+            self.media_index.touch(file_path)
+            return file_path
+        return await self._flights.do(
+            file_path,
+            lambda: self._download_hls(
+                url,
+                file_path,
+                headers=headers or self.default_headers,
+                proxy=proxy,
+                priority=priority,
+                max_height=max_height,
+                remux=remux,
+            ),
+        )
+
+    async def fetch_hls_playlist(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str],
+        proxy: str | None = None,
+        priority: DownloadPriority = DownloadPriority.VIDEO,
+        max_height: int = 0,
+    ) -> HlsPlaylist:
+        """获取媒体播放列表；给出的是主播放列表时，按 max_height 选择码流后再取一次"""
+        text = (await self._fetch_bytes(url, headers, proxy, priority)).decode()
+        if is_master(text):
+            url = select_variant(parse_master(text, url), max_height).uri
+            text = (await self._fetch_bytes(url, headers, proxy, priority)).decode()
+            if is_master(text):
+                raise DownloadException("HLS 码流播放列表仍是主播放列表")
+        return parse_media(text, url)
+
+    async def _fetch_bytes(
+        self,
+        url: str,
+        headers: dict[str, str],
+        proxy: str | None,
+        priority: DownloadPriority,
+    ) -> bytes:
+        """整体读取一个小文件（播放列表、HLS 分片），失败按配置重试"""
+        retries = self.cfg.download_retry_times
+        for attempt in range(retries + 1):
+            try:
+                async with (
+                    self.scheduler.slot(url, priority),
+                    self.client.get(
+                        url, headers=headers, allow_redirects=True, proxy=proxy
+                    ) as response,
+                ):
+                    if response.status >= 400:
+                        raise ClientError(f"HTTP {response.status} {response.reason}")
+                    return await response.read()
+            except (ClientError, *TIMEOUT_ERRORS) as exc:
+                if attempt < retries:
+                    await sleep(1 + attempt)
+                    continue
+                logger.warning(f"下载失败 | url: {url}, {exc!r}")
+                raise DownloadException("媒体下载失败") from exc
+        raise DownloadException("媒体下载失败")
+
+    async def _download_hls(
+        self,
+        url: str,
+        file_path: Path,
+        *,
+        headers: dict[str, str],
+        proxy: str | None,
+        priority: DownloadPriority,
+        max_height: int,
+        remux: bool,
+    ) -> Path:
+        """
+        并发下载 HLS 分片并按顺序拼接
+
+        - 最多 hls_concurrency 个分片同时在途（各自申请调度名额，受 host 并发限制），
+          先到的分片在队列里等前面的分片写完，写出一个再补发一个，内存占用有上限
+        - 单个分片失败按配置重试，仍失败则整个下载失败
+        - 累计大小超过上限时在分片边界截断，保留已下载的前段
+        - TS 分片拼接后用 ffmpeg 封装为 mp4；fMP4 分片拼接后即是可播放的 mp4，
+          ffmpeg 不可用时保留拼接结果
+        """
+        playlist = await self.fetch_hls_playlist(
+            url,
+            headers=headers,
+            proxy=proxy,
+            priority=priority,
+            max_height=max_height,
+        )
+        segments = playlist.segments
+        if playlist.init is not None:
+            segments = [playlist.init, *segments]
+        logger.debug(
+            f"HLS {file_path.name}: {len(playlist.segments)} 个分片, "
+            f"时长 {playlist.duration:.0f}s"
+        )
+
+        def fetch(segment: HlsSegment) -> Task[bytes]:
+            return create_task(
+                self._fetch_bytes(
+                    segment.uri,
+                    {**headers, **segment.range_header},
+                    proxy,
+                    priority,
+                )
+            )
+
+        joined_path = part_path(file_path.with_suffix(".ts"))
+        tmp_path = part_path(file_path)
+        max_bytes = self.max_size * 1024 * 1024
+        remaining = iter(segments)
+        in_flight: deque[Task[bytes]] = deque(
+            fetch(segment)
+            for segment in islice(remaining, max(1, self.cfg.hls_concurrency))
+        )
+        written, truncated = 0, False
+        try:
+            with self.get_progress_bar(file_path.name) as bar:
+                async with aiofiles.open(joined_path, "wb") as file:
+                    while in_flight:
+                        data = await in_flight.popleft()
+                        if written + len(data) > max_bytes:
+                            logger.warning(
+                                f"HLS {file_path.name} 超过大小限制，"
+                                f"截断为 {written / 1024 / 1024:.1f} MB"
+                            )
+                            truncated = True
+                            break
+                        await file.write(data)
+                        written += len(data)
+                        bar.update(len(data))
+                        if (segment := next(remaining, None)) is not None:
+                            in_flight.append(fetch(segment))
+            if written == 0:
+                raise SizeLimitException if truncated else ZeroSizeException
+
+            if remux and playlist.init is None:
+                try:
+                    await remux_to_mp4(joined_path, tmp_path)
+                except RuntimeError as e:
+                    logger.warning(f"HLS 封装 mp4 失败，保留 TS 拼接结果: {e}")
+                else:
+                    await to_thread(tmp_path.replace, file_path)
+            if not file_path.exists():
+                await to_thread(joined_path.replace, file_path)
+        except CancelledError:
+            record_cancelled(written)
+            raise
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await gather(*in_flight, return_exceptions=True)
+            await gather(safe_unlink(joined_path), safe_unlink(tmp_path))
+        self.media_index.record(file_path, url)
+        return file_path
+
+    def _ytdlp_extract_opts(
+        self,
+        *,
+        cookiefile: Path | None,
+        headers: dict[str, str] | None,
+        proxy: str | None,
         format: str | None = None,
-    ) -> VideoInfo:
-        if (info := self.info_cache.get(url)) is not None:
-            return info
-        opts = {
+        node: bool = False,
+    ) -> dict[str, Any]:
+        """解析用的 yt-dlp 选项；同一组参数得到相同的选项，解析结果和实例才能复用"""
+        opts: dict[str, Any] = {
             "quiet": True,
             "skip_download": True,
             "http_headers": headers or self.default_headers,
@@ -284,13 +940,50 @@ class Downloader:
             opts["cookiefile"] = str(cookiefile)
         if format:
             opts["format"] = format
-        with yt_dlp.YoutubeDL(opts) as ydl:  # type: ignore
-            raw = await to_thread(ydl.extract_info, url, download=False)
-            if not raw:
-                raise ParseException("获取视频信息失败")
-        info = convert(raw, VideoInfo)
-        self.info_cache[url] = info
-        return info
+        if node:
+            opts["js_runtimes"] = {"node": {}}
+        return opts
+
+    async def _ytdlp_extract(
+        self, url: str, opts: dict[str, Any]
+    ) -> tuple[dict[str, Any], Path | None]:
+        """解析 url，返回 info dict 及其缓存文件路径（未缓存时为 None）
+
+        先查持久化缓存；未命中时同一 url + 选项的并发解析合并为一次，
+        交给 yt-dlp 执行器（工作进程内复用已初始化的 YoutubeDL）
+        """
+        fingerprint = options_fingerprint(opts)
+        key = YtdlpInfoCache.key(url, fingerprint)
+        if (cached := await self.ytdlp_cache.get(key)) is not None:
+            return cached
+
+        async def extract() -> tuple[dict[str, Any], Path | None]:
+            raw = await self.ytdlp_executor.extract(
+                opts, url, fingerprint, timeout=self.cfg.ytdlp_extract_timeout
+            )
+            return raw, await self.ytdlp_cache.put(key, raw)
+
+        return await self._ytdlp_flights.do(key, extract)
+
+    async def ytdlp_extract_info(
+        self,
+        url: str,
+        *,
+        cookiefile: Path | None = None,
+        headers: dict[str, str] | None = None,
+        proxy: str | None = None,
+        format: str | None = None,
+        node: bool = False,
+    ) -> VideoInfo:
+        opts = self._ytdlp_extract_opts(
+            cookiefile=cookiefile,
+            headers=headers,
+            proxy=proxy,
+            format=format,
+            node=node,
+        )
+        raw, _ = await self._ytdlp_extract(url, opts)
+        return convert(raw, VideoInfo)
 
     async def ytdlp_extract_raw(
         self,
@@ -300,24 +993,45 @@ class Downloader:
         headers: dict[str, str] | None = None,
         proxy: str | None = None,
         format: str | None = None,
+        node: bool = False,
     ) -> dict[str, Any]:
-        opts = {
-            "quiet": True,
-            "skip_download": True,
-            "http_headers": headers or self.default_headers,
-        }
-        if proxy:
-            opts["proxy"] = proxy
-        if cookiefile and cookiefile.is_file():
-            opts["cookiefile"] = str(cookiefile)
-        if format:
-            opts["format"] = format
+        opts = self._ytdlp_extract_opts(
+            cookiefile=cookiefile,
+            headers=headers,
+            proxy=proxy,
+            format=format,
+            node=node,
+        )
+        raw, _ = await self._ytdlp_extract(url, opts)
+        return raw
+
+    async def _ytdlp_download(
+        self, opts: dict[str, Any], url: str, info_path: Path | None, desc: str
+    ) -> None:
+        """交给 yt-dlp 执行器下载，进度显示为进度条，文件超过大小上限时中止"""
+        max_bytes = self.max_size * 1024 * 1024
+        with self.get_progress_bar(desc) as bar:
+
+            def on_progress(progress: dict[str, Any]) -> None:
+                total, downloaded = progress["total"], progress["downloaded"]
+                if total > max_bytes:
+                    logger.warning(
+                        f"媒体 url: {url} 大小 {total / 1024 / 1024:.2f} MB 超过 {self.max_size} MB, 取消下载"
+                    )
+                    raise SizeLimitException
+                if downloaded < bar.n:
+                    # 音视频分开下载时，进入下一个文件
+                    bar.reset(total or None)
+                bar.total = total or None
+                bar.update(downloaded - bar.n)
 
-        with yt_dlp.YoutubeDL(opts) as ydl:  # type: ignore
-            raw = await to_thread(ydl.extract_info, url, download=False)
-            if not isinstance(raw, dict):
-                raise ParseException("yt-dlp 返回数据异常")
-            return raw  # type: ignore
+            await self.ytdlp_executor.download(
+                opts,
+                url,
+                info_path,
+                timeout=self.cfg.ytdlp_download_timeout,
+                on_progress=on_progress,
+            )
 
     @auto_task
     async def ytdlp_download_video(
@@ -330,16 +1044,21 @@ class Downloader:
         format: str | None = None,
         node: bool = False,
     ) -> Path:
-        info = await self.ytdlp_extract_info(
-            url, cookiefile=cookiefile, headers=headers, proxy=proxy
-        )
-        if info.duration > self.cfg.max_duration:
-            raise DurationLimitException
-
+        """下载视频；解析阶段用相同参数解析过时直接复用其结果，不再二次解析"""
         video_path = self.cfg.cache_dir / generate_file_name(url, ".mp4")
         if video_path.exists():
+            self.media_index.touch(video_path)
             return video_path
 
+        raw, info_path = await self._ytdlp_extract(
+            url,
+            self._ytdlp_extract_opts(
+                cookiefile=cookiefile, headers=headers, proxy=proxy, node=node
+            ),
+        )
+        if (raw.get("duration") or 0) > self.cfg.max_duration:
+            raise DurationLimitException
+
         opts = {
             "outtmpl": str(video_path),
             "merge_output_format": "mp4",
@@ -358,8 +1077,9 @@ class Downloader:
         if node:
             opts["js_runtimes"] = {"node": {}}
 
-        with yt_dlp.YoutubeDL(opts) as ydl:  # type: ignore
-            await to_thread(ydl.download, [url])
+        async with self.scheduler.slot(url, DownloadPriority.VIDEO):
+            await self._ytdlp_download(opts, url, info_path, video_path.name)
+        self.media_index.record(video_path, url)
         return video_path
 
     @auto_task
@@ -376,6 +1096,7 @@ class Downloader:
         file_stem = generate_file_name(url)
         video_path = self.cfg.cache_dir / f"{file_stem}.mp4"
         if video_path.exists():
+            self.media_index.touch(video_path)
             return video_path
 
         opts = {
@@ -398,13 +1119,15 @@ class Downloader:
         if node:
             opts["js_runtimes"] = {"node": {}}
 
-        with yt_dlp.YoutubeDL(opts) as ydl:  # type: ignore
-            await to_thread(ydl.download, [url])
+        async with self.scheduler.slot(url, DownloadPriority.VIDEO):
+            await self._ytdlp_download(opts, url, None, video_path.name)
         if video_path.exists():
+            self.media_index.record(video_path, url)
             return video_path
 
         candidates = sorted(self.cfg.cache_dir.glob(f"{file_stem}*.mp4"))
         if candidates:
+            self.media_index.record(candidates[0], url)
             return candidates[0]
         raise DownloadException("yt-dlp 视频下载失败")
 
@@ -417,12 +1140,22 @@ class Downloader:
         headers: dict[str, str] | None = None,
         proxy: str | None = None,
         format: str | None = None,
+        node: bool = False,
     ) -> Path:
+        """下载音频；解析阶段用相同参数解析过时直接复用其结果，不再二次解析"""
         file_name = generate_file_name(url)
         audio_path = self.cfg.cache_dir / f"{file_name}.flac"
         if audio_path.exists():
+            self.media_index.touch(audio_path)
             return audio_path
 
+        _, info_path = await self._ytdlp_extract(
+            url,
+            self._ytdlp_extract_opts(
+                cookiefile=cookiefile, headers=headers, proxy=proxy, node=node
+            ),
+        )
+
         opts = {
             "outtmpl": str(self.cfg.cache_dir / file_name) + ".%(ext)s",
             "format": format or "bestaudio/best",
@@ -440,7 +1173,10 @@ class Downloader:
             opts["proxy"] = proxy
         if cookiefile and cookiefile.is_file():
             opts["cookiefile"] = str(cookiefile)
+        if node:
+            opts["js_runtimes"] = {"node": {}}
 
-        with yt_dlp.YoutubeDL(opts) as ydl:  # type: ignore
-            await to_thread(ydl.download, [url])
+        async with self.scheduler.slot(url, DownloadPriority.AUDIO):
+            await self._ytdlp_download(opts, url, info_path, audio_path.name)
+        self.media_index.record(audio_path, url)
         return audio_path
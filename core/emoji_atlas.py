@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+from collections.abc import Iterable, Mapping
+from functools import lru_cache
+from pathlib import Path
+
+from astrbot.api import logger
+from PIL import Image, UnidentifiedImageError
+
+from .utils import part_path
+
+PILImage = Image.Image
+
+
+class EmojiAtlas:
+    """
+    emoji 图集
+
+    - 所有 emoji 缩放为 CELL×CELL 后拼在一张 RGBA 大图上，
+      索引（emoji 序列 → 格子序号）存为同名 JSON，两者原子写入
+    - 启动时整张读入内存，绘制时裁出格子并按字号缩放，渲染路径上没有网络请求，
+      也没有逐个 emoji 文件的打开和解码
+    - CDN 只在图集缺失时兜底：下载后回填进图集并落盘，下次启动直接可用
+    - 加载时收录 seed_dir 中已有的单个 emoji 文件（旧版本逐个下载的缓存）
+    - 图集放在数据目录而非缓存目录，不受媒体缓存的 LRU 淘汰影响
+    - 读写都持锁，可在多个渲染线程中同时使用
+    """
+
+    VERSION = 1
+    CELL = 64
+    """格子边长，与 CDN 提供的 64px 图片一致"""
+    COLS = 32
+    SCALED_CACHE_SIZE = 512
+    """按 (emoji, 字号) 缓存缩放结果的条数"""
+
+    def __init__(self, root: Path, name: str):
+        self.image_path = root / f"{name}.png"
+        self.index_path = root / f"{name}.json"
+        self._index: dict[str, int] = {}
+        self._sheet: PILImage | None = None
+        self._lock = threading.Lock()
+        self._scaled = lru_cache(maxsize=self.SCALED_CACHE_SIZE)(self._scale)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, emoji: str) -> bool:
+        return emoji in self._index
+
+    def missing(self, emojis: Iterable[str]) -> set[str]:
+        """图集中还没有的 emoji"""
+        return {emoji for emoji in emojis if emoji not in self._index}
+
+    def load(self, seed_dir: Path | None = None) -> None:
+        """读取图集，并收录 seed_dir 中图集里还没有的 emoji 文件"""
+        try:
+            meta = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if meta["version"] != self.VERSION or meta["cell"] != self.CELL:
+                raise ValueError("图集版本不匹配")
+            with Image.open(self.image_path) as img:
+                sheet = img.convert("RGBA")
+            index = {str(k): int(v) for k, v in meta["emojis"].items()}
+            if sheet.width != self.COLS * self.CELL or (
+                index and self._rows(max(index.values()) + 1) * self.CELL > sheet.height
+            ):
+                raise ValueError("图集尺寸与索引不符")
+        except FileNotFoundError:
+            pass
+        except (OSError, UnidentifiedImageError, ValueError, KeyError, TypeError) as e:
+            # 文件损坏、索引格式不对
+            logger.warning(f"[emoji 图集] 读取失败，将重新生成: {e}")
+        else:
+            with self._lock:
+                self._sheet, self._index = sheet, index
+
+        if seed_dir is not None and seed_dir.is_dir():
+            files = {p.stem: p for p in seed_dir.glob("*.png")}
+            if added := self.add({k: v for k, v in files.items() if k not in self}):
+                logger.info(f"[emoji 图集] 收录本地 emoji 文件 {added} 个")
+        logger.debug(f"[emoji 图集] 已加载 {len(self)} 个 emoji")
+
+    def add(self, files: Mapping[str, Path | None]) -> int:
+        """把下载好的 emoji 文件写入图集并落盘，返回新增个数"""
+        tiles: dict[str, PILImage] = {}
+        for emoji, path in files.items():
+            if path is None or emoji in self._index:
+                continue
+            if (tile := self._load_tile(path)) is not None:
+                tiles[emoji] = tile
+        with self._lock:
+            # 其它线程可能已经收录了同一个 emoji
+            tiles = {k: v for k, v in tiles.items() if k not in self._index}
+            if not tiles:
+                return 0
+            start = len(self._index)
+            sheet = self._ensure_rows(self._rows(start + len(tiles)))
+            for slot, (emoji, tile) in enumerate(tiles.items(), start):
+                sheet.paste(tile, self._box(slot)[:2])
+                self._index[emoji] = slot
+            self._save_locked()
+        return len(tiles)
+
+    def get(self, emoji: str, size: int) -> PILImage | None:
+        """取出 emoji 并缩放到字号对应的大小，图集中没有时返回 None"""
+        if emoji not in self._index:
+            return None
+        return self._scaled(emoji, size)
+
+    def _scale(self, emoji: str, size: int) -> PILImage:
+        with self._lock:
+            assert self._sheet is not None
+            tile = self._sheet.crop(self._box(self._index[emoji]))
+        emoji_size = size - 2
+        return tile.resize((emoji_size, emoji_size), Image.Resampling.LANCZOS)
+
+    def _load_tile(self, path: Path) -> PILImage | None:
+        """读取单个 emoji 文件，缩放居中到 CELL×CELL，损坏的文件直接删除"""
+        try:
+            with Image.open(path) as img:
+                img = img.convert("RGBA")
+        except (
+            OSError,
+            UnidentifiedImageError,
+            ValueError,
+            Image.DecompressionBombError,
+        ) as e:
+            logger.debug(f"[emoji 图集] {path.name} 损坏，已删除: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        img.thumbnail((self.CELL, self.CELL), Image.Resampling.LANCZOS)
+        tile = Image.new("RGBA", (self.CELL, self.CELL))
+        tile.paste(img, ((self.CELL - img.width) // 2, (self.CELL - img.height) // 2))
+        return tile
+
+    def _rows(self, count: int) -> int:
+        return -(-count // self.COLS)
+
+    def _box(self, slot: int) -> tuple[int, int, int, int]:
+        row, col = divmod(slot, self.COLS)
+        x, y = col * self.CELL, row * self.CELL
+        return x, y, x + self.CELL, y + self.CELL
+
+    def _ensure_rows(self, rows: int) -> PILImage:
+        """图集行数不够时按倍数扩容（持锁调用）"""
+        sheet = self._sheet
+        if sheet is not None and sheet.height >= rows * self.CELL:
+            return sheet
+        old_rows = sheet.height // self.CELL if sheet is not None else 0
+        rows = max(rows, old_rows * 2, 4)
+        grown = Image.new("RGBA", (self.COLS * self.CELL, rows * self.CELL))
+        if sheet is not None:
+            grown.paste(sheet, (0, 0))
+        self._sheet = grown
+        return grown
+
+    def _save_locked(self) -> None:
+        """原子写入图片和索引；失败只影响持久化，内存中的图集照常使用"""
+        assert self._sheet is not None
+        used = self._sheet.crop(
+            (0, 0, self._sheet.width, self._rows(len(self._index)) * self.CELL)
+        )
+        meta = {"version": self.VERSION, "cell": self.CELL, "emojis": self._index}
+        self.image_path.parent.mkdir(parents=True, exist_ok=True)
+        img_tmp, index_tmp = part_path(self.image_path), part_path(self.index_path)
+        try:
+            used.save(img_tmp, format="PNG", compress_level=1)
+            index_tmp.write_text(json.dumps(meta, ensure_ascii=False), "utf-8")
+            os.replace(img_tmp, self.image_path)
+            os.replace(index_tmp, self.index_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[emoji 图集] 写入失败: {e}")
+            img_tmp.unlink(missing_ok=True)
+            index_tmp.unlink(missing_ok=True)
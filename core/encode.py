@@ -0,0 +1,111 @@
+from io import BytesIO
+
+from PIL import Image
+
+PILImage = Image.Image
+
+CARD_FORMATS = ("auto", "png", "png8", "jpeg", "webp")
+"""可选的卡片输出格式"""
+
+SUFFIXES = {"png": ".png", "png8": ".png", "jpeg": ".jpg", "webp": ".webp"}
+
+
+class CardEncoder:
+    """
+    卡片编码器
+
+    - png：无损。卡片以大面积纯色 + 文字为主，zlib 高压缩级别 / optimize
+      多花数倍时间只换来百分之几的体积，因此默认 compress_level=3 且不 optimize
+    - png8：量化到 256 色调色板的 PNG。文字的抗锯齿只有几级灰度，纯文字卡片
+      量化后肉眼无差别，体积只有 png 的 1/5 ~ 1/8；照片会出现色带
+    - jpeg / webp：有损，照片为主的卡片体积只有 PNG 的几分之一；
+      jpeg 编码最快，webp 体积最小但编码较慢，且部分平台不支持
+    - auto：按照片面积占比逐张选择，纯文字卡片（只有头像、emoji 等小图）用 png8，
+      照片为主的卡片用 jpeg，介于两者之间的用 png
+    - 所有方法都是同步的，在渲染线程中调用
+    """
+
+    TEXT_ONLY_RATIO = 0.05
+    """auto 模式下照片面积占比低于此值视为纯文字卡片"""
+    PHOTO_RATIO = 0.3
+    """auto 模式下照片面积占比达到此值视为照片为主的卡片"""
+    JPEG_QUALITY = 90
+    WEBP_QUALITY = 88
+    WEBP_METHOD = 3
+    """WebP 压缩速度档位（0 最快，6 最慢），3 以上体积收益很小"""
+    PNG8_COLORS = 256
+
+    def __init__(self, fmt: str = "auto", png_compress_level: int = 3):
+        self.format = fmt if fmt in CARD_FORMATS else "auto"
+        self.png_compress_level = png_compress_level
+
+    @property
+    def fingerprint(self) -> str:
+        """编码参数，参与卡片缓存键"""
+        return (
+            f"{self.format}|{self.png_compress_level}|"
+            f"{self.TEXT_ONLY_RATIO}|{self.PHOTO_RATIO}|"
+            f"{self.JPEG_QUALITY}|{self.WEBP_QUALITY}|{self.WEBP_METHOD}|"
+            f"{self.PNG8_COLORS}"
+        )
+
+    def choose(self, photo_ratio: float) -> str:
+        """按照片面积占比选择实际使用的格式"""
+        if self.format != "auto":
+            return self.format
+        if photo_ratio < self.TEXT_ONLY_RATIO:
+            return "png8"
+        return "jpeg" if photo_ratio >= self.PHOTO_RATIO else "png"
+
+    def encode(self, img: PILImage, photo_ratio: float = 0.0) -> tuple[bytes, str]:
+        """编码卡片
+
+        Args:
+            img: 卡片图片（RGB）
+            photo_ratio: 照片面积占卡片面积的比例，仅 auto 模式使用
+
+        Returns:
+            (编码后的字节, 文件后缀)
+        """
+        fmt = self.choose(photo_ratio)
+        buf = BytesIO()
+        if fmt == "jpeg":
+            # 4:4:4 不做色度抽样，彩色文字（作者名、链接色）边缘不发虚
+            img.save(
+                buf,
+                format="JPEG",
+                quality=self.JPEG_QUALITY,
+                subsampling=0,
+            )
+        elif fmt == "webp":
+            img.save(
+                buf,
+                format="WEBP",
+                quality=self.WEBP_QUALITY,
+                method=self.WEBP_METHOD,
+            )
+        elif fmt == "png8":
+            self._quantize(img).save(
+                buf, format="PNG", compress_level=self.png_compress_level
+            )
+        else:
+            img.save(buf, format="PNG", compress_level=self.png_compress_level)
+        return buf.getvalue(), SUFFIXES[fmt]
+
+    def _quantize(self, img: PILImage) -> PILImage:
+        """量化到调色板
+
+        FASTOCTREE 比 MEDIANCUT 快 4 倍以上，误差集中在头像等小图上；
+        但它取的是色块中心，纯白背景会变成 (254, 254, 254)，
+        因此把左上角（内边距，必为背景色）对应的调色板项改回原色
+        """
+        quantized = img.quantize(
+            colors=self.PNG8_COLORS,
+            method=Image.Quantize.FASTOCTREE,
+            dither=Image.Dither.NONE,
+        )
+        index = quantized.getpixel((0, 0))
+        palette = quantized.getpalette() or []
+        palette[index * 3 : index * 3 + 3] = img.getpixel((0, 0))
+        quantized.putpalette(palette)
+        return quantized
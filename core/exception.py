@@ -46,6 +46,10 @@ class ZeroSizeException(DownloadException):
         super().__init__("媒体大小为 0, 取消下载")
 
 
+class YtdlpException(DownloadException):
+    """yt-dlp 任务失败异常（解析、下载失败或超时、排队已满）"""
+
+
 class RedirectException(DownloadException):
     """下载重定向异常"""
 
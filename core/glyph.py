@@ -0,0 +1,88 @@
+import re
+from array import array
+
+from PIL import ImageFont
+
+_BLOCK_BITS = 8
+_BLOCK_SIZE = 1 << _BLOCK_BITS
+_BMP_BLOCKS = 0x10000 >> _BLOCK_BITS
+_SURROGATE_BLOCKS = range(0xD800 >> _BLOCK_BITS, 0xE000 >> _BLOCK_BITS)
+_CJK_BLOCKS = range(0x4E00 >> _BLOCK_BITS, 0xA000 >> _BLOCK_BITS)
+"""CJK 统一表意文字 U+4E00–U+9FFF，等宽字形，不逐字测量"""
+
+_ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+
+
+class GlyphWidths:
+    """
+    单个字体的字形宽度表
+
+    - BMP 内的宽度存放在一张 65536 项的 array('H') 中，按 256 码位一块懒加载：
+      某块的字符首次出现时一次测完整块，之后查表即可，不受缓存容量影响
+    - CJK 统一表意文字直接填入字号宽度，不调用 FreeType
+    - BMP 以外（emoji 等）的字符数量有限，用 dict 缓存
+    - 多个渲染线程同时加载同一块时写入的值相同，无需加锁
+    """
+
+    PRELOAD_BLOCKS = (0x00, 0x20, 0x30, 0xFF)
+    """创建时预先加载的块：Latin-1、常用标点、CJK 标点与假名、全角字符"""
+
+    __slots__ = ("_astral", "_bmp", "_cjk_width", "_font", "_loaded")
+
+    def __init__(self, font: ImageFont.FreeTypeFont, cjk_width: int):
+        self._font = font
+        self._cjk_width = cjk_width
+        self._bmp = array("H", bytes(2 * 0x10000))
+        self._loaded = bytearray(_BMP_BLOCKS)
+        self._astral: dict[str, int] = {}
+        for block in self.PRELOAD_BLOCKS:
+            self._load_block(block)
+
+    def _load_block(self, block: int) -> None:
+        base = block << _BLOCK_BITS
+        if block in _CJK_BLOCKS:
+            widths = array("H", [self._cjk_width]) * _BLOCK_SIZE
+        elif block in _SURROGATE_BLOCKS:
+            # 代理项本身不占宽度，BMP 外字符由 _astral 另行计算
+            widths = array("H", bytes(2 * _BLOCK_SIZE))
+        else:
+            getlength = self._font.getlength
+            widths = array(
+                "H", (int(getlength(chr(base + i))) for i in range(_BLOCK_SIZE))
+            )
+        self._bmp[base : base + _BLOCK_SIZE] = widths
+        self._loaded[block] = 1
+
+    def _astral_width(self, char: str) -> int:
+        width = self._astral.get(char)
+        if width is None:
+            width = self._astral[char] = int(self._font.getlength(char))
+        return width
+
+    def char_width(self, char: str) -> int:
+        """单个字符宽度"""
+        code = ord(char)
+        if code > 0xFFFF:
+            return self._astral_width(char)
+        block = code >> _BLOCK_BITS
+        if not self._loaded[block]:
+            self._load_block(block)
+        return self._bmp[code]
+
+    def text_width(self, text: str) -> int:
+        """文本宽度（各字符宽度之和）
+
+        UTF-16LE 编码后每个码元的高字节恰好是块号，据此补齐缺失的块，
+        再把码元序列直接作为下标在宽度表上求和，整个过程没有逐字符的 Python 代码
+        """
+        if not text:
+            return 0
+        units = text.encode("utf-16-le", "surrogatepass")
+        loaded = self._loaded
+        for block in set(units[1::2]):
+            if not loaded[block]:
+                self._load_block(block)
+        width = sum(map(self._bmp.__getitem__, memoryview(units).cast("H")))
+        if len(units) != 2 * len(text):
+            width += sum(map(self._astral_width, _ASTRAL.findall(text)))
+        return width
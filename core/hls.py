@@ -0,0 +1,128 @@
+import re
+from urllib.parse import urljoin
+
+from msgspec import Struct
+
+from .exception import DownloadException
+
+_ATTRIBUTE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+class HlsVariant(Struct):
+    """主播放列表中的一路码流"""
+
+    uri: str
+    bandwidth: int = 0
+    width: int = 0
+    height: int = 0
+
+
+class HlsSegment(Struct):
+    """媒体播放列表中的一个分片"""
+
+    uri: str
+    duration: float = 0.0
+    byterange: tuple[int, int] | None = None
+    """(起始偏移, 长度)，整段下载时为 None"""
+
+    @property
+    def range_header(self) -> dict[str, str]:
+        if self.byterange is None:
+            return {}
+        start, length = self.byterange
+        return {"Range": f"bytes={start}-{start + length - 1}"}
+
+
+class HlsPlaylist(Struct):
+    """媒体播放列表"""
+
+    segments: list[HlsSegment]
+    init: HlsSegment | None = None
+    """fMP4 的初始化分片（EXT-X-MAP），需写在所有分片之前"""
+
+    @property
+    def duration(self) -> float:
+        return sum(seg.duration for seg in self.segments)
+
+
+def parse_attributes(text: str) -> dict[str, str]:
+    """解析 KEY=VALUE,KEY="V,A,L" 形式的属性列表"""
+    return {key: value.strip('"') for key, value in _ATTRIBUTE.findall(text)}
+
+
+def _parse_byterange(text: str, last_end: int) -> tuple[int, int]:
+    """EXT-X-BYTERANGE:<长度>[@<偏移>]，省略偏移时紧接上一个区间"""
+    length, _, offset = text.partition("@")
+    return (int(offset) if offset else last_end, int(length))
+
+
+def is_master(text: str) -> bool:
+    return "#EXT-X-STREAM-INF" in text
+
+
+def parse_master(text: str, base_url: str) -> list[HlsVariant]:
+    """解析主播放列表，返回各路码流（uri 已转为绝对地址）"""
+    variants: list[HlsVariant] = []
+    attrs: dict[str, str] | None = None
+    for line in map(str.strip, text.splitlines()):
+        if line.startswith("#EXT-X-STREAM-INF:"):
+            attrs = parse_attributes(line.partition(":")[2])
+        elif line and not line.startswith("#") and attrs is not None:
+            width, _, height = attrs.get("RESOLUTION", "").partition("x")
+            variants.append(
+                HlsVariant(
+                    uri=urljoin(base_url, line),
+                    bandwidth=int(attrs.get("BANDWIDTH") or 0),
+                    width=int(width) if width.isdigit() else 0,
+                    height=int(height) if height.isdigit() else 0,
+                )
+            )
+            attrs = None
+    if not variants:
+        raise DownloadException("HLS 主播放列表中没有可用码流")
+    return variants
+
+
+def parse_media(text: str, base_url: str) -> HlsPlaylist:
+    """解析媒体播放列表，返回按播放顺序排列的分片（uri 已转为绝对地址）"""
+    if not text.lstrip().startswith("#EXTM3U"):
+        raise DownloadException("不是有效的 m3u8 播放列表")
+    segments: list[HlsSegment] = []
+    init: HlsSegment | None = None
+    duration = 0.0
+    byterange: tuple[int, int] | None = None
+    last_end = 0
+    for line in map(str.strip, text.splitlines()):
+        if not line:
+            continue
+        tag, _, value = line.partition(":")
+        if tag == "#EXTINF":
+            duration = float(value.partition(",")[0] or 0)
+        elif tag == "#EXT-X-BYTERANGE":
+            byterange = _parse_byterange(value, last_end)
+        elif tag == "#EXT-X-KEY":
+            method = parse_attributes(value).get("METHOD", "NONE")
+            if method != "NONE":
+                raise DownloadException(f"暂不支持加密的 HLS 分片（{method}）")
+        elif tag == "#EXT-X-MAP":
+            attrs = parse_attributes(value)
+            map_range = None
+            if "BYTERANGE" in attrs:
+                map_range = _parse_byterange(attrs["BYTERANGE"], 0)
+            init = HlsSegment(urljoin(base_url, attrs["URI"]), byterange=map_range)
+        elif not line.startswith("#"):
+            segments.append(HlsSegment(urljoin(base_url, line), duration, byterange))
+            if byterange is not None:
+                last_end = sum(byterange)
+            duration, byterange = 0.0, None
+    if not segments:
+        raise DownloadException("m3u8 播放列表中没有分片")
+    return HlsPlaylist(segments=segments, init=init)
+
+
+def select_variant(variants: list[HlsVariant], max_height: int = 0) -> HlsVariant:
+    """选择不超过 max_height（0 为不限）的最高码率；都超过时退而选最低的一路"""
+    fitting = [v for v in variants if not max_height or v.height <= max_height]
+    if fitting:
+        return max(fitting, key=lambda v: (v.height, v.bandwidth))
+    return min(variants, key=lambda v: (v.height, v.bandwidth))
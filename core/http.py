@@ -0,0 +1,81 @@
+from typing import Any
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from astrbot.api import logger
+
+from .config import PluginConfig
+
+
+class HttpClientFactory:
+    """
+    HTTP 客户端工厂
+
+    - 每种代理设置共用一个 TCPConnector（连接池、DNS 缓存、TLS 会话复用）
+    - 各解析器 / 下载器的 ClientSession 只是轻量外壳（各自的超时、cookie、默认代理），
+      底层连接由工厂统一持有，关闭会话不会关闭连接池
+    """
+
+    def __init__(self, config: PluginConfig):
+        self.cfg = config
+        self._connectors: dict[str | None, TCPConnector] = {}
+        self.sessions_created = 0
+
+    def connector(self, proxy: str | None = None) -> TCPConnector:
+        """获取（惰性创建）指定代理设置的连接池"""
+        conn = self._connectors.get(proxy)
+        if conn is None or conn.closed:
+            conn = TCPConnector(
+                limit=self.cfg.http_pool_limit,
+                limit_per_host=self.cfg.http_pool_limit_per_host,
+                ttl_dns_cache=self.cfg.http_dns_ttl,
+                keepalive_timeout=self.cfg.http_keepalive_timeout,
+            )
+            self._connectors[proxy] = conn
+        return conn
+
+    def session(
+        self,
+        *,
+        proxy: str | None = None,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> ClientSession:
+        """创建共享连接池的 ClientSession
+
+        Args:
+            proxy: 会话默认代理，同时决定使用哪个连接池
+            timeout: 总超时秒数，默认取普通请求超时
+        """
+        self.sessions_created += 1
+        return ClientSession(
+            connector=self.connector(proxy),
+            connector_owner=False,
+            proxy=proxy,
+            timeout=ClientTimeout(total=timeout or self.cfg.common_timeout),
+            **kwargs,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """各连接池的占用情况"""
+        pools: dict[str, dict[str, int]] = {}
+        for proxy, conn in self._connectors.items():
+            if conn.closed:
+                continue
+            # 以下均为 aiohttp 内部结构，仅用于观测
+            idle = getattr(conn, "_conns", {})
+            pools[proxy or "direct"] = {
+                "limit": conn.limit,
+                "limit_per_host": conn.limit_per_host,
+                "acquired": len(getattr(conn, "_acquired", ())),
+                "idle": sum(len(v) for v in idle.values()),
+                "hosts": len(idle),
+            }
+        return {"sessions_created": self.sessions_created, "pools": pools}
+
+    async def close(self) -> None:
+        """关闭所有连接池（应在所有会话关闭后调用）"""
+        for conn in self._connectors.values():
+            if not conn.closed:
+                await conn.close()
+        self._connectors.clear()
+        logger.debug("[http] 连接池已关闭")
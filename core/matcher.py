@@ -0,0 +1,60 @@
+import re
+from collections.abc import Iterable
+from re import Match, Pattern
+
+
+class KeywordMatcher:
+    """
+    多关键词-正则匹配器
+
+    - 构建期：所有非空关键词编译为一条交替正则作为门控，
+      一次 C 层扫描即可判断文本是否包含任意关键词（re 会按首字符集合跳过无关位置）
+    - 匹配期：未命中门控的普通消息只需尝试空关键词的正则；
+      命中门控的消息再按「长关键词优先」顺序执行出现了的关键词对应的正则
+
+    与原先逐条 `kw in text` + `pat.search(text)` 的线性扫描结果完全一致
+    """
+
+    def __init__(self, key_patterns: Iterable[tuple[str, Pattern[str] | str]]):
+        patterns: list[tuple[str, Pattern[str]]] = [
+            (kw, re.compile(pat) if isinstance(pat, str) else pat)
+            for kw, pat in key_patterns
+        ]
+        # 长关键词优先，避免短词抢匹配（稳定排序，保留同长度的注册顺序）
+        patterns.sort(key=lambda x: -len(x[0]))
+        self.key_patterns: list[tuple[str, Pattern[str]]] = patterns
+
+        # 空关键词不参与门控，始终尝试其正则
+        self._always_patterns: list[tuple[str, Pattern[str]]] = [
+            (kw, pat) for kw, pat in patterns if not kw
+        ]
+        self._keywords: tuple[str, ...] = tuple(
+            dict.fromkeys(kw for kw, _ in patterns if kw)
+        )
+        self._gate: Pattern[str] | None = None
+        if self._keywords:
+            self._gate = re.compile("|".join(map(re.escape, self._keywords)))
+
+    def __len__(self) -> int:
+        return len(self.key_patterns)
+
+    @property
+    def keywords(self) -> list[str]:
+        return [kw for kw, _ in self.key_patterns]
+
+    def search(self, text: str) -> tuple[str, Match[str]] | None:
+        """按优先级返回第一个命中的 (关键词, 匹配对象)，无命中返回 None"""
+        if self._gate is None or self._gate.search(text) is None:
+            # 普通闲聊不含任何关键词，只需尝试空关键词的正则
+            for kw, pat in self._always_patterns:
+                if m := pat.search(text):
+                    return kw, m
+            return None
+
+        present = {kw for kw in self._keywords if kw in text}
+        for kw, pat in self.key_patterns:
+            if kw and kw not in present:
+                continue
+            if m := pat.search(text):
+                return kw, m
+        return None
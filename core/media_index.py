@@ -0,0 +1,332 @@
+import asyncio
+import heapq
+import sqlite3
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from astrbot.api import logger
+
+
+@dataclass(slots=True)
+class MediaEntry:
+    """缓存目录中的一个媒体文件"""
+
+    key: str
+    """相对缓存目录的路径"""
+    size: int
+    """文件大小（字节）"""
+    atime: float
+    """最近访问时间（时间戳）"""
+    url: str | None = None
+    """来源 url"""
+    hits: int = 0
+    """命中次数"""
+
+
+class MediaCacheIndex:
+    """
+    媒体缓存索引
+
+    - 记录缓存目录内每个文件的来源 url、大小、最近访问时间、命中次数，持久化到 SQLite
+    - 下载器 / 渲染器落盘时登记，命中已有文件时刷新访问时间
+    - 总大小超出预算时按 LRU 增量淘汰，跳过正在发送（被 pin 住）的文件
+    - 启动和定时任务时对账磁盘，收录未经登记写入的文件（yt-dlp 产物、emoji 等）
+    """
+
+    TABLE = "media"
+    PART_SUFFIXES = (".part", ".ytdl")
+    """下载中间文件后缀，不纳入索引"""
+    PART_EXPIRE = 6 * 3600
+    """超过此秒数未更新的中间文件视为残留，直接删除"""
+    LOW_WATERMARK = 0.9
+    """淘汰到预算的此比例为止，避免每次登记都触发淘汰"""
+    EVICT_BATCH = 64
+    """单批淘汰的文件数，批次之间让出事件循环"""
+
+    def __init__(self, root: Path, db_path: Path, max_bytes: int):
+        self.root = root
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._entries: dict[str, MediaEntry] = {}
+        self._pins: Counter[str] = Counter()
+        self._dirty: set[str] = set()
+        self._removed: set[str] = set()
+        self._conn: sqlite3.Connection | None = None
+        self._lock = asyncio.Lock()
+        self._evict_task: asyncio.Task | None = None
+        self.total_bytes = 0
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: Path) -> bool:
+        key = self._key(path)
+        return key is not None and key in self._entries
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _key(self, path: Path) -> str | None:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+
+    # ---------- 登记 ----------
+
+    def record(self, path: Path, url: str | None = None) -> None:
+        """登记新落盘的文件"""
+        key = self._key(path)
+        if key is None:
+            return
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = MediaEntry(key, 0, 0.0)
+        self.total_bytes += size - entry.size
+        entry.size = size
+        entry.atime = time.time()
+        entry.url = url or entry.url
+        self._dirty.add(key)
+        self._removed.discard(key)
+        self._maybe_evict()
+
+    def touch(self, path: Path) -> None:
+        """命中已有文件时刷新访问时间"""
+        key = self._key(path)
+        if key is None:
+            return
+        entry = self._entries.get(key)
+        if entry is None:
+            self.record(path)
+            return
+        entry.atime = time.time()
+        entry.hits += 1
+        self._dirty.add(key)
+
+    def pin(self, path: Path) -> None:
+        """标记文件正在使用，淘汰时跳过"""
+        if (key := self._key(path)) is not None:
+            self._pins[key] += 1
+
+    def unpin(self, path: Path) -> None:
+        if (key := self._key(path)) is None:
+            return
+        self._pins[key] -= 1
+        if self._pins[key] <= 0:
+            del self._pins[key]
+
+    @contextmanager
+    def pinned(self, paths: Iterable[Path]) -> Iterator[None]:
+        paths = list(paths)
+        for path in paths:
+            self.pin(path)
+        try:
+            yield
+        finally:
+            for path in paths:
+                self.unpin(path)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "files": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "pinned": len(self._pins),
+            "evicted_files": self.evicted_files,
+            "evicted_bytes": self.evicted_bytes,
+        }
+
+    # ---------- 淘汰 ----------
+
+    def _maybe_evict(self) -> None:
+        """超出预算时在后台启动一轮淘汰（同一时刻至多一轮）"""
+        if not self.enabled or self.total_bytes <= self.max_bytes:
+            return
+        if self._evict_task and not self._evict_task.done():
+            return
+        try:
+            self._evict_task = asyncio.get_running_loop().create_task(self.evict())
+        except RuntimeError:
+            pass
+
+    def _pick_victims(self, need: int) -> list[MediaEntry]:
+        """按最近访问时间从旧到新挑选未被 pin 的文件，直到释放量达到 need"""
+        victims: list[MediaEntry] = []
+        freed = 0
+        candidates = (e for e in self._entries.values() if e.key not in self._pins)
+        for entry in heapq.nsmallest(
+            self.EVICT_BATCH, candidates, key=lambda e: e.atime
+        ):
+            victims.append(entry)
+            freed += entry.size
+            if freed >= need:
+                break
+        return victims
+
+    async def evict(self) -> int:
+        """淘汰到低水位以下并写回索引，返回释放的字节数"""
+        if not self.enabled:
+            await self.flush()
+            return 0
+        freed = 0
+        async with self._lock:
+            target = int(self.max_bytes * self.LOW_WATERMARK)
+            while self.total_bytes > target:
+                victims = self._pick_victims(self.total_bytes - target)
+                if not victims:
+                    logger.warning(
+                        f"[媒体缓存] 超出预算但所有文件都在使用中: {self.stats()}"
+                    )
+                    break
+                await asyncio.to_thread(self._unlink_many, victims)
+                for entry in victims:
+                    # 删除期间可能被重新登记（重新下载），此时不再移除
+                    if self._entries.get(entry.key) is not entry:
+                        continue
+                    if entry.key in self._pins:
+                        continue
+                    self._forget(entry.key)
+                    freed += entry.size
+                    self.evicted_files += 1
+                    self.evicted_bytes += entry.size
+            await self._flush_locked()
+        if freed:
+            logger.info(
+                f"[媒体缓存] 淘汰 {freed / 1024 / 1024:.2f} MB, 统计: {self.stats()}"
+            )
+        return freed
+
+    def _forget(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry.size
+        self._dirty.discard(key)
+        self._removed.add(key)
+
+    def _unlink_many(self, entries: list[MediaEntry]) -> None:
+        for entry in entries:
+            # 挑选之后才被 pin 住的文件保留
+            if entry.key in self._pins:
+                continue
+            path = self.root / entry.key
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                logger.warning(f"删除 {path} 失败")
+
+    # ---------- 持久化与对账 ----------
+
+    async def load(self) -> None:
+        """打开索引库并与磁盘对账"""
+        async with self._lock:
+            rows = await asyncio.to_thread(self._open_db)
+            for key, url, size, atime, hits in rows:
+                self._entries[key] = MediaEntry(key, size, atime, url, hits)
+            self.total_bytes = sum(e.size for e in self._entries.values())
+        await self.rescan()
+        logger.info(f"[媒体缓存] 索引已加载: {self.stats()}")
+
+    async def rescan(self) -> None:
+        """扫描磁盘：收录未登记的文件，移除已不存在的记录"""
+        scanned = await asyncio.to_thread(self._scan_disk)
+        async with self._lock:
+            for key in list(self._entries):
+                if key not in scanned:
+                    self._forget(key)
+            for key, (size, mtime) in scanned.items():
+                entry = self._entries.get(key)
+                if entry is None:
+                    self._entries[key] = MediaEntry(key, size, mtime)
+                    self.total_bytes += size
+                    self._dirty.add(key)
+                elif entry.size != size:
+                    self.total_bytes += size - entry.size
+                    entry.size = size
+                    self._dirty.add(key)
+            await self._flush_locked()
+        self._maybe_evict()
+
+    def _scan_disk(self) -> dict[str, tuple[int, float]]:
+        scanned: dict[str, tuple[int, float]] = {}
+        if not self.root.exists():
+            return scanned
+        expire_before = time.time() - self.PART_EXPIRE
+        for path in self.root.rglob("*"):
+            try:
+                if not path.is_file():
+                    continue
+                st = path.stat()
+                if path.suffix in self.PART_SUFFIXES:
+                    if st.st_mtime < expire_before:
+                        path.unlink(missing_ok=True)
+                    continue
+            except OSError:
+                continue
+            scanned[path.relative_to(self.root).as_posix()] = (st.st_size, st.st_mtime)
+        return scanned
+
+    def _open_db(self) -> list[tuple]:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+            "key TEXT PRIMARY KEY, url TEXT, size INTEGER, atime REAL, hits INTEGER)"
+        )
+        self._conn = conn
+        return conn.execute(
+            f"SELECT key, url, size, atime, hits FROM {self.TABLE}"
+        ).fetchall()
+
+    async def flush(self) -> None:
+        """把内存中的变更写回索引库"""
+        async with self._lock:
+            await self._flush_locked()
+
+    async def _flush_locked(self) -> None:
+        if self._conn is None or not (self._dirty or self._removed):
+            return
+        upserts = [
+            (e.key, e.url, e.size, e.atime, e.hits)
+            for key in self._dirty
+            if (e := self._entries.get(key)) is not None
+        ]
+        removed = [(key,) for key in self._removed]
+        self._dirty.clear()
+        self._removed.clear()
+        await asyncio.to_thread(self._write_db, upserts, removed)
+
+    def _write_db(self, upserts: list[tuple], removed: list[tuple]) -> None:
+        assert self._conn is not None
+        with self._conn:
+            if removed:
+                self._conn.executemany(
+                    f"DELETE FROM {self.TABLE} WHERE key = ?", removed
+                )
+            if upserts:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.TABLE} VALUES (?, ?, ?, ?, ?)",
+                    upserts,
+                )
+
+    async def close(self) -> None:
+        if self._evict_task and not self._evict_task.done():
+            self._evict_task.cancel()
+        async with self._lock:
+            await self._flush_locked()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,20 +1,17 @@
-import asyncio
 import json
 import re
 import time
+from functools import partial
 from pathlib import Path
 from typing import ClassVar
 
-import aiofiles
 from aiohttp import ClientError
 
-from astrbot.api import logger
-
 from ..config import PluginConfig
 from ..cookie import CookieJar
+from ..data import LazyPath
 from ..download import Downloader
-from ..exception import DownloadException, ParseException
-from ..utils import safe_unlink
+from ..exception import ParseException
 from .base import BaseParser, Platform, handle
 
 
@@ -48,7 +45,7 @@ class AcfunParser(BaseParser):
         text = f"简介: {description}"
 
         # 下载视频
-        video_task = asyncio.create_task(self.download_video(m3u8_url, acid))
+        video_task = LazyPath(partial(self.download_video, m3u8_url, acid), m3u8_url)
 
         return self.result(
             title=title,
@@ -106,59 +103,6 @@ class AcfunParser(BaseParser):
         Returns:
             Path: 下载的mp4文件
         """
-
-        m3u8_full_urls = await self._parse_m3u8(m3u8s_url)
-        video_file = self.cfg.cache_dir / f"acfun_{acid}.mp4"
-        if video_file.exists():
-            return video_file
-
-        try:
-            async with aiofiles.open(video_file, "wb") as f:
-                with self.downloader.get_progress_bar(video_file.name) as bar:
-                    total = 0
-                    for url in m3u8_full_urls:
-                        async with self.session.get(url, headers=self.headers) as resp:
-                            if resp.status >= 400:
-                                raise ClientError(f"{resp.status} {resp.reason}")
-                            async for chunk in resp.content.iter_chunked(1024 * 1024):
-                                await f.write(chunk)
-                                total += len(chunk)
-                                bar.update(len(chunk))
-                                if total > self.cfg.max_size:  # 大小截断
-                                    break
-                        if total > self.cfg.max_size:
-                            break
-
-        except ClientError:
-            await safe_unlink(video_file)
-            logger.exception("视频下载失败")
-            raise DownloadException("视频下载失败")
-        return video_file
-
-    async def _parse_m3u8(self, m3u8_url: str):
-        """解析m3u8链接
-
-        Args:
-            m3u8_url (str): m3u8链接
-
-        Returns:
-            list[str]: 视频链接
-        """
-        async with self.session.get(m3u8_url, headers=self.headers) as resp:
-            if resp.status >= 400:
-                raise ClientError(f"{resp.status} {resp.reason}")
-            m3u8_file = await resp.text()
-        # 分离ts文件链接
-        raw_pieces = re.split(r"\n#EXTINF:.{8},\n", m3u8_file)
-        # 过滤头部\
-        m3u8_relative_links = raw_pieces[1:]
-
-        # 修改尾部 去掉尾部多余的结束符
-        patched_tail = m3u8_relative_links[-1].split("\n")[0]
-        m3u8_relative_links[-1] = patched_tail
-
-        # 完整链接，直接加 m3u8Url 的通用前缀
-        m3u8_prefix = "/".join(m3u8_url.split("/")[0:-1])
-        m3u8_full_urls = [f"{m3u8_prefix}/{d}" for d in m3u8_relative_links]
-
-        return m3u8_full_urls
+        return await self.downloader.download_hls(
+            m3u8s_url, file_name=f"acfun_{acid}.mp4", headers=self.headers
+        )
@@ -1,13 +1,15 @@
 """Parser 基类定义"""
 
 from abc import ABC
-from asyncio import Task, TimeoutError, sleep
+from asyncio import Task, sleep
 from collections.abc import Callable, Coroutine
+from functools import partial
 from pathlib import Path
 from re import Match, Pattern, compile
 from typing import TYPE_CHECKING, Any, ClassVar, TypeVar, cast
 
-from aiohttp import ClientError, ClientSession, ClientTimeout
+from aiohttp import ClientError, ClientSession
+from curl_cffi.requests import AsyncSession as CurlSession
 from typing_extensions import Unpack
 
 from ..config import ParserItem, PluginConfig
@@ -19,6 +21,7 @@ from ..data import (
     FileContent,
     GraphicsContent,
     ImageContent,
+    LazyPath,
     ParseResult,
     ParseResultKwargs,
     Platform,
@@ -26,6 +29,8 @@ from ..data import (
 )
 from ..download import Downloader
 from ..exception import ParseException, RedirectException
+from ..scheduler import DownloadPriority
+from ..utils import TIMEOUT_ERRORS
 
 T = TypeVar("T", bound="BaseParser")
 HandlerFunc = Callable[[T, Match[str]], Coroutine[Any, Any, ParseResult]]
@@ -63,6 +68,12 @@ class BaseParser:
     platform: ClassVar[Platform]
     """ 平台信息（包含名称和显示名称） """
 
+    _resource_key_defaults: ClassVar[dict[str, str]] = {}
+    """ 资源键中命名分组的缺省值，如分 P 页码缺省为 1 """
+
+    _resource_key_ignores: ClassVar[frozenset[str]] = frozenset()
+    """ 不参与资源键的命名分组，如携带分享 token 的查询串 """
+
     if TYPE_CHECKING:
         _key_patterns: ClassVar[KeyPatterns]
         _handlers: ClassVar[dict[str, HandlerFunc]]
@@ -74,7 +85,9 @@ class BaseParser:
         self.cfg = config
         self.data_dir = self.cfg.data_dir
         self.downloader = downloader
+        self.http = downloader.http
         self._session: ClientSession | None = None
+        self._curl_sessions: dict[tuple[str, str | None], CurlSession] = {}
 
     @property
     def proxy(self) -> str | None:
@@ -115,18 +128,39 @@ class BaseParser:
 
     @property
     def session(self) -> ClientSession:
-        """获取当前实例的 session，惰性创建"""
+        """获取当前实例的 session，惰性创建（底层连接池全局共享）"""
         if self._session is None or self._session.closed:
-            self._session = ClientSession(
-                proxy=self.proxy, timeout=ClientTimeout(total=self.cfg.common_timeout)
-            )
+            self._session = self.http.session(proxy=self.proxy)
         return self._session
 
+    def curl_session(self, impersonate: str) -> CurlSession:
+        """获取当前实例的 curl_cffi 异步会话，按 (浏览器指纹, 代理) 惰性创建并复用
+
+        - 复用连接和 TLS 会话，请求走异步 I/O，不占用线程
+        - 同一会话同时在途的请求不超过 curl_max_clients 个，超出的在事件循环上排队
+        - 不保留服务端下发的 cookie，每个请求只带显式传入的 cookie（与单次请求一致）
+        """
+        key = (impersonate, self.proxy)
+        session = self._curl_sessions.get(key)
+        if session is None:
+            session = CurlSession(
+                impersonate=impersonate,  # type: ignore[arg-type]
+                proxy=self.proxy,
+                timeout=self.cfg.common_timeout,
+                max_clients=self.cfg.curl_max_clients,
+                discard_cookies=True,
+            )
+            self._curl_sessions[key] = session
+        return session
+
     async def close_session(self) -> None:
-        """关闭当前实例的 session"""
+        """关闭当前实例的 session（含 curl_cffi 会话）"""
         if self._session and not self._session.closed:
             await self._session.close()
             self._session = None
+        sessions, self._curl_sessions = self._curl_sessions, {}
+        for session in sessions.values():
+            await session.close()
 
     async def parse(self, keyword: str, searched: Match[str]) -> ParseResult:
         """解析 URL 提取信息
@@ -143,6 +177,31 @@ class BaseParser:
         """
         return await self._handlers[keyword](self, searched)
 
+    def get_resource_key(self, keyword: str, searched: Match[str]) -> str:
+        """将匹配到的链接规范化为跨会话的资源键
+
+        由处理器名 + 命名分组（如 bvid、vid、mid）组成，
+        无命名分组时（短链等）退化为整条匹配文本
+
+        Args:
+            keyword: 关键词
+            searched: 正则表达式匹配对象
+
+        Returns:
+            str: 资源键，形如 bilibili:_parse_bv:bvid=BV1xx411c7mD,page_num=1
+        """
+        handler = self._handlers[keyword]
+        if searched.re.groupindex:
+            groups = self._resource_key_defaults | {
+                k: v
+                for k, v in searched.groupdict().items()
+                if v is not None and k not in self._resource_key_ignores
+            }
+            ident = ",".join(f"{k}={groups[k]}" for k in sorted(groups))
+        else:
+            ident = searched.group(0)
+        return f"{self.platform.name}:{handler.__name__}:{ident}"
+
     async def parse_with_redirect(
         self,
         url: str,
@@ -188,7 +247,7 @@ class BaseParser:
                     if resp.status >= 400:
                         raise ClientError(f"redirect check {resp.status} {resp.reason}")
                     return resp.headers.get("Location", url)
-            except (ClientError, TimeoutError):
+            except (ClientError, *TIMEOUT_ERRORS):
                 if attempt < retries:
                     await sleep(1 + attempt)
                     continue
@@ -213,13 +272,31 @@ class BaseParser:
                             f"final url check {resp.status} {resp.reason}"
                         )
                     return str(resp.url)
-            except (ClientError, TimeoutError):
+            except (ClientError, *TIMEOUT_ERRORS):
                 if attempt < retries:
                     await sleep(1 + attempt)
                     continue
                 raise RedirectException()
         raise RedirectException()
 
+    def _lazy_img(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        priority: DownloadPriority = DownloadPriority.IMAGE,
+    ) -> LazyPath:
+        """图片的延迟下载描述，真正用到时才发起下载"""
+        return LazyPath(
+            partial(
+                self.downloader.download_img,
+                url,
+                headers=headers or self.headers,
+                proxy=self.proxy,
+                priority=priority,
+            ),
+            url,
+        )
+
     def create_author(
         self,
         name: str,
@@ -227,49 +304,49 @@ class BaseParser:
         description: str | None = None,
         headers: dict[str, str] | None = None,
     ):
-        """创建作者对象"""
+        """创建作者对象，头像在渲染卡片时才下载"""
 
-        avatar_task = None
+        avatar = None
         if avatar_url:
-            avatar_task = self.downloader.download_img(
-                avatar_url, headers=headers or self.headers, proxy=self.proxy
-            )
-        return Author(name=name, avatar=avatar_task, description=description)
+            avatar = self._lazy_img(avatar_url, headers, DownloadPriority.CARD)
+        return Author(name=name, avatar=avatar, description=description)
 
     def create_video_content(
         self,
-        url_or_task: str | Task[Path],
+        url_or_task: str | Task[Path] | LazyPath,
         cover_url: str | None = None,
         duration: float = 0.0,
         headers: dict[str, str] | None = None,
     ):
         """创建视频内容"""
-        cover_task = None
+        cover = None
         if cover_url:
-            cover_task = self.downloader.download_img(
-                cover_url, headers=headers or self.headers, proxy=self.proxy
-            )
+            cover = self._lazy_img(cover_url, headers, DownloadPriority.CARD)
         if isinstance(url_or_task, str):
-            url_or_task = self.downloader.download_video(
-                url_or_task, headers=headers or self.headers, proxy=self.proxy
+            url_or_task = LazyPath(
+                partial(
+                    self.downloader.download_video,
+                    url_or_task,
+                    headers=headers or self.headers,
+                    proxy=self.proxy,
+                ),
+                url_or_task,
             )
 
-        return VideoContent(url_or_task, cover_task, duration)
+        return VideoContent(url_or_task, cover, duration)
 
     def create_video_content_by_task(
         self,
-        path_task: Task[Path],
+        path_task: Task[Path] | LazyPath,
         cover_url: str | None = None,
         duration: float = 0.0,
         headers: dict[str, str] | None = None,
     ):
         """创建视频内容，允许调用方自行决定下载任务实现"""
-        cover_task = None
+        cover = None
         if cover_url:
-            cover_task = self.downloader.download_img(
-                cover_url, headers=headers or self.headers, proxy=self.proxy
-            )
-        return VideoContent(path_task, cover_task, duration)
+            cover = self._lazy_img(cover_url, headers, DownloadPriority.CARD)
+        return VideoContent(path_task, cover, duration)
 
     def create_image_contents(
         self,
@@ -277,13 +354,7 @@ class BaseParser:
         headers: dict[str, str] | None = None,
     ):
         """创建图片内容列表"""
-        contents: list[ImageContent] = []
-        for url in image_urls:
-            task = self.downloader.download_img(
-                url, headers=headers or self.headers, proxy=self.proxy
-            )
-            contents.append(ImageContent(task))
-        return contents
+        return [ImageContent(self._lazy_img(url, headers)) for url in image_urls]
 
     def create_dynamic_contents(
         self,
@@ -293,22 +364,34 @@ class BaseParser:
         """创建动态图片内容列表"""
         contents: list[DynamicContent] = []
         for url in dynamic_urls:
-            task = self.downloader.download_video(
-                url, headers=headers or self.headers, proxy=self.proxy
+            lazy = LazyPath(
+                partial(
+                    self.downloader.download_video,
+                    url,
+                    headers=headers or self.headers,
+                    proxy=self.proxy,
+                ),
+                url,
             )
-            contents.append(DynamicContent(task))
+            contents.append(DynamicContent(lazy))
         return contents
 
     def create_audio_content(
         self,
-        url_or_task: str | Task[Path],
+        url_or_task: str | Task[Path] | LazyPath,
         duration: float = 0.0,
         headers: dict[str, str] | None = None,
     ):
         """创建音频内容"""
         if isinstance(url_or_task, str):
-            url_or_task = self.downloader.download_audio(
-                url_or_task, headers=headers or self.headers, proxy=self.proxy
+            url_or_task = LazyPath(
+                partial(
+                    self.downloader.download_audio,
+                    url_or_task,
+                    headers=headers or self.headers,
+                    proxy=self.proxy,
+                ),
+                url_or_task,
             )
 
         return AudioContent(url_or_task, duration)
@@ -321,24 +404,25 @@ class BaseParser:
         headers: dict[str, str] | None = None,
     ):
         """创建图文内容 图片不能为空 文字可空 渲染时文字在前 图片在后"""
-        image_task = self.downloader.download_img(
-            image_url, headers=headers or self.headers, proxy=self.proxy
-        )
-        return GraphicsContent(image_task, text, alt)
+        return GraphicsContent(self._lazy_img(image_url, headers), text, alt)
 
     def create_file_content(
         self,
-        url_or_task: str | Task[Path],
+        url_or_task: str | Task[Path] | LazyPath,
         name: str | None = None,
         headers: dict[str, str] | None = None,
     ):
         """创建文件内容"""
         if isinstance(url_or_task, str):
-            url_or_task = self.downloader.download_file(
+            url_or_task = LazyPath(
+                partial(
+                    self.downloader.download_file,
+                    url_or_task,
+                    headers=headers or self.headers,
+                    file_name=name,
+                    proxy=self.proxy,
+                ),
                 url_or_task,
-                headers=headers or self.headers,
-                file_name=name,
-                proxy=self.proxy,
             )
 
         return FileContent(url_or_task)
@@ -1,4 +1,3 @@
-import asyncio
 from re import Match
 from typing import ClassVar
 
@@ -10,8 +9,9 @@ from msgspec import convert
 from astrbot.api import logger
 
 from ...config import PluginConfig
-from ...data import ImageContent, MediaContent, Platform
+from ...data import LazyPath, MediaContent, Platform
 from ...exception import DownloadException, DurationLimitException
+from ...scheduler import DownloadPriority
 from ..base import (
     BaseParser,
     Downloader,
@@ -30,6 +30,7 @@ request_settings.set("impersonate", "chrome131")
 class BilibiliParser(BaseParser):
     # 平台信息
     platform: ClassVar[Platform] = Platform(name="bilibili", display_name="B站")
+    _resource_key_defaults: ClassVar[dict[str, str]] = {"page_num": "1"}
 
     def __init__(self, config: PluginConfig, downloader: Downloader):
         super().__init__(config, downloader)
@@ -191,11 +192,11 @@ class BilibiliParser(BaseParser):
                     file_name=output_path.name,
                     headers=self.headers,
                     proxy=self.proxy,
+                    priority=DownloadPriority.VIDEO,
                 )
 
-        video_task = asyncio.create_task(download_video())
         video_content = self.create_video_content(
-            video_task,
+            LazyPath(download_video, url),
             page_info.cover,
             page_info.duration,
         )
@@ -227,11 +228,7 @@ class BilibiliParser(BaseParser):
 
         # 下载图片
         contents: list[MediaContent] = []
-        for image_url in dynamic_info.image_urls:
-            img_task = self.downloader.download_img(
-                image_url, headers=self.headers, proxy=self.proxy
-            )
-            contents.append(ImageContent(img_task))
+        contents.extend(self.create_image_contents(dynamic_info.image_urls))
 
         return self.result(
             title=dynamic_info.title,
@@ -317,17 +314,11 @@ class BilibiliParser(BaseParser):
         contents: list[MediaContent] = []
         # 下载封面
         if cover := room_data.cover:
-            cover_task = self.downloader.download_img(
-                cover, headers=self.headers, proxy=self.proxy
-            )
-            contents.append(ImageContent(cover_task))
+            contents.extend(self.create_image_contents([cover]))
 
         # 下载关键帧
         if keyframe := room_data.keyframe:
-            keyframe_task = self.downloader.download_img(
-                keyframe, headers=self.headers, proxy=self.proxy
-            )
-            contents.append(ImageContent(keyframe_task))
+            contents.extend(self.create_image_contents([keyframe]))
 
         author = self.create_author(room_data.name, room_data.avatar)
 
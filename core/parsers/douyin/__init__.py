@@ -1,15 +1,18 @@
+import asyncio
 import re
+import time
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, ClassVar
 from urllib.parse import urlparse
 
 import msgspec
-from aiohttp import ClientError
+from aiohttp import ClientError, ClientTimeout
 
 from astrbot.api import logger
 
 from ...config import PluginConfig
 from ...cookie import CookieJar
+from ...utils import TIMEOUT_ERRORS, LimitedSizeDict
 from ..base import (
     BaseParser,
     Downloader,
@@ -32,7 +35,12 @@ class ProbedVideo:
 class DouyinParser(BaseParser):
     # 平台信息
     platform: ClassVar[Platform] = Platform(name="douyin", display_name="抖音")
+    _resource_key_defaults: ClassVar[dict[str, str]] = {"ty": "video"}
     PLAY_RATIOS: ClassVar[tuple[str, ...]] = ("1080p", "720p", "540p", "360p")
+    PROBE_TIMEOUT: ClassVar[float] = 3.0
+    """单个清晰度探测的超时秒数"""
+    PROBE_CACHE_TTL: ClassVar[float] = 600
+    """探测结果缓存秒数（play 直链带签名，不宜缓存过久）"""
     TTWID_REGISTER_URL: ClassVar[str] = (
         "https://ttwid.bytedance.com/ttwid/union/register/"
     )
@@ -42,6 +50,10 @@ class DouyinParser(BaseParser):
         self.mycfg = config.parser.douyin
         self.cookiejar = CookieJar(config, self.mycfg, domain="douyin.com")
         self._set_cookies()
+        # video_id -> (过期时间, 探测结果)
+        self._probe_cache: LimitedSizeDict[str, tuple[float, ProbedVideo]] = (
+            LimitedSizeDict(max_size=64)
+        )
 
     def _set_cookies(self, cookies_str: str = ""):
         """设置cookie到请求头"""
@@ -146,7 +158,7 @@ class DouyinParser(BaseParser):
                 self.cookiejar.update_from_response(set_cookie_headers)
                 self._set_cookies()
                 body = await resp.json(content_type=None)
-        except (ClientError, TimeoutError, ValueError) as e:
+        except (ClientError, *TIMEOUT_ERRORS, ValueError) as e:
             raise ParseException("ttwid register failed") from e
 
         if not isinstance(body, dict):
@@ -166,7 +178,7 @@ class DouyinParser(BaseParser):
                     set_cookie_headers = resp.headers.getall("Set-Cookie", [])
                     self.cookiejar.update_from_response(set_cookie_headers)
                     self._set_cookies()
-            except (ClientError, TimeoutError) as e:
+            except (ClientError, *TIMEOUT_ERRORS) as e:
                 raise ParseException("ttwid callback failed") from e
 
         if not self._has_ttwid():
@@ -288,41 +300,91 @@ class DouyinParser(BaseParser):
         headers["Referer"] = referer
         return headers
 
-    async def probe_video_url(self, video_id: str, referer: str) -> ProbedVideo:
-        probed_by_size: dict[int, ProbedVideo] = {}
-
+    async def _probe_ratio(
+        self, video_id: str, ratio: str, referer: str
+    ) -> ProbedVideo | None:
+        """探测单个清晰度的直链与文件大小，失败返回 None"""
+        play_url = self._build_play_url(video_id, ratio)
+        headers = self._build_media_headers(referer)
+        headers["Range"] = "bytes=0-1"
+        try:
+            async with self.session.get(
+                play_url,
+                headers=headers,
+                allow_redirects=True,
+                timeout=ClientTimeout(total=self.PROBE_TIMEOUT),
+            ) as resp:
+                if resp.status >= 400:
+                    logger.debug(
+                        f"[抖音] ratio={ratio} 探测失败，状态码: {resp.status}"
+                    )
+                    return None
+                size = self._extract_response_size(resp.headers)
+                if size <= 0:
+                    logger.debug(f"[抖音] ratio={ratio} 未拿到有效文件大小")
+                    return None
+                final_url = str(resp.url)
+        except (ClientError, *TIMEOUT_ERRORS) as e:
+            logger.debug(f"[抖音] ratio={ratio} 探测请求失败: {e!r}")
+            return None
+        return ProbedVideo(final_url, size, self._build_media_headers(referer))
+
+    def _pick_probed(
+        self, results: dict[str, ProbedVideo | None]
+    ) -> ProbedVideo | None:
+        """按清晰度优先级挑选未超过大小限制的结果
+
+        更高优先级的清晰度尚未返回时不作决定（返回 None）；
+        全部返回但都超限时取最小的一个，都失败则返回 None
+        """
         for ratio in self.PLAY_RATIOS:
-            play_url = self._build_play_url(video_id, ratio)
-            headers = self._build_media_headers(referer)
-            headers["Range"] = "bytes=0-1"
-            try:
-                async with self.session.get(
-                    play_url,
-                    headers=headers,
-                    allow_redirects=True,
-                ) as resp:
-                    if resp.status >= 400:
-                        logger.debug(
-                            f"[抖音] ratio={ratio} 探测失败，状态码: {resp.status}"
-                        )
-                        continue
-                    size = self._extract_response_size(resp.headers)
-                    if size <= 0:
-                        logger.debug(f"[抖音] ratio={ratio} 未拿到有效文件大小")
-                        continue
-                    final_url = str(resp.url)
-            except (ClientError, TimeoutError) as e:
-                logger.debug(f"[抖音] ratio={ratio} 探测请求失败: {e}")
-                continue
-
-            probed_by_size.setdefault(
-                size, ProbedVideo(final_url, size, self._build_media_headers(referer))
-            )
+            if ratio not in results:
+                return None
+            probed = results[ratio]
+            if probed and probed.size <= self.cfg.max_size:
+                return probed
+        valid = [p for p in results.values() if p]
+        return min(valid, key=lambda p: p.size) if valid else None
+
+    async def probe_video_url(self, video_id: str, referer: str) -> ProbedVideo:
+        """并发探测各清晰度，首选清晰度可用时立即返回并取消其余探测"""
+        if cached := self._probe_cache.get(video_id):
+            expire_at, probed = cached
+            if expire_at > time.monotonic():
+                logger.debug(f"[抖音] play 端点探测命中缓存: {video_id}")
+                return ProbedVideo(
+                    probed.url, probed.size, self._build_media_headers(referer)
+                )
+            self._probe_cache.pop(video_id, None)
 
-        if not probed_by_size:
+        tasks = {
+            asyncio.create_task(self._probe_ratio(video_id, ratio, referer)): ratio
+            for ratio in self.PLAY_RATIOS
+        }
+        results: dict[str, ProbedVideo | None] = {}
+        chosen: ProbedVideo | None = None
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    results[tasks[task]] = task.result()
+                if (chosen := self._pick_probed(results)) is not None:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if chosen is None:
             raise ParseException("can't probe play endpoint")
 
-        return max(probed_by_size.values(), key=lambda item: item.size)
+        self._probe_cache[video_id] = (
+            time.monotonic() + self.PROBE_CACHE_TTL,
+            chosen,
+        )
+        return chosen
 
     @staticmethod
     def _extract_response_size(headers) -> int:
@@ -74,22 +74,22 @@ class ExampleParser(BaseParser):
 
 author = self.create_author(
     name="作者名",
-    avatar_url="https://example.com/avatar.jpg",   # 可选，会自动下载
+    avatar_url="https://example.com/avatar.jpg",   # 可选，渲染卡片时才下载
     description="个性签名"                          # 可选
 )
 
 
 # 构建视频内容
 
-## 方式1：传入 URL，自动下载
+## 方式1：传入 URL，发送/渲染真正用到时才下载
 video = self.create_video_content(
     url_or_task="https://example.com/video.mp4",
     cover_url="https://example.com/cover.jpg",  # 可选
     duration=120.5                               # 可选，单位：秒
 )
 
-## 方式2：传入已创建的下载任务
-video_task = self.download.download_video(url, ext_headers=self.headers)
+## 方式2：传入自定义的延迟下载（LazyPath，工厂返回 Task 或协程）
+video_task = LazyPath(partial(self.downloader.download_video, url, headers=self.headers), url)
 video = self.create_video_content(
     url_or_task=video_task,
     cover_url=cover_url,
@@ -97,7 +97,7 @@ video = self.create_video_content(
 )
 
 
-# 并发下载图集内容
+# 构建图集内容（只有卡片上显示的、实际发送的图片才会下载）
 images = self.create_image_contents([
     "https://example.com/img1.jpg",
     "https://example.com/img2.jpg",
@@ -4,17 +4,16 @@ import html
 import json
 import re
 import sys
+from functools import partial
 from pathlib import Path
 from typing import Any, ClassVar
 from urllib.parse import urlparse
 
-import yt_dlp
-
 from astrbot.api import logger
 
 from ..config import PluginConfig
 from ..cookie import CookieJar
-from ..data import ImageContent, Platform, VideoContent
+from ..data import ImageContent, LazyPath, Platform, VideoContent
 from ..download import Downloader
 from ..exception import ParseException
 from .base import BaseParser, handle
@@ -105,22 +104,16 @@ class InstagramParser(BaseParser):
     async def _fetch_ytdlp_info(
         self, url: str, max_attempts: int = 3
     ) -> dict[str, Any] | None:
-        opts = {
-            "quiet": True,
-            "skip_download": True,
-            "http_headers": {**self.headers, "Referer": "https://www.instagram.com/"},
-        }
+        headers = {**self.headers, "Referer": "https://www.instagram.com/"}
         cookie_header = self.cookiejar.get_cookie_header()
         if cookie_header:
-            opts["http_headers"]["Cookie"] = cookie_header
-        if self.cookiejar.cookie_file.exists():
-            opts["cookiefile"] = str(self.cookiejar.cookie_file)
+            headers["Cookie"] = cookie_header
         for attempt in range(1, max_attempts + 1):
             try:
-                with yt_dlp.YoutubeDL(opts) as ydl:  # type: ignore
-                    raw = await asyncio.to_thread(ydl.extract_info, url, download=False)
-                if isinstance(raw, dict):
-                    return raw  # type: ignore
+                return await self.downloader.ytdlp_extract_raw(
+                    url, cookiefile=self.cookiejar.cookie_file, headers=headers
+                )
+            except ParseException:
                 return None
             except Exception as exc:
                 logger.warning(
@@ -349,11 +342,15 @@ class InstagramParser(BaseParser):
                         if shortcode
                         else None
                     )
-                    image_task = self.downloader.download_img(
+                    image_task = LazyPath(
+                        partial(
+                            self.downloader.download_img,
+                            image_url,
+                            img_name=image_name,
+                            headers=self.headers,
+                            proxy=self.proxy,
+                        ),
                         image_url,
-                        img_name=image_name,
-                        headers=self.headers,
-                        proxy=self.proxy,
                     )
                     contents.append(ImageContent(image_task))
                 return self.result(contents=contents, url=final_url)
@@ -391,12 +388,16 @@ class InstagramParser(BaseParser):
                     if output_path.exists():
                         video_task = output_path
                     else:
-                        video_task = self.downloader.download_av_and_merge(
+                        video_task = LazyPath(
+                            partial(
+                                self.downloader.download_av_and_merge,
+                                video_url,
+                                audio_url,
+                                output_path=output_path,
+                                headers=self.headers,
+                                proxy=self.proxy,
+                            ),
                             video_url,
-                            audio_url,
-                            output_path=output_path,
-                            headers=self.headers,
-                            proxy=self.proxy,
                         )
                     contents.append(VideoContent(video_task, cover_task, duration))
                 else:
@@ -408,12 +409,16 @@ class InstagramParser(BaseParser):
                         if output_path.exists():
                             video_task = output_path
                         else:
-                            video_task = self.downloader.download_av_and_merge(
+                            video_task = LazyPath(
+                                partial(
+                                    self.downloader.download_av_and_merge,
+                                    v_url,
+                                    a_url,
+                                    output_path=output_path,
+                                    headers=self.headers,
+                                    proxy=self.proxy,
+                                ),
                                 v_url,
-                                a_url,
-                                output_path=output_path,
-                                headers=self.headers,
-                                proxy=self.proxy,
                             )
                         contents.append(VideoContent(video_task, cover_task, duration))
                         if meta_entry is None:
@@ -463,11 +468,15 @@ class InstagramParser(BaseParser):
                         if shortcode
                         else None
                     )
-                    image_task = self.downloader.download_img(
+                    image_task = LazyPath(
+                        partial(
+                            self.downloader.download_img,
+                            image_url,
+                            img_name=image_name,
+                            headers=self.headers,
+                            proxy=self.proxy,
+                        ),
                         image_url,
-                        img_name=image_name,
-                        headers=self.headers,
-                        proxy=self.proxy,
                     )
                     contents.append(ImageContent(image_task))
             if not contents:
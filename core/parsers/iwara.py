@@ -1,5 +1,6 @@
 import hashlib
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from re import Match
 from typing import ClassVar
@@ -9,7 +10,14 @@ from curl_cffi import requests as curl_requests
 from PIL import Image, ImageFilter
 
 from ..config import PluginConfig
-from ..data import ImageContent, ParseResult, Platform, TextContent, VideoContent
+from ..data import (
+    ImageContent,
+    LazyPath,
+    ParseResult,
+    Platform,
+    TextContent,
+    VideoContent,
+)
 from ..download import Downloader
 from ..exception import ParseException
 from .base import BaseParser, handle
@@ -218,7 +226,9 @@ class IwaraParser(BaseParser):
         send_info = f"视频描述: {video_body}\n\nTAG: {', '.join(f'#{tag}' for tag in video_tags)}"
 
         video_contents = VideoContent(
-            path_task=self.downloader.download_video(video_url),
+            path_task=LazyPath(
+                partial(self.downloader.download_video, video_url), video_url
+            ),
             cover=video_thumbnail_img if video_thumbnail_img else None,
             duration=video_duration,
         )
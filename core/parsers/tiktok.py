@@ -1,10 +1,12 @@
 import re
+from functools import partial
 from typing import ClassVar
 
 from ..config import PluginConfig
 from ..cookie import CookieJar
-from ..data import Author, Platform, VideoContent
+from ..data import Author, LazyPath, Platform, VideoContent
 from ..download import Downloader
+from ..scheduler import DownloadPriority
 from .base import BaseParser, handle
 
 
@@ -29,20 +31,26 @@ class TikTokParser(BaseParser):
             url = await self.get_redirect_url(url)
 
         # 获取视频信息
+        # 与下载时的参数一致，下载直接复用这次的解析结果
         video_info = await self.downloader.ytdlp_extract_info(
-            url, headers=self.headers, proxy=self.proxy
-        )
-
-        # 下载封面和视频
-        cover = self.downloader.download_img(
-            url=video_info.thumbnail, headers=self.headers, proxy=self.proxy
-        )
-        video = self.downloader.ytdlp_download_video(
             url,
             cookiefile=self.cookiejar.cookie_file,
             headers=self.headers,
             proxy=self.proxy,
-            format="best",
+        )
+
+        # 下载封面和视频
+        cover = self._lazy_img(video_info.thumbnail, priority=DownloadPriority.CARD)
+        video = LazyPath(
+            partial(
+                self.downloader.ytdlp_download_video,
+                url,
+                cookiefile=self.cookiejar.cookie_file,
+                headers=self.headers,
+                proxy=self.proxy,
+                format="best",
+            ),
+            url,
         )
 
         return self.result(
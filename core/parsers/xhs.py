@@ -15,6 +15,7 @@ from .base import BaseParser, ParseException, Platform, handle
 class XHSParser(BaseParser):
     # 平台信息
     platform: ClassVar[Platform] = Platform(name="xhs", display_name="小红书")
+    _resource_key_ignores: ClassVar[frozenset[str]] = frozenset({"query"})
 
     def __init__(self, config: PluginConfig, downloader: Downloader):
         super().__init__(config, downloader)
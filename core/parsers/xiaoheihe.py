@@ -1,17 +1,22 @@
-import asyncio
 import hashlib
 import html
 import json
 import random
 import re
 import time
+from functools import partial
 from typing import Any, ClassVar
 from urllib.parse import urlparse
 
-from curl_cffi import requests as curl_requests
-
 from ..config import PluginConfig
-from ..data import MediaContent, Platform, SendGroup, TextContent, VideoContent
+from ..data import (
+    LazyPath,
+    MediaContent,
+    Platform,
+    SendGroup,
+    TextContent,
+    VideoContent,
+)
 from ..download import Downloader
 from ..exception import ParseException
 from .base import BaseParser, handle
@@ -120,6 +125,7 @@ V4_DATA = (
 class XiaoheiheParser(BaseParser):
     platform: ClassVar[Platform] = Platform(name="xiaoheihe", display_name="小黑盒")
     CHAR_TABLE: ClassVar[str] = "AB45STUVWZEFGJ6CH01D237IXYPQRKLMN89"
+    IMPERSONATE: ClassVar[str] = "chrome131"
 
     def __init__(self, config: PluginConfig, downloader: Downloader):
         super().__init__(config, downloader)
@@ -845,8 +851,14 @@ class XiaoheiheParser(BaseParser):
         parsed = urlparse(video_url)
         path = (parsed.path or "").lower()
         if path.endswith(".m3u8"):
-            task = self.downloader.ytdlp_download_video_relaxed(
-                video_url, headers=self.headers, proxy=self.proxy
+            task = LazyPath(
+                partial(
+                    self.downloader.ytdlp_download_video_relaxed,
+                    video_url,
+                    headers=self.headers,
+                    proxy=self.proxy,
+                ),
+                video_url,
             )
             return self.create_video_content_by_task(
                 task, cover_url, headers=self.headers
@@ -1048,22 +1060,14 @@ class XiaoheiheParser(BaseParser):
         if headers:
             merged_headers.update(headers)
 
-        def do_request():
-            return curl_requests.request(
-                method,
-                url,
-                params=params,
-                json=json,
-                cookies=cookies,
-                headers=merged_headers,
-                impersonate="chrome131",
-                proxies={"https": self.proxy, "http": self.proxy}
-                if self.proxy
-                else None,
-                timeout=self.cfg.common_timeout,
-            )
-
-        response = await asyncio.to_thread(do_request)
+        response = await self.curl_session(self.IMPERSONATE).request(
+            method,  # type: ignore[arg-type]
+            url,
+            params=params,
+            json=json,
+            cookies=cookies,
+            headers=merged_headers,
+        )
         try:
             return response.json()
         except Exception as exc:
@@ -1080,18 +1084,7 @@ class XiaoheiheParser(BaseParser):
         if headers:
             merged_headers.update(headers)
 
-        def do_request():
-            return curl_requests.get(
-                url,
-                params=params,
-                headers=merged_headers,
-                impersonate="chrome131",
-                proxies={"https": self.proxy, "http": self.proxy}
-                if self.proxy
-                else None,
-                timeout=self.cfg.common_timeout,
-                allow_redirects=True,
-            )
-
-        response = await asyncio.to_thread(do_request)
+        response = await self.curl_session(self.IMPERSONATE).get(
+            url, params=params, headers=merged_headers, allow_redirects=True
+        )
         return str(response.text)
@@ -1,4 +1,5 @@
 import re
+from functools import partial
 from typing import ClassVar
 
 import msgspec
@@ -9,6 +10,7 @@ from astrbot.api import logger
 
 from ..config import PluginConfig
 from ..cookie import CookieJar
+from ..data import LazyPath
 from ..download import Downloader
 from .base import BaseParser, Platform, handle
 
@@ -42,18 +44,23 @@ class YouTubeParser(BaseParser):
             cookiefile=self.cookiejar.cookie_file,
             headers=self.headers,
             proxy=self.proxy,
+            node=True,
         )
         author = await self._fetch_author_info(video_info.channel_id)
 
         contents = []
         if video_info.duration <= self.cfg.max_duration:
-            video = self.downloader.ytdlp_download_video(
+            video = LazyPath(
+                partial(
+                    self.downloader.ytdlp_download_video,
+                    url,
+                    cookiefile=self.cookiejar.cookie_file,
+                    headers=self.headers,
+                    proxy=self.proxy,
+                    format="bv*[height<=720]+ba/b[height<=720]",
+                    node=True,
+                ),
                 url,
-                cookiefile=self.cookiejar.cookie_file,
-                headers=self.headers,
-                proxy=self.proxy,
-                format="bv*[height<=720]+ba/b[height<=720]",
-                node=True,
             )
             contents.append(
                 self.create_video_content(
@@ -84,6 +91,7 @@ class YouTubeParser(BaseParser):
             cookiefile=self.cookiejar.cookie_file,
             headers=self.headers,
             proxy=self.proxy,
+            node=True,
         )
         author = await self._fetch_author_info(video_info.channel_id)
 
@@ -91,11 +99,16 @@ class YouTubeParser(BaseParser):
         contents.extend(self.create_image_contents([video_info.thumbnail]))
 
         if video_info.duration <= self.cfg.max_duration:
-            audio_task = self.downloader.ytdlp_download_audio(
+            audio_task = LazyPath(
+                partial(
+                    self.downloader.ytdlp_download_audio,
+                    url,
+                    cookiefile=self.cookiejar.cookie_file,
+                    headers=self.headers,
+                    proxy=self.proxy,
+                    node=True,
+                ),
                 url,
-                cookiefile=self.cookiejar.cookie_file,
-                headers=self.headers,
-                proxy=self.proxy,
             )
             contents.append(
                 self.create_audio_content(audio_task, duration=video_info.duration)
@@ -2,13 +2,14 @@ from __future__ import annotations
 
 import html
 import re
+from functools import partial
 from typing import Any
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup, Tag
 from bs4.element import NavigableString
 
-from ...data import MediaContent, SendGroup, TextContent, VideoContent
+from ...data import LazyPath, MediaContent, SendGroup, TextContent, VideoContent
 from .common import BodyBlock, VideoEntry
 
 
@@ -879,10 +880,14 @@ class ZhihuContentMixin:
         request_headers: dict[str, str],
     ) -> VideoContent:
         if ".m3u8" in video_url.lower():
-            task = self.downloader.ytdlp_download_video_relaxed(
+            task = LazyPath(
+                partial(
+                    self.downloader.ytdlp_download_video_relaxed,
+                    video_url,
+                    headers=request_headers,
+                    proxy=self.proxy,
+                ),
                 video_url,
-                headers=request_headers,
-                proxy=self.proxy,
             )
             return self.create_video_content_by_task(
                 task,
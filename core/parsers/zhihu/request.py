@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-import asyncio
 import json
 from collections.abc import Callable
 from typing import Any
 
 from bs4 import BeautifulSoup
-from curl_cffi import requests as curl_requests
 
 from astrbot.api import logger
 
@@ -253,19 +251,9 @@ class ZhihuRequestMixin:
         headers: dict[str, str],
         impersonate: str,
     ) -> RequestContext:
-        def do_request():
-            return curl_requests.get(
-                url,
-                headers=headers,
-                impersonate=impersonate,
-                proxies={"https": self.proxy, "http": self.proxy}
-                if self.proxy
-                else None,
-                timeout=self.cfg.common_timeout,
-                allow_redirects=True,
-            )
-
-        response = await asyncio.to_thread(do_request)
+        response = await self.curl_session(impersonate).get(
+            url, headers=headers, allow_redirects=True
+        )
         return {
             "status_code": int(response.status_code),
             "final_url": str(response.url),
@@ -1,21 +1,32 @@
 import asyncio
+import copy
+import hashlib
 import uuid
-from collections.abc import Awaitable, Callable
-from dataclasses import dataclass
-from functools import lru_cache, wraps
-from io import BytesIO
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial, wraps
 from pathlib import Path
-from typing import ClassVar, ParamSpec, TypeVar
+from typing import Any, ClassVar, ParamSpec, TypeVar
 
 import aiofiles
-from apilmoji import Apilmoji, EmojiCDNSource
+from apilmoji import EmojiCDNSource
 from apilmoji.core import get_font_height
+from apilmoji.helper import NodeType, contains_emoji, parse_lines
 from PIL import Image, ImageDraw, ImageFont
 
 from astrbot.api import logger
 
+from .cache import CardCache
 from .config import PluginConfig
-from .data import GraphicsContent, ParseResult
+from .data import Author, GraphicsContent, ImageContent, ParseResult, VideoContent
+from .emoji_atlas import EmojiAtlas
+from .encode import CardEncoder
+from .glyph import GlyphWidths
+from .media_index import MediaCacheIndex
+from .thumbnail import ThumbnailCache
+from .utils import SingleFlight, part_path
+from .wrap import wrap_text
 
 # 定义类型变量
 P = ParamSpec("P")
@@ -57,6 +68,49 @@ def suppress_exception_async(
     return wrapper
 
 
+class RenderExecutor:
+    """
+    渲染线程池
+
+    - 图片解码、缩放、排版、绘制、编码都在这里执行，不占用事件循环
+    - 排队数有上限：超出时调用方在事件循环上异步等待，而不是把任务无限堆进线程池
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = max(1, workers)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="parser-render"
+        )
+        self._slots = asyncio.Semaphore(self.workers + max(0, queue_size))
+        self.pending = 0
+        # 指标
+        self.submitted = 0
+        self.max_pending = 0
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """在渲染线程中执行 func(*args)"""
+        async with self._slots:
+            self.pending += 1
+            self.submitted += 1
+            self.max_pending = max(self.max_pending, self.pending)
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool, partial(func, *args))
+            finally:
+                self.pending -= 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "max_pending": self.max_pending,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
 @dataclass(eq=False, frozen=True, slots=True)
 class FontInfo:
     """字体信息数据类"""
@@ -64,28 +118,15 @@ class FontInfo:
     font: ImageFont.FreeTypeFont
     line_height: int
     cjk_width: int
+    widths: GlyphWidths
+    """字形宽度表"""
 
-    def __hash__(self) -> int:
-        """实现哈希方法以支持 @lru_cache"""
-        return hash((id(self.font), self.line_height, self.cjk_width))
-
-    @lru_cache(maxsize=400)
     def get_char_width(self, char: str) -> int:
-        """获取字符宽度，使用缓存优化"""
-        # bbox = self.font.getbbox(char)
-        # width = int(bbox[2] - bbox[0])
-        # return width
-        return int(self.font.getlength(char))
-
-    def get_char_width_fast(self, char: str) -> int:
-        """快速获取单个字符宽度"""
-        if "\u4e00" <= char <= "\u9fff":
-            return self.cjk_width
-        else:
-            return self.get_char_width(char)
+        """获取单个字符宽度（查表）"""
+        return self.widths.char_width(char)
 
     def get_text_width(self, text: str) -> int:
-        """计算文本宽度，使用预计算的字符宽度优化性能
+        """计算文本宽度，整段查表求和
 
         Args:
             text: 要计算宽度的文本
@@ -93,13 +134,7 @@ class FontInfo:
         Returns:
             文本宽度（像素）
         """
-        if not text:
-            return 0
-
-        total_width = 0
-        for char in text:
-            total_width += self.get_char_width_fast(char)
-        return total_width
+        return self.widths.text_width(text)
 
 
 @dataclass(eq=False, frozen=True, slots=True)
@@ -122,14 +157,17 @@ class FontSet:
     indicator_font: FontInfo
 
     @classmethod
-    def new(cls, font_path: Path):
+    def new(cls, font_path: Path, scale: float = 1.0):
+        """加载各字号的字体，scale 用于转发卡片等缩小绘制的场景"""
         font_infos: dict[str, FontInfo] = {}
         for name, size in cls._FONT_SIZES:
+            size = round(size * scale)
             font = ImageFont.truetype(font_path, size)
             font_infos[f"{name}_font"] = FontInfo(
                 font=font,
                 line_height=get_font_height(font),
                 cjk_width=size,
+                widths=GlyphWidths(font, size),
             )
         return FontSet(**font_infos)
 
@@ -206,6 +244,20 @@ class GraphicsSectionData(SectionData):
     alt_text: str | None = None
 
 
+@dataclass(eq=False, slots=True)
+class CardMedia:
+    """卡片用到的已解码媒体，在事件循环上备齐后交给渲染线程排版绘制"""
+
+    avatar: PILImage | None = None
+    cover: PILImage | None = None
+    grid_images: list[PILImage] = field(default_factory=list)
+    graphics_images: list[PILImage | None] = field(default_factory=list)
+    """与 graphics_contents 一一对应，加载失败为 None"""
+    repost: "CardMedia | None" = None
+    complete: bool = True
+    """所有媒体均加载成功（含转发），否则卡片不进入缓存"""
+
+
 @dataclass
 class RenderContext:
     """渲染上下文，存储渲染过程中的状态信息"""
@@ -248,6 +300,8 @@ class Renderer:
     """部分间距"""
     NAME_TIME_GAP = 5
     """名称和时间之间的间距"""
+    MAX_TEXT_LINES = 200
+    """正文最多显示的行数，超出部分以省略号截断"""
     AVATAR_UPSCALE_FACTOR = 2
     """头像圆形框超采样倍数"""
 
@@ -274,6 +328,24 @@ class Renderer:
     """转发内容内边距"""
     REPOST_SCALE = 0.88
     """转发缩放比例"""
+    REPOST_RADIUS = 8
+    """转发框圆角半径"""
+    _SCALED_CONSTANTS = (
+        "PADDING",
+        "AVATAR_SIZE",
+        "AVATAR_TEXT_GAP",
+        "MAX_COVER_HEIGHT",
+        "DEFAULT_CARD_WIDTH",
+        "SECTION_SPACING",
+        "NAME_TIME_GAP",
+        "MAX_IMAGE_HEIGHT",
+        "IMAGE_3_GRID_SIZE",
+        "IMAGE_2_GRID_SIZE",
+        "IMAGE_GRID_SPACING",
+        "REPOST_PADDING",
+        "REPOST_RADIUS",
+    )
+    """转发卡片中按 REPOST_SCALE 缩放的像素常量"""
 
     # 颜色配置
     BG_COLOR: ClassVar[Color] = (255, 255, 255)
@@ -306,14 +378,43 @@ class Renderer:
     DEFAULT_VIDEO_BUTTON_PATH: ClassVar[Path] = RESOURCES_DIR / _BUTTON_FILENAME
     """默认视频按钮路径"""
 
-    def __init__(self, config: PluginConfig):
+    def __init__(self, config: PluginConfig, media_index: MediaCacheIndex):
         self.cfg = config
+        self.media_index = media_index
         self.EMOJI_SOURCE = EmojiCDNSource(
             base_url=self.cfg.emoji_cdn,
             style=self.cfg.emoji_style,
             cache_dir=self.cfg.cache_dir / self._EMOJIS,
         )
         """Emoji Source"""
+        atlas_name = hashlib.blake2b(
+            f"{self.cfg.emoji_cdn}|{self.cfg.emoji_style}".encode(), digest_size=6
+        ).hexdigest()
+        self.emoji_atlas = EmojiAtlas(self.cfg.emoji_atlas_dir, f"atlas_{atlas_name}")
+        """emoji 图集，按 CDN + 风格区分"""
+        self.executor = RenderExecutor(
+            workers=self.cfg.render_workers,
+            queue_size=self.cfg.render_queue_size,
+        )
+        """渲染线程池"""
+        self.thumbnails = ThumbnailCache(self.cfg.cache_dir)
+        """缩略图缓存"""
+        self.card_cache = CardCache(self.cfg.cache_dir, self.cfg.card_cache_bytes)
+        """渲染卡片缓存"""
+        self.encoder = CardEncoder(
+            self.cfg.card_format, self.cfg.card_png_compress_level
+        )
+        """卡片编码器"""
+        self._card_flights: SingleFlight[str, Path | None] = SingleFlight()
+        self._depth = 0
+        """转发层级，0 为主卡片"""
+        self._scaled_views: dict[int, Renderer] = {}
+        self.fingerprint = hashlib.blake2b(
+            f"{self._compute_fingerprint()}|{self.cfg.emoji_cdn}|{self.cfg.emoji_style}|"
+            f"{self.encoder.fingerprint}".encode(),
+            digest_size=8,
+        ).hexdigest()
+        """渲染器指纹，参与卡片缓存键"""
 
     @classmethod
     def load_resources(cls):
@@ -322,6 +423,12 @@ class Renderer:
         cls._load_video_button()
         cls._load_platform_logos()
 
+    def load_emoji_atlas(self) -> None:
+        """加载 emoji 图集，顺带收录 CDN 缓存目录中已下载的 emoji"""
+        self.emoji_atlas.load(
+            self.cfg.cache_dir / self._EMOJIS / self.EMOJI_SOURCE.style
+        )
+
     @classmethod
     def _load_fonts(cls):
         """预加载自定义字体"""
@@ -352,7 +459,7 @@ class Renderer:
             except Exception:
                 continue
 
-    async def text(
+    def text(
         self,
         ctx: RenderContext,
         xy: tuple[int, int],
@@ -360,27 +467,121 @@ class Renderer:
         font: FontInfo,
         fill: Color,
     ) -> int:
-        """绘制文本"""
-        await Apilmoji.text(
-            ctx.image,
-            xy,
-            lines,
-            font.font,
-            fill=fill,
-            line_height=font.line_height,
-            source=self.EMOJI_SOURCE,
+        """绘制文本（emoji 取自图集，缺失时退化为字符）"""
+        x, y = xy
+        line_height = font.line_height
+        if not contains_emoji(lines):
+            for line in lines:
+                ctx.draw.text((x, y), line, font=font.font, fill=fill)
+                y += line_height
+            return line_height * len(lines)
+
+        font_size = int(font.font.size)
+        y_diff = int((line_height - font_size) / 2)
+        for nodes in parse_lines(lines):
+            cur_x = x
+            for node in nodes:
+                content = node.content
+                if node.type is NodeType.EMOJI:
+                    if emoji_img := self.emoji_atlas.get(content, font_size):
+                        ctx.image.paste(emoji_img, (cur_x + 1, y + y_diff), emoji_img)
+                    else:
+                        # 忽略组合表情的修饰符，只渲染第一个字符
+                        ctx.draw.text((cur_x, y), content[0], font=font.font, fill=fill)
+                    cur_x += font_size
+                else:
+                    ctx.draw.text((cur_x, y), content, font=font.font, fill=fill)
+                    cur_x += int(font.font.getlength(content))
+            y += line_height
+        return line_height * len(lines)
+
+    @classmethod
+    def _iter_texts(cls, result: ParseResult) -> Iterator[str]:
+        """卡片上（含转发）会绘制的所有文本"""
+        if result.author:
+            yield result.author.name
+            if time_text := result.formatted_datetime():
+                yield time_text
+        if result.title:
+            yield result.title
+        for cont in result.graphics_contents:
+            if cont.text:
+                yield cont.text
+            if cont.alt:
+                yield cont.alt
+        if result.text:
+            yield result.text
+        if result.extra_info:
+            yield result.extra_info
+        if result.repost:
+            yield from cls._iter_texts(result.repost)
+
+    @staticmethod
+    def _collect_emojis(texts: list[str]) -> set[str]:
+        """提取文本中出现的 emoji"""
+        if not contains_emoji(texts):
+            return set()
+        return {
+            node.content
+            for nodes in parse_lines(texts)
+            for node in nodes
+            if node.type is NodeType.EMOJI
+        }
+
+    @suppress_exception_async
+    async def _fetch_emojis(self, result: ParseResult) -> set[str]:
+        """确保卡片上的 emoji 都在图集中，返回仍然缺失的 emoji
+
+        全部命中图集时不发起任何网络请求；缺失的才从 CDN 下载，并在渲染线程中回填图集
+        """
+        texts = list(self._iter_texts(result))
+        emojis = await self.executor.run(self._collect_emojis, texts)
+        missing = self.emoji_atlas.missing(emojis)
+        if not missing:
+            return missing
+        files = await self.EMOJI_SOURCE.fetch_emojis(missing)
+        await self.executor.run(self.emoji_atlas.add, files)
+        return self.emoji_atlas.missing(missing)
+
+    @property
+    def content_width(self) -> int:
+        """内容区域宽度"""
+        return self.DEFAULT_CARD_WIDTH - 2 * self.PADDING
+
+    def _repost_renderer(self) -> "Renderer":
+        """绘制下一层转发内容用的渲染器
+
+        像素常量、字体、视频按钮按 REPOST_SCALE ** 层级 缩放，转发卡片直接以最终尺寸排版绘制，
+        不再先画整张全尺寸卡片再缩小；线程池、缓存、图集等状态与主渲染器共享
+        """
+        depth = self._depth + 1
+        if (view := self._scaled_views.get(depth)) is not None:
+            return view
+        scale = self.REPOST_SCALE**depth
+        cls = type(self)
+        view = copy.copy(self)
+        for name in self._SCALED_CONSTANTS:
+            setattr(view, name, max(1, round(getattr(cls, name) * scale)))
+        view.fontset = FontSet.new(self.DEFAULT_FONT_PATH, scale)
+        button_size = round(cls.video_button_image.width * scale)
+        view.video_button_image = cls.video_button_image.resize(
+            (button_size, button_size), Image.Resampling.LANCZOS
         )
-        return font.line_height * len(lines)
+        view._depth = depth
+        # 多个渲染线程同时创建时保留先写入的一个
+        return self._scaled_views.setdefault(depth, view)
 
-    async def _create_card_image(
+    def _create_card_image(
         self,
         result: ParseResult,
+        media: CardMedia,
         not_repost: bool = True,
     ) -> PILImage:
-        """创建卡片图片（用于递归调用）
+        """创建卡片图片（用于递归调用，在渲染线程中执行）
 
         Args:
             result: 解析结果
+            media: 已解码的媒体
             not_repost: 是否为非转发内容，转发内容为 False
 
         Returns:
@@ -388,10 +589,10 @@ class Renderer:
         """
         # 计算必要参数
         card_width = self.DEFAULT_CARD_WIDTH
-        content_width = card_width - 2 * self.PADDING
+        content_width = self.content_width
 
         # 计算各部分内容的高度
-        sections = await self._calculate_sections(result, content_width)
+        sections = self._calculate_sections(result, media, content_width)
 
         # 计算总高度
         card_height = sum(section.height for section in sections)
@@ -416,19 +617,96 @@ class Renderer:
             y_pos=self.PADDING,  # 以 padding 作为起始
         )
         # 绘制各部分内容
-        await self._draw_sections(ctx, sections)
+        self._draw_sections(ctx, sections)
         return image
 
+    def _photo_area(self, media: CardMedia) -> int:
+        """卡片上照片（封面、图集、图文配图，含转发）占用的像素面积"""
+        images = [media.cover, *media.grid_images, *media.graphics_images]
+        area = sum(img.width * img.height for img in images if img is not None)
+        if media.repost is not None:
+            area += self._photo_area(media.repost)
+        return area
+
+    def _render_encoded(
+        self,
+        result: ParseResult,
+        media: CardMedia,
+    ) -> tuple[bytes, str]:
+        """排版、绘制并编码（在渲染线程中执行）
+
+        Returns:
+            (编码后的字节, 文件后缀)，格式由编码器按照片面积占比选择
+        """
+        img = self._create_card_image(result, media)
+        photo_ratio = self._photo_area(media) / (img.width * img.height)
+        return self.encoder.encode(img, photo_ratio)
+
+    @classmethod
+    def _compute_fingerprint(cls) -> str:
+        """渲染器指纹：布局常量、颜色、字体与资源文件变化时随之变化"""
+        h = hashlib.blake2b(digest_size=8)
+        for name in sorted(dir(cls)):
+            value = getattr(cls, name)
+            if name.isupper() and isinstance(value, int | float | str | tuple):
+                h.update(f"{name}={value!r}|".encode())
+        h.update(f"thumbnail={ThumbnailCache.VERSION}|".encode())
+        resources = [cls.DEFAULT_FONT_PATH, cls.DEFAULT_VIDEO_BUTTON_PATH]
+        resources += sorted(cls.LOGOS_DIR.rglob("*.png"))
+        for path in resources:
+            st = path.stat()
+            h.update(f"{path.name}:{st.st_size}:{st.st_mtime_ns}|".encode())
+        return h.hexdigest()
+
+    def _card_key(self, result: ParseResult) -> str:
+        """卡片缓存键：渲染器指纹 + 解析结果指纹 + 卡片上的文本"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(self.fingerprint.encode())
+        res: ParseResult | None = result
+        while res is not None:
+            for part in (res.get_resource_id(), res.title, res.text, res.extra_info):
+                h.update((part or "").encode())
+                h.update(b"|")
+            res = res.repost
+        return h.hexdigest()
+
     async def render_card(self, result: ParseResult) -> Path | None:
-        """渲染卡片并落盘，失败返回 None"""
-        cache = self.cfg.cache_dir / f"card_{uuid.uuid4().hex}.png"
-        try:
-            img = await self._create_card_image(result)
-            buf = BytesIO()
-            await asyncio.to_thread(img.save, buf, format="PNG")
+        """渲染卡片并落盘，失败返回 None
+
+        同一输入的卡片只渲染一次（并发请求合并，结果按内容寻址缓存）；
+        事件循环上只负责等待下载和 emoji，解码、排版、绘制、编码都在渲染线程中完成
+        """
+        key = self._card_key(result)
+        return await self._card_flights.do(key, lambda: self._render_card(result, key))
 
-            async with aiofiles.open(cache, "wb") as fp:
-                await fp.write(buf.getvalue())
+    async def _render_card(self, result: ParseResult, key: str) -> Path | None:
+        if path := self.card_cache.get_path(key):
+            self.media_index.touch(path)
+            return path
+        try:
+            if (cached := self.card_cache.get(key)) is not None:
+                data, suffix = cached
+                cache = self.card_cache.path(key, suffix)
+            else:
+                media, missing_emojis = await asyncio.gather(
+                    self._prepare_media(result, self.content_width),
+                    self._fetch_emojis(result),
+                )
+                data, suffix = await self.executor.run(
+                    self._render_encoded, result, media
+                )
+                if media.complete and missing_emojis == set():
+                    self.card_cache.set(key, data, suffix)
+                    cache = self.card_cache.path(key, suffix)
+                else:
+                    # 有媒体加载失败，不缓存这张降级的卡片
+                    cache = self.cfg.cache_dir / f"card_{uuid.uuid4().hex}{suffix}"
+
+            tmp = part_path(cache)
+            async with aiofiles.open(tmp, "wb") as fp:
+                await fp.write(data)
+            await asyncio.to_thread(tmp.replace, cache)
+            self.media_index.record(cache)
             return cache
         except Exception:
             logger.error(
@@ -436,6 +714,10 @@ class Renderer:
             )
             return None
 
+    def close(self) -> None:
+        """关闭渲染线程池"""
+        self.executor.shutdown()
+
     @suppress_exception
     def _load_and_resize_cover(
         self,
@@ -452,6 +734,8 @@ class Renderer:
             return None
 
         with Image.open(cover_path) as original_img:
+            # JPEG 直接按 1/2 ~ 1/8 缩小解码（宽度仍不小于目标宽度）
+            original_img.draft(None, (content_width, 1))
             # 转换为 RGB 模式以确保兼容性
             if original_img.mode not in ("RGB", "RGBA"):
                 cover_img = original_img.convert("RGB")
@@ -485,21 +769,30 @@ class Renderer:
             return cover_img
 
     @suppress_exception
-    def _load_and_process_avatar(self, avatar: Path | None) -> PILImage | None:
-        """加载并处理头像（圆形裁剪，带抗锯齿）"""
+    def _load_and_process_avatar(
+        self, avatar: Path | None, size: int
+    ) -> PILImage | None:
+        """加载并处理头像（圆形裁剪，带抗锯齿）
+
+        Args:
+            avatar: 头像路径
+            size: 头像边长（转发卡片中更小）
+        """
         if not avatar or not avatar.exists():
             return None
 
+        # 使用超采样技术提高质量：先缩放到目标尺寸的指定倍数
+        temp_size = size * self.AVATAR_UPSCALE_FACTOR
+
         with Image.open(avatar) as original_img:
+            # JPEG 直接按 1/2 ~ 1/8 缩小解码（仍不小于超采样尺寸）
+            original_img.draft(None, (temp_size, temp_size))
             # 转换为 RGBA 模式（用于更好的抗锯齿效果）
             if original_img.mode != "RGBA":
                 avatar_img = original_img.convert("RGBA")
             else:
                 avatar_img = original_img
 
-            # 使用超采样技术提高质量：先放大到指定倍数
-            scale = self.AVATAR_UPSCALE_FACTOR
-            temp_size = self.AVATAR_SIZE * scale
             avatar_img = avatar_img.resize(
                 (temp_size, temp_size),
                 Image.Resampling.LANCZOS,
@@ -521,21 +814,190 @@ class Renderer:
 
             # 缩小到目标尺寸（抗锯齿缩放）
             output_avatar = output_avatar.resize(
-                (self.AVATAR_SIZE, self.AVATAR_SIZE),
+                (size, size),
                 Image.Resampling.LANCZOS,
             )
 
             return output_avatar
 
-    async def _calculate_sections(
+    async def _decode(self, func: Callable[P, T], *args: P.args) -> T:
+        """在渲染线程中解码 / 缩放图片，避免阻塞事件循环"""
+        return await self.executor.run(func, *args)
+
+    async def _thumbnail(
+        self,
+        build: Callable[..., PILImage | None],
+        src: Path | None,
+        *args: Any,
+    ) -> PILImage | None:
+        """优先读取缓存的缩略图，未命中时在渲染线程中由原图生成并落盘"""
+        img, path, hit = await self._decode(
+            self.thumbnails.get_or_build, build, src, *args
+        )
+        if path is not None:
+            if hit:
+                self.media_index.touch(path)
+            else:
+                self.media_index.record(path)
+        return img
+
+    @staticmethod
+    def _first_video(result: ParseResult) -> VideoContent | None:
+        for cont in result.contents:
+            if isinstance(cont, VideoContent):
+                return cont
+        return None
+
+    async def _prepare_media(
         self, result: ParseResult, content_width: int
+    ) -> CardMedia:
+        """下载并解码卡片用到的所有媒体
+
+        头像、封面、图集、图文、转发卡片的媒体并发下载，每个到达后立即在渲染线程中解码，
+        耗时约为最慢的一次下载 + 一次解码
+        """
+        video = self._first_video(result)
+        has_cover = video is not None and video.cover is not None
+        loop = asyncio.get_running_loop()
+        tasks: list[asyncio.Future] = []
+
+        def spawn(coro: Awaitable[T]) -> asyncio.Future[T]:
+            task = asyncio.ensure_future(coro, loop=loop)
+            tasks.append(task)
+            return task
+
+        avatar_task = (
+            spawn(self._prepare_avatar(result.author)) if result.author else None
+        )
+        cover_task = (
+            spawn(self._prepare_cover(video, content_width)) if has_cover else None
+        )
+        grid_task = None
+        graphics_task = None
+        if not has_cover:
+            if result.img_contents:
+                grid_task = spawn(
+                    self._prepare_grid_images(result.img_contents, content_width)
+                )
+            elif result.graphics_contents:
+                graphics_task = spawn(
+                    self._prepare_graphics_images(
+                        result.graphics_contents, content_width
+                    )
+                )
+        repost_task = None
+        if result.repost:
+            # 转发内容的媒体按缩小后的尺寸解码
+            repost_view = self._repost_renderer()
+            repost_task = spawn(
+                repost_view._prepare_media(result.repost, repost_view.content_width)
+            )
+
+        try:
+            media = CardMedia()
+            if avatar_task is not None:
+                media.avatar = await avatar_task
+                if media.avatar is None and result.author.avatar is not None:
+                    media.complete = False
+            if cover_task is not None:
+                media.cover = await cover_task
+                if media.cover is None:
+                    media.complete = False
+            if media.cover is None:
+                # 封面加载失败时才在此发起
+                if result.img_contents:
+                    media.grid_images = await (
+                        grid_task
+                        or self._prepare_grid_images(result.img_contents, content_width)
+                    )
+                    shown = min(len(result.img_contents), self.MAX_IMAGES_DISPLAY)
+                    if len(media.grid_images) < shown:
+                        media.complete = False
+                elif result.graphics_contents:
+                    media.graphics_images = await (
+                        graphics_task
+                        or self._prepare_graphics_images(
+                            result.graphics_contents, content_width
+                        )
+                    )
+                    if any(img is None for img in media.graphics_images):
+                        media.complete = False
+            if repost_task is not None:
+                media.repost = await repost_task
+                if not media.repost.complete:
+                    media.complete = False
+            return media
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    @suppress_exception_async
+    async def _prepare_avatar(self, author: Author) -> PILImage | None:
+        """下载并处理头像，失败返回 None（绘制占位符）"""
+        avatar = await author.get_avatar_path()
+        return await self._thumbnail(
+            self._load_and_process_avatar, avatar, self.AVATAR_SIZE
+        )
+
+    @suppress_exception_async
+    async def _prepare_cover(
+        self, video: VideoContent, content_width: int
+    ) -> PILImage | None:
+        """下载并缩放视频封面，失败返回 None"""
+        cover = await video.get_cover_path()
+        return await self._thumbnail(self._load_and_resize_cover, cover, content_width)
+
+    async def _prepare_grid_images(
+        self, all_img_contents: list[ImageContent], content_width: int
+    ) -> list[PILImage]:
+        """下载并处理图集中要显示的图片，失败的图片被跳过"""
+        img_contents = all_img_contents[: self.MAX_IMAGES_DISPLAY]
+        img_count = len(img_contents)
+
+        @suppress_exception_async
+        async def load(img_content: ImageContent) -> PILImage | None:
+            img_path = await img_content.get_path()
+            # 使用装饰器保护的方法，失败会返回 None
+            return await self._thumbnail(
+                self._load_and_process_grid_image, img_path, content_width, img_count
+            )
+
+        # 并发下载，每张图片到达后立即解码，结果保持原顺序
+        loaded = await asyncio.gather(*(load(cont) for cont in img_contents))
+        return [img for img in loaded if img is not None]
+
+    async def _prepare_graphics_images(
+        self, graphics_contents: list[GraphicsContent], content_width: int
+    ) -> list[PILImage | None]:
+        """下载并处理图文图片，失败为 None"""
+
+        @suppress_exception_async
+        async def load(graphics_content: GraphicsContent) -> PILImage:
+            img_path = await graphics_content.get_path()
+            return await self._thumbnail(
+                self._load_graphics_image, img_path, content_width
+            )
+
+        return list(await asyncio.gather(*(load(c) for c in graphics_contents)))
+
+    def _calculate_sections(
+        self,
+        result: ParseResult,
+        media: CardMedia,
+        content_width: int,
     ) -> list[SectionData]:
-        """计算各部分内容的高度和数据"""
+        """按卡片自上而下的顺序计算各部分内容的高度和数据"""
         sections: list[SectionData] = []
 
         # 1. Header 部分
-        header_section = await self._calculate_header_section(result, content_width)
-        if header_section is not None:
+        if result.author is not None:
+            header_section = self._calculate_header_section(
+                result.author,
+                result.formatted_datetime(),
+                content_width,
+                media.avatar,
+            )
             sections.append(header_section)
 
         # 2. 标题部分
@@ -549,29 +1011,26 @@ class Renderer:
             sections.append(TitleSectionData(height=title_height, lines=title_lines))
 
         # 3. 封面，图集，图文内容
-        if cover_img := self._load_and_resize_cover(
-            await result.cover_path,
-            content_width=content_width,
-        ):
+        if media.cover:
             sections.append(
-                CoverSectionData(height=cover_img.height, cover_img=cover_img)
+                CoverSectionData(height=media.cover.height, cover_img=media.cover)
             )
         elif result.img_contents:
             # 如果没有封面但有图片，处理图片列表
-            img_grid_section = await self._calculate_image_grid_section(
-                result,
-                content_width,
-            )
-            if img_grid_section:
+            if img_grid_section := self._calculate_image_grid_section(
+                media.grid_images, len(result.img_contents)
+            ):
                 sections.append(img_grid_section)
         elif result.graphics_contents:
-            for graphics_content in result.graphics_contents:
-                graphics_section = await self._calculate_graphics_section(
-                    graphics_content,
-                    content_width,
-                )
-                if graphics_section:
-                    sections.append(graphics_section)
+            for graphics_content, image in zip(
+                result.graphics_contents, media.graphics_images
+            ):
+                if image is not None:
+                    sections.append(
+                        self._calculate_graphics_section(
+                            graphics_content, image, content_width
+                        )
+                    )
 
         # 5. 文本内容
         if result.text:
@@ -579,6 +1038,7 @@ class Renderer:
                 result.text,
                 content_width,
                 self.fontset.text_font,
+                self.MAX_TEXT_LINES,
             )
             text_height = len(text_lines) * self.fontset.text_font.line_height
             sections.append(TextSectionData(height=text_height, lines=text_lines))
@@ -594,89 +1054,80 @@ class Renderer:
             sections.append(ExtraSectionData(height=extra_height, lines=extra_lines))
 
         # 7. 转发内容
-        if result.repost:
-            repost_section = await self._calculate_repost_section(result.repost)
-            sections.append(repost_section)
+        if result.repost and media.repost:
+            sections.append(self._calculate_repost_section(result.repost, media.repost))
 
         return sections
 
-    @suppress_exception_async
-    async def _calculate_graphics_section(
-        self, graphics_content: GraphicsContent, content_width: int
-    ) -> GraphicsSectionData | None:
+    def _calculate_graphics_section(
+        self,
+        graphics_content: GraphicsContent,
+        image: PILImage,
+        content_width: int,
+    ) -> GraphicsSectionData:
         """计算图文内容部分的高度和内容"""
-        # 加载图片
-        img_path = await graphics_content.get_path()
+        # 处理文本内容
+        text_lines = []
+        if graphics_content.text:
+            text_lines = self._wrap_text(
+                graphics_content.text,
+                content_width,
+                self.fontset.text_font,
+                self.MAX_TEXT_LINES,
+            )
+
+        # 计算总高度：文本高度 + 图片高度 + alt文本高度 + 间距
+        text_height = (
+            len(text_lines) * self.fontset.text_font.line_height if text_lines else 0
+        )
+        alt_height = self.fontset.extra_font.line_height if graphics_content.alt else 0
+        total_height = text_height + image.height + alt_height
+        if text_lines:
+            total_height += self.SECTION_SPACING  # 文本和图片之间的间距
+        if graphics_content.alt:
+            total_height += self.SECTION_SPACING  # 图片和alt文本之间的间距
+
+        return GraphicsSectionData(
+            height=total_height,
+            text_lines=text_lines,
+            image=image,
+            alt_text=graphics_content.alt,
+        )
+
+    @staticmethod
+    def _load_graphics_image(img_path: Path, content_width: int) -> PILImage:
+        """加载图文图片，宽度超出内容区域时等比缩放"""
         with Image.open(img_path) as original_img:
-            # 调整图片尺寸以适应内容宽度
+            original_img.draft(None, (content_width, 1))
             if original_img.width > content_width:
                 ratio = content_width / original_img.width
                 new_height = int(original_img.height * ratio)
-                image = original_img.resize(
+                return original_img.resize(
                     (content_width, new_height),
                     Image.Resampling.LANCZOS,
                 )
-            else:
-                # 如果不需要缩放，copy 一份
-                image = original_img.copy()
-
-            # 处理文本内容
-            text_lines = []
-            if graphics_content.text:
-                text_lines = self._wrap_text(
-                    graphics_content.text,
-                    content_width,
-                    self.fontset.text_font,
-                )
-
-            # 计算总高度：文本高度 + 图片高度 + alt文本高度 + 间距
-            text_height = (
-                len(text_lines) * self.fontset.text_font.line_height
-                if text_lines
-                else 0
-            )
-            alt_height = (
-                self.fontset.extra_font.line_height if graphics_content.alt else 0
-            )
-            total_height = text_height + image.height + alt_height
-            if text_lines:
-                total_height += self.SECTION_SPACING  # 文本和图片之间的间距
-            if graphics_content.alt:
-                total_height += self.SECTION_SPACING  # 图片和alt文本之间的间距
-
-            return GraphicsSectionData(
-                height=total_height,
-                text_lines=text_lines,
-                image=image,
-                alt_text=graphics_content.alt,
-            )
+            # 如果不需要缩放，copy 一份
+            return original_img.copy()
 
-    async def _calculate_header_section(
+    def _calculate_header_section(
         self,
-        result: ParseResult,
+        author: Author,
+        time_text: str | None,
         content_width: int,
-    ) -> HeaderSectionData | None:
+        avatar_img: PILImage | None,
+    ) -> HeaderSectionData:
         """计算 header 部分的高度和内容"""
-        if result.author is None:
-            return None
-
-        # 加载头像
-        avatar_img = self._load_and_process_avatar(
-            await result.author.get_avatar_path()
-        )
-
         # 计算文字区域宽度（始终预留头像空间）
         text_area_width = content_width - (self.AVATAR_SIZE + self.AVATAR_TEXT_GAP)
 
         # 发布者名称
         name_lines = self._wrap_text(
-            result.author.name,
+            author.name,
             text_area_width,
             self.fontset.name_font,
         )
 
         # 时间
-        time_text = result.formatted_datetime()
         time_lines = self._wrap_text(
             time_text,
             text_area_width,
@@ -700,56 +1151,35 @@ class Renderer:
             text_height=text_height,
         )
 
-    async def _calculate_repost_section(self, repost: ParseResult) -> RepostSectionData:
-        """计算转发内容的高度和内容（递归调用绘制方法）"""
-        repost_image = await self._create_card_image(repost, False)
-        # 缩放图片
-        scaled_width = int(repost_image.width * self.REPOST_SCALE)
-        scaled_height = int(repost_image.height * self.REPOST_SCALE)
-        repost_image_scaled = repost_image.resize(
-            (scaled_width, scaled_height),
-            Image.Resampling.LANCZOS,
-        )
-
+    def _calculate_repost_section(
+        self,
+        repost: ParseResult,
+        media: CardMedia,
+    ) -> RepostSectionData:
+        """计算转发内容的高度和内容（用缩小后的常量和字体直接绘制转发卡片）"""
+        repost_image = self._repost_renderer()._create_card_image(repost, media, False)
         return RepostSectionData(
-            height=scaled_height + self.REPOST_PADDING * 2,  # 加上转发容器的内边距
-            scaled_image=repost_image_scaled,
+            height=repost_image.height
+            + self.REPOST_PADDING * 2,  # 加上转发容器的内边距
+            scaled_image=repost_image,
         )
 
-    async def _calculate_image_grid_section(
-        self, result: ParseResult, content_width: int
+    def _calculate_image_grid_section(
+        self, processed_images: list[PILImage], total_images: int
     ) -> ImageGridSectionData | None:
-        """计算图片网格部分的高度和内容"""
-        if not result.img_contents:
-            return None
-
-        # 检查是否有超过最大显示数量的图片
-        total_images = len(result.img_contents)
-        has_more = total_images > self.MAX_IMAGES_DISPLAY
-
-        # 如果超过最大显示数量，处理前N张，最后一张显示+N效果
-        if has_more:
-            img_contents = result.img_contents[: self.MAX_IMAGES_DISPLAY]
-            remaining_count = total_images - self.MAX_IMAGES_DISPLAY
-        else:
-            img_contents = result.img_contents[: self.MAX_IMAGES_DISPLAY]
-            remaining_count = 0
-
-        processed_images = []
-        img_count = len(img_contents)
-
-        for img_content in img_contents:
-            img_path = await img_content.get_path()
-            # 使用装饰器保护的方法，失败会返回 None
-            img = await self._load_and_process_grid_image(
-                img_path, content_width, img_count
-            )
-            if img is not None:
-                processed_images.append(img)
+        """计算图片网格部分的高度和内容
 
+        Args:
+            processed_images: 已处理好的图片（最多 MAX_IMAGES_DISPLAY 张）
+            total_images: 图集中的图片总数
+        """
         if not processed_images:
             return None
 
+        # 检查是否有超过最大显示数量的图片，有则最后一张显示+N效果
+        has_more = total_images > self.MAX_IMAGES_DISPLAY
+        remaining_count = total_images - self.MAX_IMAGES_DISPLAY if has_more else 0
+
         # 计算网格布局
         image_count = len(processed_images)
 
@@ -784,8 +1214,8 @@ class Renderer:
             remaining_count=remaining_count,
         )
 
-    @suppress_exception_async
-    async def _load_and_process_grid_image(
+    @suppress_exception
+    def _load_and_process_grid_image(
         self,
         img_path: Path,
         content_width: int,
@@ -805,6 +1235,25 @@ class Renderer:
             return None
 
         with Image.open(img_path) as original_img:
+            # 计算图片尺寸
+            if img_count == 1:
+                # 单张图片，根据卡片宽度调整，与视频封面保持一致
+                max_width = content_width
+                max_height = min(self.MAX_IMAGE_HEIGHT, content_width)  # 限制最大高度
+                ratio = min(
+                    1.0,
+                    max_width / original_img.width,
+                    max_height / original_img.height,
+                )
+                draft_size = (
+                    max(1, int(original_img.width * ratio)),
+                    max(1, int(original_img.height * ratio)),
+                )
+            else:
+                max_size = self._grid_tile_size(content_width, img_count)
+                draft_size = (max_size, max_size)
+            # JPEG 直接按 1/2 ~ 1/8 缩小解码（仍不小于最终尺寸）
+            original_img.draft(None, draft_size)
             img = original_img
 
             # 根据图片数量决定处理方式
@@ -812,11 +1261,7 @@ class Renderer:
                 # 2张及以上图片，统一为方形
                 img = self._crop_to_square(img)
 
-            # 计算图片尺寸
             if img_count == 1:
-                # 单张图片，根据卡片宽度调整，与视频封面保持一致
-                max_width = content_width
-                max_height = min(self.MAX_IMAGE_HEIGHT, content_width)  # 限制最大高度
                 if img.width > max_width or img.height > max_height:
                     ratio = min(max_width / img.width, max_height / img.height)
                     new_size = (int(img.width * ratio), int(img.height * ratio))
@@ -825,20 +1270,6 @@ class Renderer:
                     # 如果没有做任何转换，需要 copy 一份
                     img = img.copy()
             else:
-                # 多张图片，计算最大尺寸
-                if img_count in (2, 4):
-                    # 2张或4张图片，使用2列布局
-                    num_gaps = 3  # 2列有3个间距
-                    max_size = (content_width - self.IMAGE_GRID_SPACING * num_gaps) // 2
-                    max_size = min(max_size, self.IMAGE_2_GRID_SIZE)
-                else:
-                    # 多张图片，使用3列布局
-                    num_gaps = self.IMAGE_GRID_COLS + 1
-                    max_size = (
-                        content_width - self.IMAGE_GRID_SPACING * num_gaps
-                    ) // self.IMAGE_GRID_COLS
-                    max_size = min(max_size, self.IMAGE_3_GRID_SIZE)
-
                 # 调整多张图片的尺寸
                 if img.width > max_size or img.height > max_size:
                     ratio = min(max_size / img.width, max_size / img.height)
@@ -850,6 +1281,20 @@ class Renderer:
 
             return img
 
+    def _grid_tile_size(self, content_width: int, img_count: int) -> int:
+        """多图网格中单张图片的最大边长"""
+        if img_count in (2, 4):
+            # 2张或4张图片，使用2列布局
+            num_gaps = 3  # 2列有3个间距
+            max_size = (content_width - self.IMAGE_GRID_SPACING * num_gaps) // 2
+            return min(max_size, self.IMAGE_2_GRID_SIZE)
+        # 多张图片，使用3列布局
+        num_gaps = self.IMAGE_GRID_COLS + 1
+        max_size = (
+            content_width - self.IMAGE_GRID_SPACING * num_gaps
+        ) // self.IMAGE_GRID_COLS
+        return min(max_size, self.IMAGE_3_GRID_SIZE)
+
     def _crop_to_square(self, img: PILImage) -> PILImage:
         """将图片裁剪为方形（上下切割）"""
         width, height = img.size
@@ -868,24 +1313,22 @@ class Renderer:
             bottom = top + width
             return img.crop((0, top, width, bottom))
 
-    async def _draw_sections(
-        self, ctx: RenderContext, sections: list[SectionData]
-    ) -> None:
+    def _draw_sections(self, ctx: RenderContext, sections: list[SectionData]) -> None:
         """绘制所有内容到画布上"""
         for section in sections:
             match section:
                 case HeaderSectionData() as header:
-                    await self._draw_header(ctx, header)
+                    self._draw_header(ctx, header)
                 case TitleSectionData() as title:
-                    await self._draw_title(ctx, title.lines)
+                    self._draw_title(ctx, title.lines)
                 case CoverSectionData() as cover:
                     self._draw_cover(ctx, cover.cover_img)
                 case TextSectionData() as text:
-                    await self._draw_text(ctx, text.lines)
+                    self._draw_text(ctx, text.lines)
                 case GraphicsSectionData() as graphics:
-                    await self._draw_graphics(ctx, graphics)
+                    self._draw_graphics(ctx, graphics)
                 case ExtraSectionData() as extra:
-                    await self._draw_extra(ctx, extra.lines)
+                    self._draw_extra(ctx, extra.lines)
                 case RepostSectionData() as repost:
                     self._draw_repost(ctx, repost)
                 case ImageGridSectionData() as image_grid:
@@ -954,9 +1397,7 @@ class Renderer:
         placeholder.putalpha(mask)
         return placeholder
 
-    async def _draw_header(
-        self, ctx: RenderContext, section: HeaderSectionData
-    ) -> None:
+    def _draw_header(self, ctx: RenderContext, section: HeaderSectionData) -> None:
         """绘制 header 部分"""
         x_pos = self.PADDING
 
@@ -973,7 +1414,7 @@ class Renderer:
         text_y = text_start_y
 
         # 发布者名称（蓝色）
-        text_y += await self.text(
+        text_y += self.text(
             ctx,
             (text_x, text_y),
             section.name_lines,
@@ -984,7 +1425,7 @@ class Renderer:
         # 时间（灰色）
         if section.time_lines:
             text_y += self.NAME_TIME_GAP
-            text_y += await self.text(
+            text_y += self.text(
                 ctx,
                 (text_x, text_y),
                 section.time_lines,
@@ -1005,9 +1446,9 @@ class Renderer:
 
         ctx.y_pos += section.height + self.SECTION_SPACING
 
-    async def _draw_title(self, ctx: RenderContext, lines: list[str]) -> None:
+    def _draw_title(self, ctx: RenderContext, lines: list[str]) -> None:
         """绘制标题"""
-        ctx.y_pos += await self.text(
+        ctx.y_pos += self.text(
             ctx,
             (self.PADDING, ctx.y_pos),
             lines,
@@ -1024,9 +1465,9 @@ class Renderer:
         ctx.image.paste(cover_img, (x_pos, ctx.y_pos))
 
         # 添加视频播放按钮（居中）
-        button_size = 128  # 固定使用 128x128 尺寸
-        button_x = x_pos + (cover_img.width - button_size) // 2
-        button_y = ctx.y_pos + (cover_img.height - button_size) // 2
+        button_w, button_h = self.video_button_image.size
+        button_x = x_pos + (cover_img.width - button_w) // 2
+        button_y = ctx.y_pos + (cover_img.height - button_h) // 2
         ctx.image.paste(
             self.video_button_image,
             (button_x, button_y),
@@ -1035,9 +1476,9 @@ class Renderer:
 
         ctx.y_pos += cover_img.height + self.SECTION_SPACING
 
-    async def _draw_text(self, ctx: RenderContext, lines: list[str]) -> None:
+    def _draw_text(self, ctx: RenderContext, lines: list[str]) -> None:
         """绘制文本内容"""
-        ctx.y_pos += await self.text(
+        ctx.y_pos += self.text(
             ctx,
             (self.PADDING, ctx.y_pos),
             lines,
@@ -1046,13 +1487,11 @@ class Renderer:
         )
         ctx.y_pos += self.SECTION_SPACING
 
-    async def _draw_graphics(
-        self, ctx: RenderContext, section: GraphicsSectionData
-    ) -> None:
+    def _draw_graphics(self, ctx: RenderContext, section: GraphicsSectionData) -> None:
         """绘制图文内容"""
         # 绘制文本内容（如果有）
         if section.text_lines:
-            ctx.y_pos += await self.text(
+            ctx.y_pos += self.text(
                 ctx,
                 (self.PADDING, ctx.y_pos),
                 section.text_lines,
@@ -1073,7 +1512,7 @@ class Renderer:
             extra_font_info = self.fontset.extra_font
             text_width = extra_font_info.get_text_width(section.alt_text)
             text_x = self.PADDING + (ctx.content_width - text_width) // 2
-            ctx.y_pos += await self.text(
+            ctx.y_pos += self.text(
                 ctx,
                 (text_x, ctx.y_pos),
                 [section.alt_text],
@@ -1083,9 +1522,9 @@ class Renderer:
 
         ctx.y_pos += self.SECTION_SPACING
 
-    async def _draw_extra(self, ctx: RenderContext, lines: list[str]) -> None:
+    def _draw_extra(self, ctx: RenderContext, lines: list[str]) -> None:
         """绘制额外信息"""
-        ctx.y_pos += await self.text(
+        ctx.y_pos += self.text(
             ctx,
             (self.PADDING, ctx.y_pos),
             lines,
@@ -1109,7 +1548,7 @@ class Renderer:
             ctx.image,
             (repost_x, repost_y, repost_x + repost_width, repost_y + repost_height),
             self.REPOST_BG_COLOR,
-            radius=8,
+            radius=self.REPOST_RADIUS,
         )
 
         # 绘制转发边框
@@ -1117,7 +1556,7 @@ class Renderer:
             ctx.draw,
             (repost_x, repost_y, repost_x + repost_width, repost_y + repost_height),
             self.REPOST_BORDER_COLOR,
-            radius=8,
+            radius=self.REPOST_RADIUS,
             width=1,
         )
 
@@ -1319,73 +1758,21 @@ class Renderer:
         )
 
     def _wrap_text(
-        self, text: str | None, max_width: int, font_info: FontInfo
+        self,
+        text: str | None,
+        max_width: int,
+        font_info: FontInfo,
+        max_lines: int | None = None,
     ) -> list[str]:
-        """优化的文本自动换行算法，考虑中英文字符宽度相同
+        """文本自动换行（CJK 逐字断行、拉丁单词整体换行、标点不出现在行首）
 
         Args:
             text: 要处理的文本
             max_width: 最大宽度（像素）
             font_info: 字体信息对象
+            max_lines: 最多保留的行数，超出部分以省略号截断
 
         Returns:
             换行后的文本列表
         """
-        if not text:
-            return []
-
-        lines: list[str] = []
-        paragraphs = text.splitlines()
-
-        def is_punctuation(char: str) -> bool:
-            """判断是否为不能为行首的标点符号"""
-            return (
-                char in "，。！？；：、）】》〉」』〕〗〙〛…—·" or char in ",.;:!?)]}"
-            )
-
-        for paragraph in paragraphs:
-            if not paragraph:
-                lines.append("")
-                continue
-
-            current_line = ""
-            current_line_width = 0
-            remaining_text = paragraph
-
-            while remaining_text:
-                next_char = remaining_text[0]
-                char_width = font_info.get_char_width_fast(next_char)
-                # 如果当前行为空，直接添加字符
-                if not current_line:
-                    current_line = next_char
-                    current_line_width = char_width
-                    remaining_text = remaining_text[1:]
-                    continue
-
-                # 如果是标点符号，直接添加到当前行（标点符号不应该单独成行）
-                if is_punctuation(next_char):
-                    current_line += next_char
-                    current_line_width += char_width
-                    remaining_text = remaining_text[1:]
-                    continue
-
-                # 测试添加下一个字符后的宽度
-                test_width = current_line_width + char_width
-
-                if test_width <= max_width:
-                    # 宽度合适，继续添加
-                    current_line += next_char
-                    current_line_width = test_width
-                    remaining_text = remaining_text[1:]
-                else:
-                    # 宽度超限，需要断行
-                    lines.append(current_line)
-                    current_line = next_char
-                    current_line_width = char_width
-                    remaining_text = remaining_text[1:]
-
-            # 保存最后一行
-            if current_line:
-                lines.append(current_line)
-
-        return lines
+        return wrap_text(text, max_width, font_info.get_char_width, max_lines)
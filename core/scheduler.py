@@ -0,0 +1,155 @@
+import heapq
+import itertools
+import time
+from asyncio import Future, get_running_loop
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from urllib.parse import urlsplit
+
+
+class DownloadPriority(IntEnum):
+    """下载优先级，数值越小越先调度"""
+
+    CARD = 0
+    """头像、封面等渲染卡片需要的图片"""
+    IMAGE = 1
+    """普通图片"""
+    AUDIO = 2
+    """音频、文件"""
+    VIDEO = 3
+    """视频等重媒体"""
+
+
+class _Waiter:
+    __slots__ = ("enqueued_at", "future", "host", "priority", "seq")
+
+    def __init__(self, priority: int, seq: int, host: str, future: Future[None]):
+        self.priority = priority
+        self.seq = seq
+        self.host = host
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class DownloadScheduler:
+    """
+    下载并发调度器
+
+    - 全局并发上限 + 按 host 的并发上限，避免同一 CDN 被瞬间打满触发限流
+    - 排队按优先级（同级按先来后到）放行；队首的 host 已满时放行后面其它 host 的请求
+    - 重媒体最多占用全局并发的一半，保证头像、封面、图片不会被长视频下载饿死
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        per_host: int,
+        host_limits: dict[str, int] | None = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host = max(1, per_host)
+        self.host_limits = host_limits or {}
+        self.heavy_limit = max(1, self.max_concurrency // 2)
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._active_heavy = 0
+        self._active_hosts: Counter[str] = Counter()
+        # 指标
+        self.granted = 0
+        self.max_queued = 0
+        self.total_wait = 0.0
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlsplit(url).hostname or ""
+
+    def _host_limit(self, host: str) -> int:
+        return self.host_limits.get(host, self.per_host)
+
+    def _can_run(self, priority: int, host: str) -> bool:
+        if self._active >= self.max_concurrency:
+            return False
+        if self._active_hosts[host] >= self._host_limit(host):
+            return False
+        if priority >= DownloadPriority.VIDEO:
+            return self._active_heavy < self.heavy_limit
+        return True
+
+    def _acquire(self, priority: int, host: str) -> None:
+        self._active += 1
+        self._active_hosts[host] += 1
+        if priority >= DownloadPriority.VIDEO:
+            self._active_heavy += 1
+
+    def _release(self, priority: int, host: str) -> None:
+        self._active -= 1
+        self._active_hosts[host] -= 1
+        if self._active_hosts[host] <= 0:
+            del self._active_hosts[host]
+        if priority >= DownloadPriority.VIDEO:
+            self._active_heavy -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """按优先级放行排队者，跳过暂时无法运行的（host 满 / 重媒体满）"""
+        blocked: list[_Waiter] = []
+        while self._queue and self._active < self.max_concurrency:
+            waiter = heapq.heappop(self._queue)
+            if waiter.future.done():  # 已取消
+                continue
+            if not self._can_run(waiter.priority, waiter.host):
+                blocked.append(waiter)
+                continue
+            self._acquire(waiter.priority, waiter.host)
+            self.total_wait += time.monotonic() - waiter.enqueued_at
+            waiter.future.set_result(None)
+        for waiter in blocked:
+            heapq.heappush(self._queue, waiter)
+
+    @asynccontextmanager
+    async def slot(
+        self, url: str, priority: int = DownloadPriority.IMAGE
+    ) -> AsyncIterator[None]:
+        """占用一个下载名额，退出时归还"""
+        host = self.host_of(url)
+        future: Future[None] = get_running_loop().create_future()
+        heapq.heappush(self._queue, _Waiter(priority, next(self._seq), host, future))
+        self._dispatch()
+        self.max_queued = max(self.max_queued, len(self._queue))
+        try:
+            await future
+        except BaseException:
+            # 已被放行但等待方被取消：归还名额
+            if future.done() and not future.cancelled():
+                self._release(priority, host)
+            else:
+                future.cancel()
+            raise
+        self.granted += 1
+        try:
+            yield
+        finally:
+            self._release(priority, host)
+
+    def stats(self) -> dict[str, object]:
+        queued: Counter[str] = Counter(
+            DownloadPriority(w.priority).name
+            for w in self._queue
+            if not w.future.done()
+        )
+        return {
+            "active": self._active,
+            "active_heavy": self._active_heavy,
+            "active_hosts": dict(self._active_hosts),
+            "queued": sum(queued.values()),
+            "queued_by_priority": dict(queued),
+            "max_queued": self.max_queued,
+            "granted": self.granted,
+            "avg_wait": self.total_wait / self.granted if self.granted else 0.0,
+        }
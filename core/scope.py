@@ -0,0 +1,115 @@
+import asyncio
+import weakref
+from collections.abc import Iterable
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    # 只用于标注，运行时不导入（typing.Self 需要 Python 3.11）
+    from typing import Self
+
+_current: ContextVar["TaskScope | None"] = ContextVar("task_scope", default=None)
+_cancelled: "weakref.WeakSet[asyncio.Task[Any]]" = weakref.WeakSet()
+
+
+def current_scope() -> "TaskScope | None":
+    """当前请求的任务域，不在任何任务域中时为 None"""
+    return _current.get()
+
+
+def adopt(task: asyncio.Task[Any]) -> None:
+    """把任务交给当前任务域托管（不在任务域中时什么也不做）"""
+    if (scope := _current.get()) is not None:
+        scope.adopt(task)
+
+
+def cancel_task(task: asyncio.Task[Any]) -> None:
+    """主动取消任务并登记，等待它的其它请求据此区分“下载被取消”和“自己被取消”"""
+    _cancelled.add(task)
+    task.cancel()
+
+
+def was_cancelled(task: asyncio.Task[Any]) -> bool:
+    """任务是否经 cancel_task 主动取消（任务域退出、资源防抖等）"""
+    return task in _cancelled
+
+
+def record_cancelled(downloaded: int, total: int | None = None) -> None:
+    """下载被取消时登记已下载（被丢弃）和尚未下载（被节省）的字节数"""
+    saved = max(total - downloaded, 0) if total else 0
+    TaskScope.total_cancelled_bytes += downloaded
+    TaskScope.total_saved_bytes += saved
+    if (scope := _current.get()) is not None:
+        scope.cancelled_bytes += downloaded
+        scope.saved_bytes += saved
+
+
+class TaskScope:
+    """
+    单次请求（解析 + 发送）的任务域
+
+    - 进入后，该请求中创建的下载 Task（auto_task、LazyPath.start）都登记到任务域；
+      子任务继承上下文，嵌套创建的任务同样归属于它
+    - 退出时取消所有未完成的任务，并等待它们执行完清理（删除 .part 临时文件），
+      请求提前返回或抛异常时不会留下无人等待的下载
+    - 结果仍被其它会话使用时调用 detach()，退出时不再取消；
+      release() 只交出部分任务（如进入跨会话缓存的结果中的下载）
+    - 统计被取消的任务数、被丢弃的已下载字节和因取消而省下的字节，类属性为全局累计
+    """
+
+    total_cancelled = 0
+    total_cancelled_bytes = 0
+    total_saved_bytes = 0
+
+    def __init__(self, name: str = "", exit_timeout: float = 5.0):
+        self.name = name
+        self.exit_timeout = exit_timeout
+        self.cancelled = 0
+        self.cancelled_bytes = 0
+        self.saved_bytes = 0
+        self._tasks: set[asyncio.Task[Any]] = set()
+        self._detached = False
+        self._token = None
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def adopt(self, task: asyncio.Task[Any]) -> None:
+        if task.done():
+            return
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def release(self, tasks: Iterable[asyncio.Task[Any]]) -> None:
+        """交出部分任务的所有权，退出时不取消它们"""
+        for task in tasks:
+            self._tasks.discard(task)
+
+    def detach(self) -> None:
+        """放弃对任务的所有权，退出时不取消"""
+        self._detached = True
+
+    async def __aenter__(self) -> "Self":
+        self._token = _current.set(self)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        if not self._detached:
+            await self.cancel_pending()
+        self._tasks.clear()
+
+    async def cancel_pending(self) -> int:
+        """取消未完成的任务并等待其清理，返回取消的个数"""
+        pending = [task for task in self._tasks if not task.done()]
+        if not pending:
+            return 0
+        for task in pending:
+            cancel_task(task)
+        # 清理超时只是不再等待，任务本身已收到取消
+        await asyncio.wait(pending, timeout=self.exit_timeout)
+        self.cancelled += len(pending)
+        TaskScope.total_cancelled += len(pending)
+        return len(pending)
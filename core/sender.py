@@ -1,3 +1,6 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 from itertools import chain
 from pathlib import Path
 
@@ -21,6 +24,7 @@ from .data import (
     FileContent,
     GraphicsContent,
     ImageContent,
+    MediaContent,
     ParseResult,
     SendGroup,
     TextContent,
@@ -32,6 +36,7 @@ from .exception import (
     SizeLimitException,
     ZeroSizeException,
 )
+from .media_index import MediaCacheIndex
 from .render import Renderer
 
 
@@ -50,9 +55,15 @@ class MessageSender:
     - 只负责“怎么发”
     """
 
-    def __init__(self, config: PluginConfig, renderer: Renderer):
+    def __init__(
+        self,
+        config: PluginConfig,
+        renderer: Renderer,
+        media_index: MediaCacheIndex,
+    ):
         self.cfg = config
         self.renderer = renderer
+        self.media_index = media_index
 
     def _to_file_uri(self, path: Path) -> str:
         if not path.is_absolute():
@@ -142,80 +153,152 @@ class MessageSender:
             return
 
         if image_path := await self.renderer.render_card(result):
-            await event.send(event.chain_result([self._image_from_path(image_path)]))
+            with self.media_index.pinned([image_path]):
+                await event.send(
+                    event.chain_result([self._image_from_path(image_path)])
+                )
+
+    def _pin(self, path: Path, pinned: list[Path]) -> None:
+        """发送完成前锁定文件，防止被缓存淘汰"""
+        self.media_index.pin(path)
+        pinned.append(path)
+
+    def _start_downloads(self, plan: dict) -> list[asyncio.Task]:
+        """按发送计划同时发起所有媒体下载，结果顺序与计划一致（轻媒体在前）"""
+        return [
+            asyncio.create_task(self._resolve(cont))
+            for cont in chain(plan["light"], plan["heavy"])
+        ]
+
+    @staticmethod
+    async def _resolve(cont: MediaContent) -> Path | DownloadException | None:
+        """下载单项媒体，下载失败以异常对象返回，文本内容返回 None"""
+        if isinstance(cont, TextContent):
+            return None
+        try:
+            return await cont.get_path()
+        except DownloadException as e:
+            return e
+
+    def _content_segments(
+        self,
+        cont: MediaContent,
+        outcome: Path | DownloadException | None,
+        pinned: list[Path],
+    ) -> list[BaseMessageComponent]:
+        """把单项内容及其下载结果转换为消息段，并锁定用到的文件"""
+        if isinstance(cont, TextContent):
+            return [Plain(cont.text)] if cont.text else []
+
+        heavy = isinstance(
+            cont, VideoContent | AudioContent | FileContent | DynamicContent
+        )
+        if isinstance(outcome, DownloadException):
+            if heavy and isinstance(outcome, SizeLimitException):
+                return [Plain("此项媒体超过大小限制")]
+            if not heavy and isinstance(
+                outcome, DownloadLimitException | ZeroSizeException
+            ):
+                return []
+            return (
+                [Plain("此项媒体下载失败")] if self.cfg.show_download_fail_tip else []
+            )
+
+        assert outcome is not None
+        path = outcome
+        self._pin(path, pinned)
+
+        match cont:
+            case ImageContent():
+                return [self._image_from_path(path)]
+            case GraphicsContent() as g:
+                segs: list[BaseMessageComponent] = [self._image_from_path(path)]
+                # GraphicsContent 允许携带补充文本
+                if g.text:
+                    segs.append(Plain(g.text))
+                if g.alt:
+                    segs.append(Plain(g.alt))
+                return segs
+            case VideoContent() | DynamicContent():
+                return [self._video_from_path(path)]
+            case AudioContent():
+                return [
+                    File(name=path.name, file=self._to_file_uri(path))
+                    if self.cfg.audio_to_file
+                    else self._record_from_path(path)
+                ]
+            case FileContent():
+                return [File(name=path.name, file=self._to_file_uri(path))]
+        return []
+
+    async def _iter_segments(
+        self,
+        result: ParseResult,
+        plan: dict,
+        tasks: list[asyncio.Task],
+        pinned: list[Path],
+    ) -> AsyncIterator[list[BaseMessageComponent]]:
+        """
+        按显示顺序逐批产出已就绪的消息段
+
+        - 所有媒体已同时在下载（见 _start_downloads），先完成的暂存在重排缓冲中，
+          等排在前面的内容就绪后一并产出，显示顺序不变
+        - 轻媒体与重媒体分批产出，轻媒体总是先出
+        - 合并转发时卡片以内联形式作为第一个消息段
+        - 锁定用到的文件（记录到 pinned，由调用方发送后解锁）
+        """
+        contents = [*plan["light"], *plan["heavy"]]
+        light_count = len(plan["light"])
+        card = None
+        if plan["render_card"] and plan["force_merge"]:
+            card = asyncio.create_task(self.renderer.render_card(result))
+        try:
+            if card is not None and (image_path := await card):
+                self._pin(image_path, pinned)
+                yield [self._image_from_path(image_path)]
+
+            i = 0
+            while i < len(tasks):
+                await asyncio.wait({tasks[i]})
+                end = light_count if i < light_count else len(tasks)
+                segs: list[BaseMessageComponent] = []
+                while i < end and tasks[i].done():
+                    segs.extend(
+                        self._content_segments(contents[i], tasks[i].result(), pinned)
+                    )
+                    i += 1
+                if segs:
+                    yield segs
+        finally:
+            for task in (card, *tasks):
+                if task is not None and not task.done():
+                    task.cancel()
 
     async def _build_segments(
         self,
         result: ParseResult,
         plan: dict,
+        tasks: list[asyncio.Task],
+        pinned: list[Path],
     ) -> list[BaseMessageComponent]:
         """
-        根据发送计划构建消息段列表
+        根据发送计划构建完整的消息段列表
 
         这里负责：
-        - 下载媒体
+        - 等待媒体下载
         - 转换为 AstrBot 消息组件
+        - 锁定用到的文件（记录到 pinned，由调用方发送后解锁）
         """
         segs: list[BaseMessageComponent] = []
-
-        # 合并转发时，卡片以内联形式作为一个消息段参与合并
-        if plan["render_card"] and plan["force_merge"]:
-            if image_path := await self.renderer.render_card(result):
-                segs.append(self._image_from_path(image_path))
-
-        # 轻媒体处理
-        for cont in plan["light"]:
-            if isinstance(cont, TextContent):
-                if cont.text:
-                    segs.append(Plain(cont.text))
-                continue
-
-            try:
-                path: Path = await cont.get_path()
-            except (DownloadLimitException, ZeroSizeException):
-                continue
-            except DownloadException:
-                if self.cfg.show_download_fail_tip:
-                    segs.append(Plain("此项媒体下载失败"))
-                continue
-
-            match cont:
-                case ImageContent():
-                    segs.append(self._image_from_path(path))
-                case GraphicsContent() as g:
-                    segs.append(self._image_from_path(path))
-                    # GraphicsContent 允许携带补充文本
-                    if g.text:
-                        segs.append(Plain(g.text))
-                    if g.alt:
-                        segs.append(Plain(g.alt))
-
-        # 重媒体处理
-        for cont in plan["heavy"]:
-            try:
-                path: Path = await cont.get_path()
-            except SizeLimitException:
-                segs.append(Plain("此项媒体超过大小限制"))
-                continue
-            except DownloadException:
-                if self.cfg.show_download_fail_tip:
-                    segs.append(Plain("此项媒体下载失败"))
-                continue
-
-            match cont:
-                case VideoContent() | DynamicContent():
-                    segs.append(self._video_from_path(path))
-                case AudioContent():
-                    segs.append(
-                        File(name=path.name, file=self._to_file_uri(path))
-                        if self.cfg.audio_to_file
-                        else self._record_from_path(path)
-                    )
-                case FileContent():
-                    segs.append(File(name=path.name, file=self._to_file_uri(path)))
-
+        async with aclosing(self._iter_segments(result, plan, tasks, pinned)) as it:
+            async for batch in it:
+                segs.extend(batch)
         return segs
 
+    @staticmethod
+    def _to_node(self_id: str, seg: BaseMessageComponent) -> Node:
+        return Node(uin=self_id, name="解析器", content=[seg])
+
     def _merge_segments_if_needed(
         self,
         event: AstrMessageEvent,
@@ -232,13 +315,50 @@ class MessageSender:
         if not force_merge or not segs:
             return segs
 
-        nodes = Nodes([])
         self_id = event.get_self_id()
+        return [Nodes([self._to_node(self_id, seg) for seg in segs])]
 
-        for seg in segs:
-            nodes.nodes.append(Node(uin=self_id, name="解析器", content=[seg]))
+    async def _send_pipelined(
+        self,
+        event: AstrMessageEvent,
+        result: ParseResult,
+        plan: dict,
+        tasks: list[asyncio.Task],
+        pinned: list[Path],
+    ) -> bool:
+        """
+        流水线发送：内容就绪一批发一批，不等最慢的媒体
 
-        return [nodes]
+        合并转发只能整体发送，此时随下载进度逐个追加 Node，全部就绪后发出
+        """
+        async with aclosing(self._iter_segments(result, plan, tasks, pinned)) as it:
+            if plan["force_merge"]:
+                self_id = event.get_self_id()
+                nodes = Nodes([])
+                async for batch in it:
+                    nodes.nodes.extend(self._to_node(self_id, seg) for seg in batch)
+                return await self._send_segments(event, [nodes] if nodes.nodes else [])
+
+            sent = False
+            async for batch in it:
+                sent = await self._send_segments(event, batch) or sent
+            return sent
+
+    async def _send_segments(
+        self,
+        event: AstrMessageEvent,
+        segs: list[BaseMessageComponent],
+    ) -> bool:
+        """发送一条消息，返回是否发送成功"""
+        if not segs:
+            return False
+        try:
+            await event.send(event.chain_result(segs))
+            return True
+        except Exception as e:
+            seg_meta = self._collect_seg_meta(segs)
+            logger.error(f"发送解析结果失败： error={e}, segments={seg_meta}")
+            return False
 
     @staticmethod
     def _build_text_fallback(result: ParseResult) -> list[BaseMessageComponent]:
@@ -271,21 +391,22 @@ class MessageSender:
             render_card_override=group.render_card,
         )
 
-        await self._send_preview_card(event, result, plan)
-
-        segs = await self._build_segments(result, plan)
-        segs = self._merge_segments_if_needed(event, segs, plan["force_merge"])
-
-        if not segs:
-            return False
-
+        # 先发起下载，与预览卡片的渲染和发送重叠进行
+        tasks = self._start_downloads(plan)
+        pinned: list[Path] = []
         try:
-            await event.send(event.chain_result(segs))
-            return True
-        except Exception as e:
-            seg_meta = self._collect_seg_meta(segs)
-            logger.error(f"发送解析结果失败： error={e}, segments={seg_meta}")
-            return False
+            await self._send_preview_card(event, result, plan)
+            if self.cfg.pipeline_send:
+                return await self._send_pipelined(event, result, plan, tasks, pinned)
+            segs = await self._build_segments(result, plan, tasks, pinned)
+            segs = self._merge_segments_if_needed(event, segs, plan["force_merge"])
+            return await self._send_segments(event, segs)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            for path in pinned:
+                self.media_index.unpin(path)
 
     @staticmethod
     def _collect_seg_meta(segs: list[BaseMessageComponent]) -> list[dict[str, str]]:
@@ -313,10 +434,11 @@ class MessageSender:
 
         执行顺序固定：
         1. 构建发送计划
-        2. 发送预览卡片（如有）
-        3. 构建消息段
-        4. 必要时合并转发
-        5. 最终发送
+        2. 发起全部媒体下载
+        3. 发送预览卡片（如有）
+        4. 构建消息段（流水线模式下就绪一批发一批）
+        5. 必要时合并转发
+        6. 最终发送
         """
         groups = self._resolve_groups(result)
 
@@ -330,9 +452,4 @@ class MessageSender:
                 logger.warning("发送结果为空，不执行发送")
                 return
 
-            try:
-                await event.send(event.chain_result(segs))
-            except Exception as e:
-                seg_meta = self._collect_seg_meta(segs)
-                logger.error(f"发送解析结果失败： error={e}, segments={seg_meta}")
-            return
+            await self._send_segments(event, segs)
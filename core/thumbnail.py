@@ -0,0 +1,112 @@
+import hashlib
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from astrbot.api import logger
+from PIL import Image, UnidentifiedImageError
+
+from .utils import part_path
+
+PILImage = Image.Image
+
+
+class ThumbnailCache:
+    """
+    缩略图缓存
+
+    - 头像、封面、宫格图等由源图派生的位图落盘到 cache_dir/thumbs，跨卡片复用
+    - 键为 (源文件指纹, 处理函数, 处理参数)：源文件按 url 哈希命名且原子写入，
+      内容变化必然伴随大小或修改时间变化，因此用 路径 + 大小 + mtime 作指纹，无需读全文件
+    - 命中时只需解码一张小图，代替对原图（常见 4000×3000）的完整解码 + 缩放
+    - 所有方法都是同步的，在渲染线程中调用
+    """
+
+    DIR = "thumbs"
+    VERSION = 1
+    """缩略图处理逻辑变化时递增，使旧缓存失效"""
+    JPEG_QUALITY = 95
+
+    def __init__(self, cache_dir: Path):
+        self.root = cache_dir / self.DIR
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, build: Callable[..., Any], src: Path, args: tuple) -> str | None:
+        try:
+            st = src.stat()
+        except OSError:
+            return None
+        raw = f"{self.VERSION}|{src}|{st.st_size}|{st.st_mtime_ns}|{build.__name__}|{args!r}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.root / f"{key}.jpg", self.root / f"{key}.png"
+
+    def get_or_build(
+        self,
+        build: Callable[..., PILImage | None],
+        src: Path | None,
+        *args: Any,
+    ) -> tuple[PILImage | None, Path | None, bool]:
+        """读取缓存的缩略图，未命中时调用 build(src, *args) 生成并落盘
+
+        Returns:
+            (图片, 缩略图路径, 是否命中)，源文件不存在或生成失败时图片为 None
+        """
+        key = self._key(build, src, args) if src is not None else None
+        if key is None:
+            return build(src, *args), None, False
+
+        for path in self._paths(key):
+            if path.exists() and (img := self._read(path)) is not None:
+                self.hits += 1
+                return img, path, True
+
+        self.misses += 1
+        img = build(src, *args)
+        if img is None:
+            return None, None, False
+        return img, self._write(key, img), False
+
+    @staticmethod
+    def _read(path: Path) -> PILImage | None:
+        try:
+            with Image.open(path) as img:
+                return img.copy()
+        except (
+            OSError,
+            UnidentifiedImageError,
+            ValueError,
+            Image.DecompressionBombError,
+        ) as e:
+            logger.debug(f"缩略图 {path.name} 损坏，已删除: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def _write(self, key: str, img: PILImage) -> Path | None:
+        """不透明图存 JPEG，带透明度 / 调色板的存 PNG 保持原样"""
+        jpg, png = self._paths(key)
+        path = jpg if img.mode in ("RGB", "L") else png
+        tmp = part_path(path)
+        try:
+            if path is jpg:
+                img.save(tmp, format="JPEG", quality=self.JPEG_QUALITY)
+            else:
+                img.save(tmp, format="PNG", compress_level=1)
+            os.replace(tmp, path)
+        except (OSError, ValueError) as e:
+            logger.debug(f"写入缩略图失败: {e}")
+            tmp.unlink(missing_ok=True)
+            return None
+        return path
+
+    def stats(self) -> dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -1,15 +1,21 @@
 import asyncio
 import hashlib
 import json
+import os
 from collections import OrderedDict
+from collections.abc import Callable, Coroutine, Hashable
 from pathlib import Path
-from typing import Any, TypeVar
+from typing import Any, Generic, TypeVar
 from urllib.parse import urlparse
 
 from astrbot.api import logger
 
 K = TypeVar("K")
 V = TypeVar("V")
+H = TypeVar("H", bound=Hashable)
+
+TIMEOUT_ERRORS: tuple[type[Exception], ...] = (TimeoutError, asyncio.TimeoutError)
+"""超时异常：Python 3.11 起 asyncio.TimeoutError 就是内置 TimeoutError，3.10 上仍是两个类"""
 
 
 class LimitedSizeDict(OrderedDict[K, V]):
@@ -27,6 +33,60 @@ class LimitedSizeDict(OrderedDict[K, V]):
             self.popitem(last=False)  # 移除最早添加的项
 
 
+class SingleFlight(Generic[H, V]):
+    """
+    并发合并（singleflight）
+    同一 key 的并发调用共享同一个 Task，只有第一个调用真正执行；
+    所有等待者都被取消后，共享的 Task 也随之取消
+    """
+
+    def __init__(self):
+        self._flights: dict[H, asyncio.Task[V]] = {}
+        self._waiters: dict[H, int] = {}
+
+    def __contains__(self, key: H) -> bool:
+        return key in self._flights
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: H, func: Callable[[], Coroutine[Any, Any, V]]) -> V:
+        """执行或加入 key 对应的调用
+
+        Args:
+            key: 合并键
+            func: 无参协程工厂，仅在没有进行中的调用时被执行
+        """
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            self._flights[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t: self._forget(key, t))
+        self._waiters[key] += 1
+        try:
+            # shield: 单个调用方被取消时不影响其它等待者
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._flights.get(key) is task and self._waiters[key] == 1:
+                # 最后一个等待者离开，没有人需要结果了
+                task.cancel()
+            raise
+        finally:
+            if self._flights.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: H, task: asyncio.Task[V]):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+            del self._waiters[key]
+
+
+def part_path(path: Path) -> Path:
+    """下载/合成过程中使用的临时文件路径，完成后原子替换为正式路径"""
+    return path.with_name(f"{path.name}.part")
+
+
 async def safe_unlink(path: Path):
     """
     安全删除文件
@@ -57,6 +117,29 @@ async def exec_ffmpeg_cmd(cmd: list[str]) -> None:
         raise RuntimeError(f"ffmpeg 执行失败: {error_msg}")
 
 
+async def write_pipe(fd: int, data: bytes) -> None:
+    """向非阻塞管道写入全部数据，管道写满时等待对端读取（不占用线程）
+
+    Args:
+        fd (int): 已设为非阻塞的管道写端
+        data (bytes): 要写入的数据
+    """
+    loop = asyncio.get_running_loop()
+    view = memoryview(data)
+    while view:
+        try:
+            written = os.write(fd, view)
+        except BlockingIOError:
+            writable = loop.create_future()
+            loop.add_writer(fd, writable.set_result, None)
+            try:
+                await writable
+            finally:
+                loop.remove_writer(fd)
+            continue
+        view = view[written:]
+
+
 async def merge_av(
     *,
     v_path: Path,
@@ -70,11 +153,11 @@ async def merge_av(
         a_path (Path): 音频文件路径
         output_path (Path): 输出文件路径
     """
+    # 先写入临时文件再原子替换，避免半成品被当作缓存命中
     target_path = output_path
-    if output_path in (v_path, a_path):
-        output_path = output_path.with_name(
-            f"{output_path.stem}_merged{output_path.suffix}"
-        )
+    output_path = output_path.with_name(
+        f"{output_path.stem}_merged{output_path.suffix}"
+    )
     logger.info(f"Merging {v_path.name} and {a_path.name} to {output_path.name}")
 
     cmd = [
@@ -93,11 +176,13 @@ async def merge_av(
         str(output_path),
     ]
 
-    await exec_ffmpeg_cmd(cmd)
-    if output_path != target_path:
-        await safe_unlink(target_path)
-        await asyncio.to_thread(output_path.replace, target_path)
-        output_path = target_path
+    try:
+        await exec_ffmpeg_cmd(cmd)
+    except BaseException:
+        await safe_unlink(output_path)
+        raise
+    await asyncio.to_thread(output_path.replace, target_path)
+    output_path = target_path
     cleanup = [p for p in (v_path, a_path) if p != output_path]
     await asyncio.gather(*(safe_unlink(p) for p in cleanup))
     logger.info(f"Merged {output_path.name}, {fmt_size(output_path)}")
@@ -181,6 +266,33 @@ async def encode_video_to_h264(video_path: Path) -> Path:
     return output_path
 
 
+async def remux_to_mp4(src_path: Path, output_path: Path) -> None:
+    """将 TS / fMP4 分片拼接结果无损封装为 mp4（不重新编码）
+
+    Args:
+        src_path (Path): 拼接好的分片文件
+        output_path (Path): 输出文件路径，写入时需为临时路径
+    """
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i",
+        str(src_path),
+        "-c",
+        "copy",
+        "-movflags",
+        "+faststart",
+        "-f",
+        "mp4",
+        str(output_path),
+    ]
+    try:
+        await exec_ffmpeg_cmd(cmd)
+    except BaseException:
+        await safe_unlink(output_path)
+        raise
+
+
 def fmt_size(file_path: Path) -> str:
     """格式化文件大小
 
@@ -0,0 +1,140 @@
+from collections.abc import Callable
+from itertools import accumulate
+
+NO_LINE_START = frozenset("，。！？；：、）】》〉」』〕〗〙〛…—·,.;:!?)]} 　")
+"""不能出现在行首的字符，超宽时悬挂在上一行末尾（每行最多一个，更长的连续段照常断行）"""
+
+ELLIPSIS = "…"
+
+_MEASURE_CHUNK = 512
+"""逐块测量字符宽度，达到行数上限后剩余文本不再测量"""
+
+
+def is_word_char(char: str) -> bool:
+    """拉丁字母 / 数字，连续出现时视为一个单词，不在中间断行"""
+    if char.isascii():
+        return char.isalnum() or char in "'_"
+    return "\u00c0" <= char <= "\u024f" and char.isalpha()
+
+
+def can_break_before(text: str, i: int) -> bool:
+    """text[i - 1] 与 text[i] 之间是否为断行点
+
+    - 行首禁则字符（标点、空格）之前不断行
+    - 单词内部不断行
+    - 其余位置（CJK 字符之间、单词与 CJK 之间、空格之后）均可断行
+    """
+    char = text[i]
+    if char in NO_LINE_START:
+        return False
+    return not (is_word_char(char) and is_word_char(text[i - 1]))
+
+
+def wrap_text(
+    text: str | None,
+    max_width: int,
+    char_width: Callable[[str], int],
+    max_lines: int | None = None,
+) -> list[str]:
+    """按像素宽度自动换行
+
+    每段只扫描一遍：字符宽度写入前缀和数组，行宽 / 回退到上一个断行点后的
+    剩余宽度都由前缀和相减得到，行内容在断行时一次切片，整体 O(n)。
+
+    Args:
+        text: 要处理的文本
+        max_width: 最大宽度（像素）
+        char_width: 单个字符宽度
+        max_lines: 最多保留的行数，超出时截断并以省略号结尾
+
+    Returns:
+        换行后的文本列表
+    """
+    if not text:
+        return []
+
+    lines: list[str] = []
+    for paragraph in text.splitlines():
+        if max_lines is not None and len(lines) >= max_lines:
+            _truncate(lines, max_lines, max_width, char_width)
+            break
+        if not paragraph:
+            lines.append("")
+            continue
+        budget = None if max_lines is None else max_lines - len(lines)
+        if _wrap_paragraph(paragraph, max_width, char_width, budget, lines):
+            _truncate(lines, max_lines, max_width, char_width)
+            break
+
+    return lines
+
+
+def _wrap_paragraph(
+    paragraph: str,
+    max_width: int,
+    char_width: Callable[[str], int],
+    budget: int | None,
+    lines: list[str],
+) -> bool:
+    """对单个段落换行并追加到 lines，行数达到 budget 且段落未排完时返回 True"""
+    n = len(paragraph)
+    prefix = [0]
+
+    def measure() -> None:
+        """再测量一块字符，追加到前缀和数组"""
+        measured = len(prefix) - 1
+        chunk = paragraph[measured : measured + _MEASURE_CHUNK]
+        sums = accumulate(map(char_width, chunk), initial=prefix[-1])
+        next(sums)
+        prefix.extend(sums)
+
+    added = 0
+    start = 0  # 当前行起点
+    i = 0
+    while i < n:
+        if i + 1 >= len(prefix):
+            measure()
+        if i == start or prefix[i + 1] - prefix[start] <= max_width:
+            i += 1
+            continue
+        if paragraph[i] in NO_LINE_START and prefix[i] - prefix[start] <= max_width:
+            # 标点、空格悬挂在行尾，不单独成行；每行最多悬挂一个
+            i += 1
+            continue
+
+        # 超宽：已悬挂过的连续标点、空格直接断开；
+        # 否则优先在 i 处断开，回退到行内最近的断行点，单词比整行还长时硬断
+        cut = i
+        if paragraph[i] not in NO_LINE_START:
+            while cut > start and not can_break_before(paragraph, cut):
+                cut -= 1
+            if cut == start:
+                cut = i
+        lines.append(paragraph[start:cut])
+        added += 1
+        if budget is not None and added >= budget:
+            return True
+        start = cut
+
+    lines.append(paragraph[start:])
+    return False
+
+
+def _truncate(
+    lines: list[str],
+    max_lines: int | None,
+    max_width: int,
+    char_width: Callable[[str], int],
+) -> None:
+    """截断到 max_lines 行，并在最后一行末尾加省略号（必要时删去末尾字符腾出宽度）"""
+    if max_lines is None or max_lines <= 0:
+        lines.clear()
+        return
+    del lines[max_lines:]
+    last = lines[-1].rstrip()
+    limit = max_width - char_width(ELLIPSIS)
+    widths = list(accumulate(map(char_width, last), initial=0))
+    end = len(last)
+    while end > 0 and widths[end] > limit:
+        end -= 1
+    lines[-1] = last[:end] + ELLIPSIS
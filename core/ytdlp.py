@@ -0,0 +1,468 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from astrbot.api import logger
+
+from . import ytdlp_worker
+from .exception import ParseException, YtdlpException
+from .utils import TIMEOUT_ERRORS, LimitedSizeDict, part_path
+
+ProgressCallback = Callable[[dict[str, Any]], None]
+"""下载进度回调，参数为 ytdlp_worker 回报的进度字典；抛出 ParseException 即中止任务"""
+
+
+def options_fingerprint(opts: Mapping[str, Any]) -> str:
+    """yt-dlp 选项集的指纹
+
+    cookie 文件只按路径计入：yt-dlp 每次关闭实例都会写回 cookie 文件，
+    按内容或修改时间计入会让同一选项集的指纹不停变化
+    """
+    text = json.dumps(opts, sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+class YtdlpInfoCache:
+    """
+    yt-dlp 解析结果（info dict）缓存
+
+    - 以 url + 选项指纹为键，每条结果存为数据目录下的一个 JSON 文件，重启后仍可用
+    - 按文件修改时间判断过期（视频直链会失效，TTL 应远小于直链有效期），
+      超过条数上限时删除最旧的
+    - 文件本身可直接交给 YoutubeDL.download_with_info_file 下载，省去二次解析；
+      直链已失效时 yt-dlp 会按 webpage_url 重新解析
+    - 内存中保留最近用过的若干条，热点链接不必每次读盘
+    """
+
+    PRUNE_SLACK = 1.1
+    """条数超过上限的此倍数时才清理，避免每次写入都扫描目录"""
+
+    def __init__(
+        self, root: Path, ttl: float, max_entries: int = 512, memory_size: int = 32
+    ):
+        self.root = root
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory: LimitedSizeDict[str, tuple[float, dict[str, Any]]] = (
+            LimitedSizeDict(max_size=memory_size)
+        )
+        self._count: int | None = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def key(url: str, fingerprint: str) -> str:
+        return hashlib.sha1(f"{url}\0{fingerprint}".encode()).hexdigest()[:24]
+
+    def path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    async def get(self, key: str) -> tuple[dict[str, Any], Path] | None:
+        """取未过期的结果及其 JSON 文件路径"""
+        if not self.enabled:
+            return None
+        path = self.path(key)
+        if (cached := self._memory.get(key)) is not None:
+            expires, info = cached
+            if expires > time.time() and path.exists():
+                self.hits += 1
+                return info, path
+            self._memory.pop(key, None)
+        try:
+            info, expires = await asyncio.to_thread(self._read, path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if expires <= time.time():
+            self.misses += 1
+            return None
+        self._memory[key] = (expires, info)
+        self.hits += 1
+        return info, path
+
+    async def put(self, key: str, info: dict[str, Any]) -> Path | None:
+        """写入一条结果（已经 sanitize_info 处理），返回其 JSON 文件路径；写入失败只影响缓存"""
+        if not self.enabled:
+            return None
+        path = self.path(key)
+        try:
+            await asyncio.to_thread(self._write, path, info)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"[yt-dlp 缓存] 写入失败: {e}")
+            return None
+        self._memory[key] = (time.time() + self.ttl, info)
+        if self._count is not None:
+            self._count += 1
+        if self._count is None or self._count > self.max_entries * self.PRUNE_SLACK:
+            self._count = await asyncio.to_thread(self._prune)
+        return path
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": self._count or 0,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _read(self, path: Path) -> tuple[dict[str, Any], float]:
+        expires = path.stat().st_mtime + self.ttl
+        if expires <= time.time():
+            return {}, expires
+        return json.loads(path.read_text("utf-8")), expires
+
+    def _write(self, path: Path, info: dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = part_path(path)
+        tmp.write_text(json.dumps(info, ensure_ascii=False), "utf-8")
+        os.replace(tmp, path)
+
+    def _prune(self) -> int:
+        """删除过期条目，仍超出上限时从最旧的删起，返回剩余条数"""
+        expire_before = time.time() - self.ttl
+        alive: list[tuple[float, Path]] = []
+        for path in self.root.glob("*.json"):
+            try:
+                mtime = path.stat().st_mtime
+                if mtime < expire_before:
+                    path.unlink(missing_ok=True)
+                else:
+                    alive.append((mtime, path))
+            except OSError:
+                continue
+        alive.sort()
+        for _, path in alive[: max(0, len(alive) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+        return min(len(alive), self.max_entries)
+
+
+class _WorkerProcess:
+    """常驻的 yt-dlp 工作进程，一次执行一个任务"""
+
+    SCRIPT = Path(__file__).with_name("ytdlp_worker.py")
+    # 按文件路径加载工作脚本：不导入插件包，也不把 core 目录加入 sys.path
+    # （core/http.py 等模块会遮蔽同名标准库）
+    BOOTSTRAP = (
+        "import importlib.util, sys\n"
+        "spec = importlib.util.spec_from_file_location('ytdlp_worker', sys.argv[1])\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+        "module.main()\n"
+    )
+    MAX_MESSAGE = 64 * 1024 * 1024
+    """单条消息（主要是 info dict）的长度上限"""
+
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+
+    @classmethod
+    async def start(cls) -> "_WorkerProcess":
+        env = dict(os.environ)
+        # 与父进程使用相同的模块搜索路径
+        env["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            cls.BOOTSTRAP,
+            str(cls.SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env=env,
+            limit=cls.MAX_MESSAGE,
+        )
+        return cls(proc)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    async def run(
+        self, job: dict[str, Any], on_progress: ProgressCallback | None
+    ) -> Any:
+        assert self.proc.stdin is not None and self.proc.stdout is not None
+        self.proc.stdin.write(json.dumps(job, ensure_ascii=False).encode() + b"\n")
+        await self.proc.stdin.drain()
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                raise YtdlpException("yt-dlp 工作进程意外退出")
+            message = json.loads(line)
+            if message.get("id") != job["id"]:
+                continue
+            if "progress" in message:
+                if on_progress is not None:
+                    on_progress(message["progress"])
+            elif "error" in message:
+                raise YtdlpException(message["error"])
+            else:
+                return message["result"]
+
+    def kill(self) -> None:
+        if self.alive:
+            self.proc.kill()
+
+    async def stop(self, timeout: float = 5) -> None:
+        """关闭 stdin 让进程自行退出（写回 cookie），超时则强制结束"""
+        if self.proc.stdin is not None and not self.proc.stdin.is_closing():
+            self.proc.stdin.close()
+        try:
+            await asyncio.wait_for(self.proc.wait(), timeout)
+        except TIMEOUT_ERRORS:
+            self.kill()
+            await self.proc.wait()
+
+
+class YtdlpExecutor:
+    """
+    yt-dlp 任务执行器
+
+    - 默认在常驻的独立进程中执行（见 ytdlp_worker），JS 签名解算、格式排序等
+      CPU 密集的工作不与默认线程池里的文件、渲染、网络任务争抢 GIL；
+      进程内按选项集保留已初始化的 YoutubeDL 实例。进程无法启动时退回专用线程
+    - 同时执行的任务不超过 workers 个，其余按优先级排队（解析先于下载）；
+      排队数超过 queue_size 时直接拒绝，突发请求不会越积越多
+    - 任务超时、调用方取消或进度回调抛出异常时，结束执行它的工作进程，
+      需要时再启动新的（线程模式下只能在下一次进度回报时中止下载）
+    - 下载进度回传给调用方
+    """
+
+    EXTRACT = 0
+    """解析任务的排队优先级（数值越小越先执行）"""
+    DOWNLOAD = 1
+    """下载任务的排队优先级"""
+
+    def __init__(self, workers: int, queue_size: int, use_process: bool = True):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.use_process = use_process
+        self._idle: list[_WorkerProcess] = []
+        self._procs: set[_WorkerProcess] = set()
+        self._threads: ThreadPoolExecutor | None = None
+        self._active = 0
+        self._queue: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._job_ids = itertools.count(1)
+        self._reaping: set[asyncio.Task] = set()
+        # 指标
+        self.submitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.killed = 0
+        self.started = 0
+        self.max_queued = 0
+
+    async def extract(
+        self, opts: dict[str, Any], url: str, fingerprint: str, *, timeout: float
+    ) -> dict[str, Any]:
+        """解析 url，返回 sanitize_info 处理过的 info dict"""
+        job = {"op": "extract", "opts": opts, "url": url, "fingerprint": fingerprint}
+        return await self._submit(job, self.EXTRACT, timeout, None)
+
+    async def download(
+        self,
+        opts: dict[str, Any],
+        url: str,
+        info_path: Path | None,
+        *,
+        timeout: float,
+        on_progress: ProgressCallback | None = None,
+    ) -> int:
+        """下载 url，有缓存的解析结果时直接据此下载，返回 yt-dlp 的返回码"""
+        job = {
+            "op": "download",
+            "opts": opts,
+            "url": url,
+            "info_path": str(info_path) if info_path else None,
+        }
+        return await self._submit(job, self.DOWNLOAD, timeout, on_progress)
+
+    async def _submit(
+        self,
+        job: dict[str, Any],
+        priority: int,
+        timeout: float,
+        on_progress: ProgressCallback | None,
+    ) -> Any:
+        await self._acquire(priority)
+        self.submitted += 1
+        job["id"] = next(self._job_ids)
+        try:
+            if self.use_process:
+                coro = self._run_in_process(job, on_progress)
+            else:
+                coro = self._run_in_thread(job, on_progress)
+            return await asyncio.wait_for(coro, timeout)
+        except TIMEOUT_ERRORS:
+            self.timeouts += 1
+            raise YtdlpException(f"yt-dlp 任务超时（{timeout:g} 秒）") from None
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        if self._active < self.workers and not self._queue:
+            self._active += 1
+            return
+        if len(self._queue) >= self.queue_size:
+            self.rejected += 1
+            raise YtdlpException("yt-dlp 任务过多，请稍后再试")
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), future)
+        heapq.heappush(self._queue, entry)
+        self.max_queued = max(self.max_queued, len(self._queue))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已被放行后才取消，名额让给下一个
+                self._release()
+            elif entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            raise
+
+    def _release(self) -> None:
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                # 名额直接移交给排队者
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    async def _run_in_process(
+        self, job: dict[str, Any], on_progress: ProgressCallback | None
+    ) -> Any:
+        if self._idle:
+            worker = self._idle.pop()
+        else:
+            try:
+                worker = await _WorkerProcess.start()
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"[yt-dlp] 无法启动工作进程，改用线程执行: {e}")
+                self.use_process = False
+                return await self._run_in_thread(job, on_progress)
+            self._procs.add(worker)
+            self.started += 1
+        try:
+            result = await worker.run(job, on_progress)
+        except YtdlpException:
+            # 任务本身失败，进程仍可复用
+            self._recycle(worker)
+            raise
+        except BaseException:
+            # 超时、取消、回调中止：进程里的任务仍在运行，直接结束进程
+            self._discard(worker)
+            raise
+        self._recycle(worker)
+        return result
+
+    def _recycle(self, worker: _WorkerProcess) -> None:
+        if worker.alive:
+            self._idle.append(worker)
+        else:
+            self._discard(worker)
+
+    def _discard(self, worker: _WorkerProcess) -> None:
+        self._procs.discard(worker)
+        if worker.alive:
+            worker.kill()
+            self.killed += 1
+        task = asyncio.create_task(worker.proc.wait())
+        self._reaping.add(task)
+        task.add_done_callback(self._reaping.discard)
+
+    async def _run_in_thread(
+        self, job: dict[str, Any], on_progress: ProgressCallback | None
+    ) -> Any:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="parser-ytdlp"
+            )
+        loop = asyncio.get_running_loop()
+        aborted = threading.Event()
+        failure: list[ParseException] = []
+
+        def deliver(progress: dict[str, Any]) -> None:
+            if aborted.is_set() or on_progress is None:
+                return
+            try:
+                on_progress(progress)
+            except ParseException as e:
+                failure.append(e)
+                aborted.set()
+
+        def report(progress: dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(deliver, progress)
+
+        future = loop.run_in_executor(
+            self._threads, partial(_run_job, job, report, aborted)
+        )
+        try:
+            return await future
+        except ytdlp_worker.JobAborted:
+            if failure:
+                raise failure[0] from None
+            raise YtdlpException("yt-dlp 任务已中止") from None
+        finally:
+            # 超时或取消时让下载在下一次进度回报时停下（解析无法中途停止）
+            aborted.set()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "processes": len(self._procs),
+            "active": self._active,
+            "queued": len(self._queue),
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "killed": self.killed,
+            "started": self.started,
+            "max_queued": self.max_queued,
+        }
+
+    async def close(self) -> None:
+        """结束所有工作进程和线程"""
+        procs, self._procs = self._procs, set()
+        self._idle.clear()
+        await asyncio.gather(
+            *(worker.stop() for worker in procs), return_exceptions=True
+        )
+        if self._reaping:
+            await asyncio.gather(*self._reaping, return_exceptions=True)
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+        ytdlp_worker.pool.close()
+
+
+def _run_job(
+    job: dict[str, Any],
+    report: ytdlp_worker.Reporter,
+    aborted: threading.Event,
+) -> Any:
+    """线程模式下执行一个任务，yt-dlp 的异常统一转为 YtdlpException"""
+    try:
+        if job["op"] == "extract":
+            return ytdlp_worker.extract(job["opts"], job["url"], job["fingerprint"])
+        return ytdlp_worker.download(
+            job["opts"], job["url"], job["info_path"], report, aborted
+        )
+    except ytdlp_worker.JobAborted:
+        raise
+    except ytdlp_worker.JOB_ERRORS as e:
+        raise YtdlpException(str(e) or type(e).__name__) from None
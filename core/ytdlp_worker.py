@@ -0,0 +1,235 @@
+"""
+yt-dlp 任务的执行端
+
+- 进程模式下作为独立脚本运行（由 YtdlpExecutor 按文件路径加载，不导入插件包），
+  只依赖标准库和 yt-dlp：从 stdin 逐行读取 JSON 任务，向 stdout 逐行写回进度和结果
+- 线程模式下由 YtdlpExecutor 直接在专用线程中调用 extract / download
+- 每个进程按选项集保留已初始化的 YoutubeDL 实例，后续解析直接复用
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+import yt_dlp
+from yt_dlp.utils import DownloadCancelled, YoutubeDLError
+
+PROGRESS_INTERVAL = 0.5
+"""两次下载进度回报的最小间隔秒数"""
+
+Reporter = Callable[[dict[str, Any]], None]
+
+JOB_ERRORS = (YoutubeDLError, OSError, TypeError)
+"""任务失败时预期的异常：yt-dlp 解析 / 下载出错、读写文件出错、解析结果不是字典"""
+
+
+class JobAborted(DownloadCancelled):
+    """调用方要求中止任务（线程模式下由进度回调抛出，yt-dlp 会原样向上传递）"""
+
+    msg = "任务已中止"
+
+
+class YoutubeDLPool:
+    """
+    按选项集复用 YoutubeDL 实例
+
+    - 构造 YoutubeDL 要加载 cookie、插件和网络层，首次解析某个站点还要初始化提取器；
+      归还的实例保留这些状态，同一选项集的下一次解析直接使用
+    - 实例同一时刻只借给一个任务，任务结束后由执行它的线程归还
+    - 每个选项集最多保留 max_idle 个空闲实例，选项集按 LRU 保留 max_option_sets 个
+    - 实例创建超过 max_age 秒后不再复用，cookie 文件的更新随之生效
+    """
+
+    def __init__(
+        self, max_idle: int = 2, max_option_sets: int = 8, max_age: float = 600
+    ):
+        self.max_idle = max_idle
+        self.max_option_sets = max_option_sets
+        self.max_age = max_age
+        self._idle: OrderedDict[str, list[tuple[float, yt_dlp.YoutubeDL]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def take(self, opts: dict[str, Any], key: str) -> tuple[float, yt_dlp.YoutubeDL]:
+        """借出一个实例，没有可用的空闲实例时新建"""
+        expired: list[yt_dlp.YoutubeDL] = []
+        found: tuple[float, yt_dlp.YoutubeDL] | None = None
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                created_at, ydl = idle.pop()
+                if time.monotonic() - created_at < self.max_age:
+                    self.reused += 1
+                    found = (created_at, ydl)
+                    break
+                expired.append(ydl)
+        for ydl in expired:
+            self._close(ydl)
+        if found is not None:
+            return found
+        # yt-dlp 会改写传入的选项字典，复制一份
+        ydl = yt_dlp.YoutubeDL(dict(opts))  # type: ignore[arg-type]
+        with self._lock:
+            self.created += 1
+        return time.monotonic(), ydl
+
+    def give(self, key: str, created_at: float, ydl: yt_dlp.YoutubeDL) -> None:
+        """归还实例，超出空闲上限或淘汰出的实例随即关闭"""
+        closing: list[yt_dlp.YoutubeDL] = []
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            if len(idle) < self.max_idle:
+                idle.append((created_at, ydl))
+            else:
+                closing.append(ydl)
+            while len(self._idle) > self.max_option_sets:
+                _, evicted = self._idle.popitem(last=False)
+                closing.extend(old for _, old in evicted)
+        for old in closing:
+            self._close(old)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "option_sets": len(self._idle),
+                "idle": sum(len(v) for v in self._idle.values()),
+                "created": self.created,
+                "reused": self.reused,
+            }
+
+    def close(self) -> None:
+        """关闭所有空闲实例（写回 cookie 文件）"""
+        with self._lock:
+            idle = [ydl for v in self._idle.values() for _, ydl in v]
+            self._idle.clear()
+        for ydl in idle:
+            self._close(ydl)
+
+    @staticmethod
+    def _close(ydl: yt_dlp.YoutubeDL) -> None:
+        try:
+            ydl.close()
+        except OSError as e:
+            print(f"[yt-dlp] 关闭实例失败: {e}", file=sys.stderr)
+
+
+pool = YoutubeDLPool()
+"""本进程的实例池（线程模式下所有执行线程共用）"""
+
+
+def extract(opts: dict[str, Any], url: str, fingerprint: str) -> dict[str, Any]:
+    """解析 url，返回可 JSON 序列化的 info dict"""
+    created_at, ydl = pool.take(opts, fingerprint)
+    try:
+        raw = ydl.extract_info(url, download=False)
+        if not isinstance(raw, dict):
+            raise TypeError("获取视频信息失败")
+        # 归还前用完实例，线程模式下归还后可能立刻被其它线程借走
+        return ydl.sanitize_info(raw)
+    finally:
+        pool.give(fingerprint, created_at, ydl)
+
+
+def _progress_hook(
+    report: Reporter, aborted: threading.Event | None
+) -> Callable[[dict[str, Any]], None]:
+    last = 0.0
+
+    def hook(d: dict[str, Any]) -> None:
+        nonlocal last
+        if aborted is not None and aborted.is_set():
+            raise JobAborted
+        now = time.monotonic()
+        if d.get("status") == "downloading" and now - last < PROGRESS_INTERVAL:
+            return
+        last = now
+        report(
+            {
+                "status": d.get("status"),
+                "filename": os.path.basename(d.get("filename") or ""),
+                "downloaded": d.get("downloaded_bytes") or 0,
+                "total": d.get("total_bytes") or d.get("total_bytes_estimate") or 0,
+                "speed": d.get("speed") or 0,
+            }
+        )
+
+    return hook
+
+
+def download(
+    opts: dict[str, Any],
+    url: str,
+    info_path: str | None,
+    report: Reporter | None = None,
+    aborted: threading.Event | None = None,
+) -> int:
+    """下载 url，有缓存的解析结果时直接据此下载
+
+    Args:
+        report: 进度回报函数，为 None 时由 yt-dlp 自行输出进度
+        aborted: 线程模式下的中止标记，置位后在下一次进度回调时中止下载
+
+    Returns:
+        int: yt-dlp 的返回码
+    """
+    if report is not None:
+        # 进度改由调用方展示
+        hook = _progress_hook(report, aborted)
+        opts = {**opts, "noprogress": True, "progress_hooks": [hook]}
+    with yt_dlp.YoutubeDL(opts) as ydl:  # type: ignore[arg-type]
+        if info_path is not None:
+            try:
+                return ydl.download_with_info_file(info_path)
+            except FileNotFoundError:
+                # 缓存文件恰好过期被清理，改为重新解析
+                pass
+        return ydl.download([url])
+
+
+def main() -> None:
+    """进程模式入口：逐个执行 stdin 送来的任务，直到 stdin 关闭"""
+    # stdout 留给协议，yt-dlp 及其它输出一律改到 stderr
+    out = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    sys.stdin.reconfigure(encoding="utf-8")  # type: ignore[union-attr]
+
+    def send(message: dict[str, Any]) -> None:
+        out.write(json.dumps(message, ensure_ascii=False) + "\n")
+        out.flush()
+
+    try:
+        for line in sys.stdin:
+            job = json.loads(line)
+            job_id = job["id"]
+
+            def report(progress: dict[str, Any], job_id=job_id) -> None:
+                send({"id": job_id, "progress": progress})
+
+            try:
+                if job["op"] == "extract":
+                    result = extract(job["opts"], job["url"], job["fingerprint"])
+                else:
+                    result = download(job["opts"], job["url"], job["info_path"], report)
+            except Exception as e:  # noqa: BLE001
+                # 任何失败都回报给主进程，本进程继续处理后续任务
+                send({"id": job_id, "error": str(e) or type(e).__name__})
+            else:
+                send({"id": job_id, "result": result})
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 
 import asyncio
 import re
+from collections import Counter
 
 from astrbot.api import logger
 from astrbot.api.event import filter
@@ -14,41 +15,66 @@ from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_message_event import (
 )
 
 from .core.arbiter import ArbiterContext, EmojiLikeArbiter
+from .core.cache import ParseResultCache
 from .core.clean import CacheCleaner
 from .core.config import PluginConfig
+from .core.data import ParseResult
 from .core.debounce import Debouncer
 from .core.download import Downloader
+from .core.http import HttpClientFactory
+from .core.matcher import KeywordMatcher
+from .core.media_index import MediaCacheIndex
 from .core.parsers import BaseParser, BilibiliParser
 from .core.render import Renderer
+from .core.scope import TaskScope
 from .core.sender import MessageSender
-from .core.utils import extract_json_url
+from .core.utils import SingleFlight, extract_json_url
 
 
 class ParserPlugin(Star):
     def __init__(self, context: Context, config: AstrBotConfig):
         super().__init__(context)
         self.cfg = PluginConfig(config, context=context)
+        # 媒体缓存索引
+        self.media_index = MediaCacheIndex(
+            root=self.cfg.cache_dir,
+            db_path=self.cfg.media_index_file,
+            max_bytes=self.cfg.cache_max_bytes,
+        )
         # 渲染器
-        self.renderer = Renderer(self.cfg)
+        self.renderer = Renderer(self.cfg, self.media_index)
+        # HTTP 客户端工厂（共享连接池）
+        self.http = HttpClientFactory(self.cfg)
         # 下载器
-        self.downloader = Downloader(self.cfg)
+        self.downloader = Downloader(self.cfg, self.media_index, self.http)
         # 防抖器
         self.debouncer = Debouncer(self.cfg)
+        # 解析结果缓存（跨会话）
+        self.parse_cache = ParseResultCache(
+            ttl=self.cfg.parse_cache_ttl, max_size=self.cfg.parse_cache_size
+        )
+        # 进行中的解析（按资源键合并并发请求）
+        self.parse_flights: SingleFlight[str, ParseResult] = SingleFlight()
+        # 正在发送的资源（资源 ID -> 发送中的会话数），防抖丢弃结果时据此决定能否取消下载
+        self.sending: Counter[str] = Counter()
         # 仲裁器
         self.arbiter = EmojiLikeArbiter()
         # 消息发送器
-        self.sender = MessageSender(self.cfg, self.renderer)
+        self.sender = MessageSender(self.cfg, self.renderer, self.media_index)
         # 缓存清理器
-        self.cleaner = CacheCleaner(self.cfg)
+        self.cleaner = CacheCleaner(self.cfg, self.media_index)
         # 关键词 -> Parser 映射
         self.parser_map: dict[str, BaseParser] = {}
-        # 关键词 -> 正则 列表
-        self.key_pattern_list: list[tuple[str, re.Pattern[str]]] = []
+        # 关键词-正则匹配器
+        self.matcher = KeywordMatcher([])
 
     async def initialize(self):
         """加载、重载插件时触发"""
         # 加载渲染器资源
         await asyncio.to_thread(Renderer.load_resources)
+        await asyncio.to_thread(self.renderer.load_emoji_atlas)
+        # 加载媒体缓存索引（与磁盘对账）
+        await self.media_index.load()
         # 注册解析器
         self._register_parser()
 
@@ -60,8 +86,16 @@ class ParserPlugin(Star):
         unique_parsers = set(self.parser_map.values())
         for parser in unique_parsers:
             await parser.close_session()
+        # 关共享连接池
+        await self.http.close()
         # 关缓存清理器
         await self.cleaner.stop()
+        # 关渲染线程池
+        self.renderer.close()
+        # 写回并关闭媒体缓存索引
+        await self.media_index.close()
+        # 清空解析结果缓存
+        self.parse_cache.clear()
 
     def _register_parser(self):
         """注册解析器（以 parser.enable 为唯一启用来源）"""
@@ -90,19 +124,12 @@ class ParserPlugin(Star):
 
         logger.debug(f"启用平台: {'、'.join(enabled_names) if enabled_names else '无'}")
 
-        # -------- 关键词-正则表（统一生成） --------
-        patterns: list[tuple[str, re.Pattern[str]]] = []
+        # -------- 关键词-正则匹配器（统一生成，长关键词优先） --------
+        self.matcher = KeywordMatcher(
+            (kw, pat) for cls in enabled_classes for kw, pat in cls._key_patterns
+        )
 
-        for cls in enabled_classes:
-            for kw, pat in cls._key_patterns:
-                patterns.append((kw, re.compile(pat) if isinstance(pat, str) else pat))
-
-        # 长关键词优先，避免短词抢匹配
-        patterns.sort(key=lambda x: -len(x[0]))
-
-        self.key_pattern_list = patterns
-
-        logger.debug(f"[parser] 关键词-正则对已生成: {[kw for kw, _ in patterns]}")
+        logger.debug(f"[parser] 关键词-正则对已生成: {self.matcher.keywords}")
 
     def _get_parser_by_type(self, parser_type):
         for parser in self.parser_map.values():
@@ -146,16 +173,10 @@ class ParserPlugin(Star):
             return
 
         # 核心匹配逻辑 ：关键词 + 正则双重判定，汇集了所有解析器的正则对。
-        keyword: str = ""
-        searched: re.Match[str] | None = None
-        for kw, pat in self.key_pattern_list:
-            if kw not in text:
-                continue
-            if m := pat.search(text):
-                keyword, searched = kw, m
-                break
-        if searched is None:
+        matched = self.matcher.search(text)
+        if matched is None:
             return
+        keyword, searched = matched
         logger.debug(f"匹配结果: {keyword}, {searched}")
 
         # 仲裁机制
@@ -183,17 +204,74 @@ class ParserPlugin(Star):
             logger.warning(f"[链接防抖] 链接 {link} 在防抖时间内，跳过解析")
             return
 
-        # 解析
-        parse_res = await self.parser_map[keyword].parse(keyword, searched)
+        # 解析与发送在同一个任务域中进行，提前返回或出错时取消遗留的下载
+        async with TaskScope(link) as scope:
+            await self._parse_and_send(event, keyword, searched, scope)
+        if scope.cancelled:
+            logger.debug(
+                f"[任务域] {link} 取消 {scope.cancelled} 个未完成的下载，"
+                f"丢弃 {scope.cancelled_bytes / 1024 / 1024:.2f} MB，"
+                f"节省 {scope.saved_bytes / 1024 / 1024:.2f} MB"
+            )
+
+    async def _parse_and_send(
+        self,
+        event: AstrMessageEvent,
+        keyword: str,
+        searched: re.Match[str],
+        scope: TaskScope,
+    ):
+        umo = event.unified_msg_origin
+
+        # 解析（优先复用其它会话的解析结果）
+        parse_res = await self._parse(keyword, searched)
+        if self.parse_cache.enabled:
+            # 缓存中的结果会被后续会话取用，已创建的下载 Task 取消后无法重新发起，
+            # 交由缓存保留；延迟下载仍归本请求，取消后可再次发起
+            scope.release(parse_res.iter_download_tasks())
 
         # 基于资源ID防抖
         resource_id = parse_res.get_resource_id()
         if self.debouncer.hit_resource(umo, resource_id):
             logger.warning(f"[资源防抖] 资源 {resource_id} 在防抖时间内，跳过发送")
+            if self.sending[resource_id]:
+                # 其它会话正在发送同一结果，下载仍有人等待
+                scope.detach()
+            elif cancelled := parse_res.cancel_downloads(
+                keep_tasks=self.parse_cache.enabled
+            ):
+                logger.debug(f"[资源防抖] 已取消 {cancelled} 个进行中的下载")
             return
 
         # 发送
-        await self.sender.send_parse_result(event, parse_res)
+        self.sending[resource_id] += 1
+        try:
+            await self.sender.send_parse_result(event, parse_res)
+        finally:
+            self.sending[resource_id] -= 1
+            if self.sending[resource_id] <= 0:
+                del self.sending[resource_id]
+            else:
+                scope.detach()
+
+    async def _parse(self, keyword: str, searched: re.Match[str]) -> ParseResult:
+        """解析链接：先查跨会话缓存，再合并同一资源的并发解析"""
+        parser = self.parser_map[keyword]
+        resource_key = parser.get_resource_key(keyword, searched)
+        if (parse_res := self.parse_cache.get(resource_key)) is not None:
+            logger.debug(
+                f"[解析缓存] 命中 {resource_key}, 统计: {self.parse_cache.stats()}"
+            )
+            return parse_res
+
+        async def do_parse() -> ParseResult:
+            parse_res = await parser.parse(keyword, searched)
+            self.parse_cache.set(resource_key, parse_res)
+            return parse_res
+
+        if resource_key in self.parse_flights:
+            logger.debug(f"[解析合并] {resource_key} 正在解析中，等待其结果")
+        return await self.parse_flights.do(resource_key, do_parse)
 
     @filter.permission_type(filter.PermissionType.ADMIN)
     @filter.command("开启解析")
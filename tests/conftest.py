@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def astrbot_stub(monkeypatch: pytest.MonkeyPatch) -> types.ModuleType:
+    """用最小桩模块替代 AstrBot 的 logger 和插件配置，AstrBot 未安装时也能导入 core
+
+    返回桩 astrbot.api 模块；需要重新导入的 core 模块由各测试自行从 sys.modules 移除
+    """
+    logger = SimpleNamespace(
+        debug=lambda *args, **kwargs: None,
+        info=lambda *args, **kwargs: None,
+        warning=lambda *args, **kwargs: None,
+        error=lambda *args, **kwargs: None,
+        exception=lambda *args, **kwargs: None,
+    )
+    astrbot_pkg = types.ModuleType("astrbot")
+    astrbot_pkg.__path__ = []
+    api_module = types.ModuleType("astrbot.api")
+    api_module.logger = logger
+    config_module = types.ModuleType("core.config")
+    config_module.PluginConfig = object
+    config_module.ParserItem = object
+    monkeypatch.setitem(sys.modules, "astrbot", astrbot_pkg)
+    monkeypatch.setitem(sys.modules, "astrbot.api", api_module)
+    monkeypatch.setitem(sys.modules, "core.config", config_module)
+    return api_module
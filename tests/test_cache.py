@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from core.cache import ParseResultCache
+from core.data import ImageContent, ParseResult, Platform
+
+PLATFORM = Platform(name="test", display_name="测试")
+
+
+def make_result(*paths: Path) -> ParseResult:
+    return ParseResult(
+        platform=PLATFORM, contents=[ImageContent(path) for path in paths]
+    )
+
+
+def test_hit_and_miss_counters(tmp_path: Path):
+    img = tmp_path / "a.jpg"
+    img.write_bytes(b"x")
+    cache = ParseResultCache(ttl=60)
+    result = make_result(img)
+
+    assert cache.get("k") is None
+    cache.set("k", result)
+    assert cache.get("k") is result
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entry_expires_after_ttl(tmp_path: Path, monkeypatch):
+    import core.cache as cache_module
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = ParseResultCache(ttl=10)
+    cache.set("k", make_result())
+    now[0] += 11
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ParseResultCache(ttl=60, max_size=2)
+    a, b, c = make_result(), make_result(), make_result()
+    cache.set("a", a)
+    cache.set("b", b)
+    assert cache.get("a") is a
+    cache.set("c", c)
+    assert cache.get("b") is None
+    assert cache.get("a") is a
+    assert cache.get("c") is c
+
+
+def test_cleaned_media_invalidates_entry(tmp_path: Path):
+    img = tmp_path / "a.jpg"
+    img.write_bytes(b"x")
+    cache = ParseResultCache(ttl=60)
+    cache.set("k", make_result(img))
+    img.unlink()
+    assert cache.get("k") is None
+
+
+def test_finished_tasks_are_settled_to_paths(tmp_path: Path):
+    img = tmp_path / "a.jpg"
+    img.write_bytes(b"x")
+
+    async def main():
+        async def download() -> Path:
+            return img
+
+        task = asyncio.create_task(download())
+        await task
+        result = ParseResult(platform=PLATFORM, contents=[ImageContent(task)])
+        cache = ParseResultCache(ttl=60)
+        cache.set("k", result)
+        assert cache.get("k") is result
+        assert result.contents[0].path_task == img
+
+    asyncio.run(main())
+
+
+def test_zero_ttl_disables_cache():
+    cache = ParseResultCache(ttl=0)
+    cache.set("k", make_result())
+    assert cache.get("k") is None
+
+
+def test_card_cache_lookup_order_and_stats(tmp_path: Path):
+    from core.cache import CardCache
+
+    cache = CardCache(tmp_path, max_bytes=1024)
+    assert cache.get_path("k") is None
+    assert cache.get("k") is None
+
+    cache.set("k", b"jpg", ".jpg")
+    assert cache.get("k") == (b"jpg", ".jpg")
+
+    cache.path("k", ".jpg").write_bytes(b"jpg")
+    assert cache.get_path("k") == tmp_path / "card_k.jpg"
+
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 2 / 3
+
+
+def test_card_cache_evicts_by_total_bytes(tmp_path: Path):
+    from core.cache import CardCache
+
+    cache = CardCache(tmp_path, max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    assert cache.get("a") == (b"1234", ".png")
+    cache.set("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] == 8
+
+    cache.set("big", b"x" * 11)
+    assert cache.get("big") is None
+    assert len(cache) == 2
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import importlib
 import sys
-import types
 from http.cookiejar import MozillaCookieJar
 from pathlib import Path
 from types import SimpleNamespace
@@ -11,23 +10,7 @@ import pytest
 
 
 @pytest.fixture
-def cookie_module(monkeypatch: pytest.MonkeyPatch):
-    logger = SimpleNamespace(
-        debug=lambda *args, **kwargs: None, warning=lambda *args, **kwargs: None
-    )
-
-    astrbot_pkg = types.ModuleType("astrbot")
-    astrbot_pkg.__path__ = []
-    api_module = types.ModuleType("astrbot.api")
-    api_module.logger = logger
-    monkeypatch.setitem(sys.modules, "astrbot", astrbot_pkg)
-    monkeypatch.setitem(sys.modules, "astrbot.api", api_module)
-
-    config_module = types.ModuleType("core.config")
-    config_module.ParserItem = object
-    config_module.PluginConfig = object
-    monkeypatch.setitem(sys.modules, "core.config", config_module)
-
+def cookie_module(monkeypatch: pytest.MonkeyPatch, astrbot_stub):
     monkeypatch.delitem(sys.modules, "core.cookie", raising=False)
 
     return importlib.import_module("core.cookie")
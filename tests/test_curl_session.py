@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+
+@pytest.fixture
+def base_module(monkeypatch: pytest.MonkeyPatch, astrbot_stub):
+    return importlib.import_module("core.parsers.base")
+
+
+def make_parser(base_module, tmp_path, max_clients: int):
+    from core.data import Platform
+
+    class DummyParser(base_module.BaseParser):
+        platform = Platform(name="dummy", display_name="测试")
+
+    # 不留在全局解析器列表里
+    base_module.BaseParser._registry.remove(DummyParser)
+
+    cfg = SimpleNamespace(
+        data_dir=tmp_path,
+        common_timeout=5,
+        curl_max_clients=max_clients,
+        parser=SimpleNamespace(),
+        proxy=None,
+    )
+    return DummyParser(cfg, SimpleNamespace(http=None))  # type: ignore[arg-type]
+
+
+def test_curl_session_reuses_connections_and_bounds_concurrency(base_module, tmp_path):
+    peers: list[int] = []
+    cookies: list[str] = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal in_flight, max_in_flight
+        peername = request.transport.get_extra_info("peername")  # type: ignore[union-attr]
+        peers.append(peername[1])
+        cookies.append(request.headers.get("Cookie", ""))
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        response = web.Response(text="ok")
+        response.set_cookie("sid", "server")
+        return response
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        url = f"http://127.0.0.1:{port}/"
+        parser = make_parser(base_module, tmp_path, max_clients=2)
+        try:
+            session = parser.curl_session("chrome131")
+            assert parser.curl_session("chrome131") is session
+            assert parser.curl_session("chrome124") is not session
+
+            for _ in range(3):
+                response = await session.get(url)
+                assert response.text == "ok"
+            sequential_peers = set(peers)
+
+            await asyncio.gather(*(session.get(url) for _ in range(6)))
+        finally:
+            await parser.close_session()
+            await runner.cleanup()
+        return sequential_peers, parser._curl_sessions, session
+
+    sequential_peers, remaining, session = asyncio.run(main())
+
+    # 顺序请求复用同一连接；服务端下发的 cookie 不会被带到后续请求
+    assert len(sequential_peers) == 1
+    assert cookies == [""] * 9
+    assert max_in_flight == 2
+    assert remaining == {} and session._closed
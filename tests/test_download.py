@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+
+@pytest.fixture
+def download_module(monkeypatch: pytest.MonkeyPatch, astrbot_stub):
+    monkeypatch.setenv("TQDM_DISABLE", "1")
+    for name in ("core.media_index", "core.http", "core.download"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    return importlib.import_module("core.download")
+
+
+class NullIndex:
+    def record(self, path: Path, url: str | None = None) -> None:
+        pass
+
+    def touch(self, path: Path) -> None:
+        pass
+
+
+def make_app(payload: bytes, ranges: list[str | None], honor_range: bool):
+    async def handler(request: web.Request) -> web.Response:
+        spec = request.headers.get("Range")
+        ranges.append(spec)
+        if not spec or not honor_range:
+            return web.Response(body=payload)
+        first, _, last = spec.removeprefix("bytes=").partition("-")
+        start, end = int(first), min(int(last) + 1, len(payload))
+        return web.Response(
+            status=206,
+            body=payload[start:end],
+            headers={"Content-Range": f"bytes {start}-{end - 1}/{len(payload)}"},
+        )
+
+    app = web.Application()
+    app.router.add_get("/v.mp4", handler)
+    return app
+
+
+def make_downloader(download_module, tmp_path: Path, **overrides):
+    from core.http import HttpClientFactory
+
+    cfg = SimpleNamespace(
+        cache_dir=tmp_path,
+        source_max_size=10,
+        download_timeout=30,
+        download_retry_times=0,
+        download_concurrency=8,
+        download_host_concurrency=4,
+        download_host_limits={},
+        download_segments=1,
+        download_host_segments={"127.0.0.1": 3},
+        hls_concurrency=4,
+        stream_merge=True,
+        common_timeout=10,
+        http_pool_limit=10,
+        http_pool_limit_per_host=10,
+        http_dns_ttl=300,
+        http_keepalive_timeout=30,
+        ytdlp_info_dir=tmp_path / "ytdlp_info",
+        ytdlp_info_ttl=0,
+        ytdlp_info_cache_size=0,
+        ytdlp_process=False,
+        ytdlp_workers=1,
+        ytdlp_queue_size=0,
+        ytdlp_extract_timeout=30,
+        ytdlp_download_timeout=30,
+    )
+    cfg.__dict__.update(overrides)
+    return download_module.Downloader(
+        cfg,  # type: ignore[arg-type]
+        NullIndex(),  # type: ignore[arg-type]
+        HttpClientFactory(cfg),  # type: ignore[arg-type]
+    )
+
+
+async def serve(app: web.Application) -> tuple[web.AppRunner, str]:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def fetch(download_module, tmp_path: Path, honor_range: bool):
+    from core.scheduler import DownloadPriority
+
+    payload = os.urandom(10 * 1000 + 7)
+    ranges: list[str | None] = []
+    runner, base = await serve(make_app(payload, ranges, honor_range))
+    downloader = make_downloader(download_module, tmp_path)
+    downloader.RANGE_PIECE_SIZE = 1000
+    try:
+        path = await downloader.streamd(
+            f"{base}/v.mp4",
+            file_name="v.mp4",
+            proxy=None,
+            priority=DownloadPriority.VIDEO,
+        )
+        return path.read_bytes(), payload, ranges
+    finally:
+        await downloader.close()
+        await downloader.http.close()
+        await runner.cleanup()
+
+
+def test_ranged_download_reassembles_pieces(download_module, tmp_path):
+    data, payload, ranges = asyncio.run(fetch(download_module, tmp_path, True))
+
+    assert data == payload
+    # 首个请求即带 Range，之后每块一个请求
+    assert ranges[0] == "bytes=0-999"
+    assert sorted(ranges) == sorted(
+        f"bytes={start}-{min(start + 1000, len(payload)) - 1}"
+        for start in range(0, len(payload), 1000)
+    )
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_ranged_download_writes_each_piece_once(download_module, tmp_path, monkeypatch):
+    writes: list[int] = []
+    pwrite = os.pwrite
+
+    def counting_pwrite(fd: int, data, offset: int) -> int:
+        writes.append(offset)
+        return pwrite(fd, data, offset)
+
+    monkeypatch.setattr(os, "pwrite", counting_pwrite)
+    data, payload, _ = asyncio.run(fetch(download_module, tmp_path, True))
+
+    # 每块在内存中攒齐后只写一次
+    assert data == payload
+    assert sorted(writes) == list(range(0, len(payload), 1000))
+
+
+def test_server_without_range_support_falls_back(download_module, tmp_path):
+    data, payload, ranges = asyncio.run(fetch(download_module, tmp_path, False))
+
+    assert data == payload
+    assert ranges == ["bytes=0-999"]
+
+
+def test_ranged_download_needs_pwrite(download_module, tmp_path, monkeypatch):
+    monkeypatch.delattr(os, "pwrite", raising=False)
+    data, payload, ranges = asyncio.run(fetch(download_module, tmp_path, True))
+
+    # 没有 os.pwrite 的平台不分段，单个请求读完
+    assert data == payload
+    assert ranges == [None]
+
+
+def make_hls_app(pieces: list[bytes], log: list[str]) -> web.Application:
+    master = "#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=1,RESOLUTION=1x1\nlow/index.m3u8\n"
+    media = "#EXTM3U\n" + "".join(
+        f"#EXTINF:2.0,\nseg{i}.ts\n" for i in range(len(pieces))
+    )
+
+    async def handler(request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        log.append(name)
+        if name == "master.m3u8":
+            return web.Response(text=master)
+        if name == "low/index.m3u8":
+            return web.Response(text=media)
+        index = int(name.removeprefix("low/seg").removesuffix(".ts"))
+        # 前面的分片更慢，迫使后面的分片先到达
+        await asyncio.sleep(0.01 * (len(pieces) - index))
+        return web.Response(body=pieces[index])
+
+    app = web.Application()
+    app.router.add_get("/{name:.+}", handler)
+    return app
+
+
+async def fetch_hls(download_module, tmp_path: Path, pieces: list[bytes], **cfg):
+    log: list[str] = []
+    runner, base = await serve(make_hls_app(pieces, log))
+    downloader = make_downloader(download_module, tmp_path, **cfg)
+    try:
+        path = await downloader.download_hls(f"{base}/master.m3u8", file_name="h.mp4")
+        return path.read_bytes(), log
+    finally:
+        await downloader.close()
+        await downloader.http.close()
+        await runner.cleanup()
+
+
+def test_hls_segments_fetched_concurrently_and_written_in_order(
+    download_module, tmp_path
+):
+    pieces = [bytes([i]) * 1000 for i in range(8)]
+    data, log = asyncio.run(fetch_hls(download_module, tmp_path, pieces))
+
+    # 没有 ffmpeg 时保留 TS 拼接结果，有则封装失败同样回退（分片不是真实 TS）
+    assert data == b"".join(pieces)
+    assert log[:2] == ["master.m3u8", "low/index.m3u8"]
+    assert sorted(log[2:]) == sorted(f"low/seg{i}.ts" for i in range(8))
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_hls_truncates_at_segment_boundary(download_module, tmp_path):
+    pieces = [bytes([i]) * 400 * 1024 for i in range(4)]
+    data, _ = asyncio.run(
+        fetch_hls(download_module, tmp_path, pieces, source_max_size=1)
+    )
+
+    assert data == b"".join(pieces[:2])
+
+
+FAKE_FFMPEG = """#!{python}
+import os
+import sys
+
+args = sys.argv[1:]
+inputs = [args[i + 1] for i, arg in enumerate(args) if arg == "-i"]
+if os.environ.get("FAKE_FFMPEG_NO_PIPE") and any(
+    src.startswith("pipe:") for src in inputs
+):
+    sys.exit("pipe input unsupported")
+data = []
+for src in inputs:
+    # 依次读完每路输入，音频管道要等视频读完才被读取
+    if src.startswith("pipe:"):
+        with os.fdopen(int(src.removeprefix("pipe:")), "rb") as f:
+            data.append(f.read())
+    else:
+        with open(src, "rb") as f:
+            data.append(f.read())
+with open(args[-1], "wb") as f:
+    f.write(b"".join(data))
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch: pytest.MonkeyPatch, tmp_path_factory):
+    bin_dir = tmp_path_factory.mktemp("bin")
+    script = bin_dir / "ffmpeg"
+    script.write_text(FAKE_FFMPEG.format(python=sys.executable))
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+async def merge_av(download_module, tmp_path: Path, files: dict[str, bytes]):
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(body=files[request.match_info["name"]])
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    runner, base = await serve(app)
+    downloader = make_downloader(download_module, tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    try:
+        path = await downloader.download_av_and_merge(
+            f"{base}/v.m4s", f"{base}/a.m4s", output_path=tmp_path / "cache/out.mp4"
+        )
+        return path.read_bytes(), sorted(p.name for p in path.parent.iterdir())
+    finally:
+        await downloader.close()
+        await downloader.http.close()
+        await runner.cleanup()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="边下载边合并仅支持 POSIX")
+def test_stream_merge_pipes_both_streams_without_intermediate_files(
+    download_module, tmp_path, fake_ffmpeg
+):
+    files = {"v.m4s": os.urandom(3 * 1024 * 1024), "a.m4s": os.urandom(300 * 1024)}
+    data, names = asyncio.run(merge_av(download_module, tmp_path, files))
+
+    assert data == files["v.m4s"] + files["a.m4s"]
+    assert names == ["out.mp4"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="边下载边合并仅支持 POSIX")
+def test_stream_merge_falls_back_to_download_then_merge(
+    download_module, tmp_path, fake_ffmpeg, monkeypatch
+):
+    monkeypatch.setenv("FAKE_FFMPEG_NO_PIPE", "1")
+    files = {"v.m4s": os.urandom(200 * 1024), "a.m4s": os.urandom(100 * 1024)}
+    data, names = asyncio.run(merge_av(download_module, tmp_path, files))
+
+    assert data == files["v.m4s"] + files["a.m4s"]
+    # 中间文件在合并后删除
+    assert names == ["out.mp4"]
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+
+@pytest.fixture
+def atlas_module(monkeypatch: pytest.MonkeyPatch, astrbot_stub):
+    monkeypatch.delitem(sys.modules, "core.utils", raising=False)
+    monkeypatch.delitem(sys.modules, "core.emoji_atlas", raising=False)
+
+    return importlib.import_module("core.emoji_atlas")
+
+
+def make_emoji(path: Path, color: tuple[int, int, int]) -> Path:
+    Image.new("RGBA", (64, 64), (*color, 255)).save(path)
+    return path
+
+
+def test_add_get_and_reload(atlas_module, tmp_path: Path):
+    files = {
+        chr(0x1F600 + i): make_emoji(tmp_path / f"{i}.png", (i * 7 % 256, 80, 160))
+        for i in range(40)
+    }
+    atlas = atlas_module.EmojiAtlas(tmp_path / "atlas", "test")
+    assert atlas.missing(files) == set(files)
+    assert atlas.add(files) == 40
+    assert atlas.add(files) == 0
+    assert atlas.missing(files) == set()
+
+    img = atlas.get("😀", 24)
+    assert img is not None and img.size == (22, 22)
+    assert atlas.get("🎉", 24) is None
+
+    reloaded = atlas_module.EmojiAtlas(tmp_path / "atlas", "test")
+    reloaded.load()
+    assert len(reloaded) == 40
+    last = reloaded.get(chr(0x1F600 + 39), 30)
+    assert last is not None
+    assert last.getpixel((14, 14))[:3] == ((39 * 7) % 256, 80, 160)
+
+
+def test_load_seeds_from_loose_files(atlas_module, tmp_path: Path):
+    seed = tmp_path / "emojis"
+    seed.mkdir()
+    make_emoji(seed / "😀.png", (255, 0, 0))
+    (seed / "🎉.png").write_bytes(b"broken")
+
+    atlas = atlas_module.EmojiAtlas(tmp_path / "atlas", "test")
+    atlas.load(seed)
+
+    assert "😀" in atlas and "🎉" not in atlas
+    assert not (seed / "🎉.png").exists()
+    assert (tmp_path / "atlas" / "test.png").exists()
+
+
+def test_corrupt_atlas_is_rebuilt(atlas_module, tmp_path: Path):
+    root = tmp_path / "atlas"
+    root.mkdir()
+    (root / "test.json").write_text("{not json", "utf-8")
+
+    atlas = atlas_module.EmojiAtlas(root, "test")
+    atlas.load()
+    assert len(atlas) == 0
+    assert atlas.add({"😀": make_emoji(tmp_path / "a.png", (0, 0, 0))}) == 1
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from core.encode import CardEncoder
+
+
+@pytest.fixture
+def card() -> Image.Image:
+    img = Image.new("RGB", (200, 120), (255, 255, 255))
+    img.paste(Image.linear_gradient("L").resize((100, 60)).convert("RGB"), (50, 30))
+    return img
+
+
+@pytest.mark.parametrize(
+    ("ratio", "expected"),
+    [(0.0, "png8"), (0.04, "png8"), (0.1, "png"), (0.3, "jpeg"), (0.9, "jpeg")],
+)
+def test_auto_chooses_by_photo_ratio(ratio: float, expected: str):
+    assert CardEncoder("auto").choose(ratio) == expected
+
+
+def test_explicit_format_ignores_ratio():
+    assert CardEncoder("webp").choose(0.0) == "webp"
+    assert CardEncoder("png").choose(1.0) == "png"
+    assert CardEncoder("unknown").format == "auto"
+
+
+@pytest.mark.parametrize(
+    ("fmt", "suffix", "pil_format"),
+    [
+        ("png", ".png", "PNG"),
+        ("png8", ".png", "PNG"),
+        ("jpeg", ".jpg", "JPEG"),
+        ("webp", ".webp", "WEBP"),
+    ],
+)
+def test_encode_roundtrip(card: Image.Image, fmt: str, suffix: str, pil_format: str):
+    data, got_suffix = CardEncoder(fmt).encode(card)
+    assert got_suffix == suffix
+    with Image.open(BytesIO(data)) as img:
+        assert img.format == pil_format
+        assert img.size == card.size
+        assert img.convert("RGB").getpixel((5, 5)) == (255, 255, 255)
+
+
+def test_fingerprint_tracks_settings():
+    assert CardEncoder("auto").fingerprint != CardEncoder("jpeg").fingerprint
+    assert CardEncoder("png", 3).fingerprint != CardEncoder("png", 6).fingerprint
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+from PIL import ImageFont
+
+from core.glyph import GlyphWidths
+
+FONT_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "core"
+    / "resources"
+    / "HYSongYunLangHeiW-1.ttf"
+)
+
+
+@pytest.fixture(scope="module")
+def font() -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(FONT_PATH, 24)
+
+
+def reference(font: ImageFont.FreeTypeFont, char: str) -> int:
+    if "一" <= char <= "鿿":
+        return 24
+    return int(font.getlength(char))
+
+
+def test_char_width_matches_freetype(font):
+    widths = GlyphWidths(font, 24)
+    rng = random.Random(0)
+    chars = [chr(rng.randint(0x20, 0xD7FF)) for _ in range(500)]
+    chars += ["中", "あ", "한", "，", "Ａ", "😀", "𠀀"]
+    for char in chars:
+        assert widths.char_width(char) == reference(font, char), hex(ord(char))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "hello",
+        "中文，混合 latin。",
+        "ひらがなカタカナ",
+        "한국어 텍스트",
+        "emoji 😀🎉 end",
+    ],
+)
+def test_text_width_is_sum_of_chars(font, text: str):
+    widths = GlyphWidths(font, 24)
+    assert widths.text_width(text) == sum(reference(font, c) for c in text)
+
+
+def test_blocks_load_lazily(font):
+    widths = GlyphWidths(font, 24)
+    assert not widths._loaded[0xAC]
+    widths.text_width("가")
+    assert widths._loaded[0xAC]
+    assert not widths._loaded[0xAD]
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import pytest
+
+from core.exception import DownloadException
+from core.hls import (
+    HlsSegment,
+    is_master,
+    parse_master,
+    parse_media,
+    select_variant,
+)
+
+MASTER = """#EXTM3U
+#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360,CODECS="avc1.4d401e,mp4a.40.2"
+360/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720
+720/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=6000000,RESOLUTION=1920x1080
+https://other.cdn/1080/index.m3u8
+"""
+
+MEDIA = """#EXTM3U
+#EXT-X-VERSION:7
+#EXT-X-TARGETDURATION:6
+#EXT-X-MAP:URI="init.mp4",BYTERANGE="720@0"
+#EXT-X-KEY:METHOD=NONE
+#EXTINF:6.006,
+seg0.m4s
+#EXTINF:5.5,title
+#EXT-X-BYTERANGE:1000@2000
+all.m4s
+#EXTINF:4,
+#EXT-X-BYTERANGE:500
+all.m4s
+#EXT-X-ENDLIST
+"""
+
+
+def test_parse_master_resolves_variants():
+    assert is_master(MASTER)
+    variants = parse_master(MASTER, "https://cdn.example/v/master.m3u8")
+
+    assert [v.uri for v in variants] == [
+        "https://cdn.example/v/360/index.m3u8",
+        "https://cdn.example/v/720/index.m3u8",
+        "https://other.cdn/1080/index.m3u8",
+    ]
+    assert [(v.height, v.bandwidth) for v in variants] == [
+        (360, 800000),
+        (720, 2500000),
+        (1080, 6000000),
+    ]
+    assert select_variant(variants).height == 1080
+    assert select_variant(variants, max_height=720).height == 720
+    assert select_variant(variants, max_height=240).height == 360
+
+
+def test_parse_media_segments_byterange_and_map():
+    playlist = parse_media(MEDIA, "https://cdn.example/v/720/index.m3u8")
+
+    assert not is_master(MEDIA)
+    assert playlist.init == HlsSegment(
+        "https://cdn.example/v/720/init.mp4", byterange=(0, 720)
+    )
+    assert [(s.uri.rsplit("/", 1)[1], s.byterange) for s in playlist.segments] == [
+        ("seg0.m4s", None),
+        ("all.m4s", (2000, 1000)),
+        ("all.m4s", (3000, 500)),
+    ]
+    assert playlist.segments[2].range_header == {"Range": "bytes=3000-3499"}
+    assert playlist.duration == pytest.approx(15.506)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "not a playlist",
+        "#EXTM3U\n#EXT-X-ENDLIST\n",
+        '#EXTM3U\n#EXT-X-KEY:METHOD=AES-128,URI="k"\n#EXTINF:4,\na.ts\n',
+    ],
+)
+def test_parse_media_rejects_unusable_playlists(text):
+    with pytest.raises(DownloadException):
+        parse_media(text, "https://cdn.example/index.m3u8")
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from core.cache import ParseResultCache
+from core.data import (
+    Author,
+    ImageContent,
+    LazyPath,
+    ParseResult,
+    Platform,
+    VideoContent,
+)
+
+PLATFORM = Platform(name="test", display_name="测试")
+
+
+class Downloads:
+    """记录被发起的下载，下载在 release 之前一直挂起"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.started: list[str] = []
+        self.release = asyncio.Event()
+
+    def lazy(self, name: str) -> LazyPath:
+        async def download() -> Path:
+            self.started.append(name)
+            await self.release.wait()
+            path = self.root / name
+            path.write_bytes(b"x")
+            return path
+
+        return LazyPath(download, name)
+
+
+def test_download_starts_only_when_path_is_requested(tmp_path: Path):
+    async def main():
+        downloads = Downloads(tmp_path)
+        contents = [ImageContent(downloads.lazy(f"{i}.jpg")) for i in range(4)]
+        await asyncio.sleep(0)
+        assert downloads.started == []
+
+        downloads.release.set()
+        assert await contents[1].get_path() == tmp_path / "1.jpg"
+        assert downloads.started == ["1.jpg"]
+        assert contents[1].path_task == tmp_path / "1.jpg"
+
+    asyncio.run(main())
+
+
+def test_cancel_downloads_resets_lazy_paths(tmp_path: Path):
+    async def main():
+        downloads = Downloads(tmp_path)
+        video = VideoContent(downloads.lazy("v.mp4"), downloads.lazy("cover.jpg"))
+        result = ParseResult(
+            platform=PLATFORM,
+            author=Author("作者", downloads.lazy("avatar.jpg")),
+            contents=[video],
+            repost=ParseResult(
+                platform=PLATFORM, contents=[ImageContent(downloads.lazy("r.jpg"))]
+            ),
+        )
+        pending = asyncio.gather(
+            video.get_path(),
+            result.repost.contents[0].get_path(),
+            return_exceptions=True,
+        )
+        while len(downloads.started) < 2:
+            await asyncio.sleep(0)
+        assert sorted(downloads.started) == ["r.jpg", "v.mp4"]
+
+        assert result.cancel_downloads() == 2
+        # 未发起的头像、封面不受影响
+        assert result.cancel_downloads() == 0
+        # 等待者本身没有被取消，下载重新发起
+        downloads.release.set()
+        assert await pending == [tmp_path / "v.mp4", tmp_path / "r.jpg"]
+        assert downloads.started.count("v.mp4") == 2
+
+    asyncio.run(main())
+
+
+def test_cancel_downloads_can_keep_started_tasks(tmp_path: Path):
+    async def main():
+        downloads = Downloads(tmp_path)
+        eager = asyncio.ensure_future(downloads.lazy("a.jpg").start())
+        lazy = downloads.lazy("b.jpg")
+        result = ParseResult(
+            platform=PLATFORM, contents=[ImageContent(eager), ImageContent(lazy)]
+        )
+        lazy.start()
+        while len(downloads.started) < 2:
+            await asyncio.sleep(0)
+
+        # 缓存中的结果：已创建的 Task 无法重新发起，只取消延迟下载
+        assert result.cancel_downloads(keep_tasks=True) == 1
+        assert lazy.task is None and not eager.done()
+        downloads.release.set()
+        assert await result.contents[0].get_path() == tmp_path / "a.jpg"
+
+    asyncio.run(main())
+
+
+def test_parse_cache_keeps_unstarted_and_settles_finished(tmp_path: Path):
+    async def main():
+        downloads = Downloads(tmp_path)
+        downloads.release.set()
+        done, idle = downloads.lazy("a.jpg"), downloads.lazy("b.jpg")
+        await done.start()
+        result = ParseResult(
+            platform=PLATFORM, contents=[ImageContent(done), ImageContent(idle)]
+        )
+        cache = ParseResultCache(ttl=60)
+        cache.set("k", result)
+        assert cache.get("k") is result
+        assert result.contents[0].path_task == tmp_path / "a.jpg"
+        assert result.contents[1].path_task is idle
+        assert downloads.started == ["a.jpg"]
+
+    asyncio.run(main())
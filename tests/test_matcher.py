@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from core.matcher import KeywordMatcher
+
+KEY_PATTERNS = [
+    ("v.douyin", r"v\.douyin\.com/[a-zA-Z0-9_\-]+"),
+    ("", r"(?<![A-Za-z0-9_/=:%?&.-])(?P<vid>\d{18,20})(?!\d)"),
+    ("aweme_id", r"aweme_id[=:/\s]+(?P<vid>\d{10,})"),
+    ("aweme", r"aweme/(?P<vid>\d{10,})"),
+    ("douyin", r"douyin\.com/(?P<ty>video|note)/(?P<vid>\d+)"),
+    ("weibo.com/tv", r"weibo\.com/tv/show/\d{4}:\d+\?mid=(?P<mid>\d+)"),
+    ("weibo.com", r"weibo\.com/\d+/(?P<wid>[0-9a-zA-Z]+)"),
+    ("weibo.com/article", r"/id/(?P<id>\d+)"),
+    ("BV", r"^(?P<bvid>BV[0-9a-zA-Z]{10})(?:\s)?(?P<page_num>\d{1,3})?$"),
+    (
+        "/BV",
+        r"bilibili\.com(?:/video)?/(?P<bvid>BV[0-9a-zA-Z]{10})(?:\?p=(?P<page_num>\d{1,3}))?",
+    ),
+    ("youtu", r"youtu\.be/[A-Za-z\d\._\?%&\+\-=/#]+"),
+    ("youtube", r"youtube\.com/(?:watch|shorts)(?:/[A-Za-z\d_\-]+|\?v=[A-Za-z\d_\-]+)"),
+]
+
+
+def linear_search(text: str):
+    patterns = [(kw, re.compile(pat)) for kw, pat in KEY_PATTERNS]
+    patterns.sort(key=lambda x: -len(x[0]))
+    for kw, pat in patterns:
+        if kw not in text:
+            continue
+        if m := pat.search(text):
+            return kw, m.span()
+    return None
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "今天吃什么",
+        "hello world, nothing to see",
+        "https://v.douyin.com/_2ljF4AmKL8/ 复制打开抖音",
+        "https://www.douyin.com/video/7521023890996514083",
+        "aweme_id=7521023890996514083",
+        "看看这个 7521023890996514083 视频",
+        "https://weibo.com/tv/show/1034:5012345678901234?mid=5012345678901235",
+        "https://weibo.com/7207262816/P5kWdcfDe",
+        "https://card.weibo.com/article/m/show/id/2309404962180771742222",
+        "BV1xx411c7mD",
+        "https://www.bilibili.com/video/BV1xx411c7mD?p=2",
+        "https://youtu.be/dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "youtube 但没有链接",
+    ],
+)
+def test_matcher_agrees_with_linear_scan(text: str):
+    matcher = KeywordMatcher(KEY_PATTERNS)
+    got = matcher.search(text)
+    assert (got and (got[0], got[1].span())) == linear_search(text)
+
+
+def test_longer_keyword_wins_over_its_prefix():
+    matcher = KeywordMatcher(KEY_PATTERNS)
+    matched = matcher.search(
+        "https://weibo.com/tv/show/1034:5012345678901234?mid=5012345678901235"
+    )
+    assert matched is not None
+    assert matched[0] == "weibo.com/tv"
+    assert matched[1].group("mid") == "5012345678901235"
+
+
+def test_empty_matcher_never_matches():
+    assert KeywordMatcher([]).search("https://v.douyin.com/abc") is None
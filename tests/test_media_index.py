@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def index_module(monkeypatch: pytest.MonkeyPatch, astrbot_stub):
+    monkeypatch.delitem(sys.modules, "core.media_index", raising=False)
+
+    return importlib.import_module("core.media_index")
+
+
+def write(path: Path, size: int, age: float = 0) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    if age:
+        ts = time.time() - age
+        os.utime(path, (ts, ts))
+    return path
+
+
+def make_index(index_module, tmp_path: Path, max_bytes: int):
+    return index_module.MediaCacheIndex(
+        root=tmp_path / "cache",
+        db_path=tmp_path / "media_index.db",
+        max_bytes=max_bytes,
+    )
+
+
+def test_evicts_least_recently_used_first(index_module, tmp_path: Path):
+    async def main():
+        index = make_index(index_module, tmp_path, max_bytes=300)
+        await index.load()
+        root = index.root
+        a = write(root / "a.jpg", 100)
+        b = write(root / "b.jpg", 100)
+        c = write(root / "c.jpg", 100)
+        for path in (a, b, c):
+            index.record(path)
+        index.touch(a)
+        index.record(write(root / "d.jpg", 100))
+        await index.evict()
+        await index.close()
+        return a, b, c
+
+    a, b, c = asyncio.run(main())
+    # 低水位 270 字节：淘汰最久未访问的 b、c
+    assert a.exists()
+    assert not b.exists()
+    assert not c.exists()
+
+
+def test_pinned_files_are_not_evicted(index_module, tmp_path: Path):
+    async def main():
+        index = make_index(index_module, tmp_path, max_bytes=100)
+        await index.load()
+        a = write(index.root / "a.mp4", 80)
+        b = write(index.root / "b.mp4", 80)
+        index.record(a)
+        index.record(b)
+        with index.pinned([a]):
+            await index.evict()
+        await index.close()
+        return a, b
+
+    a, b = asyncio.run(main())
+    assert a.exists()
+    assert not b.exists()
+
+
+def test_load_reconciles_disk_and_persists(index_module, tmp_path: Path):
+    root = tmp_path / "cache"
+    known = write(root / "known.jpg", 10)
+    gone = write(root / "gone.jpg", 10)
+    write(root / "emojis" / "1f600.png", 5)
+    write(root / "fresh.mp4.part", 5)
+    stale = write(root / "stale.mp4.part", 5, age=7 * 3600)
+
+    async def first():
+        index = make_index(index_module, tmp_path, max_bytes=0)
+        await index.load()
+        index.record(known, "https://example.com/known.jpg")
+        await index.close()
+
+    async def second():
+        index = make_index(index_module, tmp_path, max_bytes=0)
+        await index.load()
+        stats = index.stats()
+        url = index._entries["known.jpg"].url
+        await index.close()
+        return stats, url
+
+    asyncio.run(first())
+    gone.unlink()
+    write(root / "new.jpg", 20)
+    stats, url = asyncio.run(second())
+
+    assert not stale.exists()
+    assert url == "https://example.com/known.jpg"
+    # known.jpg + emojis/1f600.png + new.jpg，中间文件不计入
+    assert stats["files"] == 3
+    assert stats["bytes"] == 35
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+
+from core.scheduler import DownloadPriority, DownloadScheduler
+
+
+async def _run(scheduler: DownloadScheduler, url: str, priority, log: list, gate):
+    async with scheduler.slot(url, priority):
+        log.append(url)
+        await gate.wait()
+
+
+def test_global_and_per_host_limits():
+    async def main():
+        scheduler = DownloadScheduler(max_concurrency=3, per_host=2)
+        gate = asyncio.Event()
+        log: list[str] = []
+        urls = [f"https://a.cdn/{i}" for i in range(4)] + ["https://b.cdn/0"]
+        tasks = [
+            asyncio.create_task(_run(scheduler, u, DownloadPriority.IMAGE, log, gate))
+            for u in urls
+        ]
+        await asyncio.sleep(0)
+        stats = scheduler.stats()
+        # a.cdn 只放行 2 个，b.cdn 插队补满全局 3 个名额
+        assert log == ["https://a.cdn/0", "https://a.cdn/1", "https://b.cdn/0"]
+        assert stats["active"] == 3
+        assert stats["queued"] == 2
+        gate.set()
+        await asyncio.gather(*tasks)
+        assert scheduler.stats()["active"] == 0
+        assert len(log) == 5
+
+    asyncio.run(main())
+
+
+def test_higher_priority_runs_first():
+    async def main():
+        scheduler = DownloadScheduler(max_concurrency=1, per_host=1)
+        gate = asyncio.Event()
+        log: list[str] = []
+        first = asyncio.create_task(
+            _run(scheduler, "https://x/0", DownloadPriority.IMAGE, log, gate)
+        )
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(_run(scheduler, url, prio, log, gate))
+            for url, prio in [
+                ("https://x/video", DownloadPriority.VIDEO),
+                ("https://x/img", DownloadPriority.IMAGE),
+                ("https://x/avatar", DownloadPriority.CARD),
+            ]
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued_by_priority"] == {
+            "VIDEO": 1,
+            "IMAGE": 1,
+            "CARD": 1,
+        }
+        gate.set()
+        await asyncio.gather(first, *tasks)
+        assert log == [
+            "https://x/0",
+            "https://x/avatar",
+            "https://x/img",
+            "https://x/video",
+        ]
+
+    asyncio.run(main())
+
+
+def test_heavy_downloads_leave_room_for_images():
+    async def main():
+        scheduler = DownloadScheduler(max_concurrency=4, per_host=4)
+        gate = asyncio.Event()
+        log: list[str] = []
+        videos = [
+            asyncio.create_task(
+                _run(scheduler, f"https://v{i}/", DownloadPriority.VIDEO, log, gate)
+            )
+            for i in range(4)
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["active_heavy"] == 2
+        img = asyncio.create_task(
+            _run(scheduler, "https://img/", DownloadPriority.IMAGE, log, gate)
+        )
+        await asyncio.sleep(0)
+        assert "https://img/" in log
+        gate.set()
+        await asyncio.gather(img, *videos)
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_frees_its_place():
+    async def main():
+        scheduler = DownloadScheduler(max_concurrency=1, per_host=1)
+        gate = asyncio.Event()
+        log: list[str] = []
+        first = asyncio.create_task(
+            _run(scheduler, "https://x/0", DownloadPriority.IMAGE, log, gate)
+        )
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(
+            _run(scheduler, "https://x/1", DownloadPriority.IMAGE, log, gate)
+        )
+        await asyncio.sleep(0)
+        waiting.cancel()
+        gate.set()
+        await first
+        assert scheduler.stats()["active"] == 0
+        async with scheduler.slot("https://x/2"):
+            assert scheduler.stats()["active"] == 1
+
+    asyncio.run(main())
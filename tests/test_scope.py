@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from core.data import ImageContent, LazyPath, ParseResult, Platform
+from core.scope import TaskScope, adopt, record_cancelled
+
+
+def test_scope_cancels_unfinished_tasks_on_exit():
+    cleaned: list[str] = []
+
+    async def download(name: str) -> str:
+        try:
+            await asyncio.sleep(10)
+        finally:
+            cleaned.append(name)
+        return name
+
+    async def main():
+        async with TaskScope() as scope:
+            orphan = asyncio.create_task(download("orphan"))
+            adopt(orphan)
+            done = asyncio.create_task(asyncio.sleep(0))
+            adopt(done)
+            await done
+        assert orphan.cancelled()
+        assert cleaned == ["orphan"]
+        assert scope.cancelled == 1
+
+    asyncio.run(main())
+
+
+def test_lazy_path_started_inside_scope_is_owned_by_it(tmp_path: Path):
+    async def download() -> Path:
+        await asyncio.sleep(10)
+        return tmp_path / "a.jpg"
+
+    async def main():
+        lazy = LazyPath(download, "a.jpg")
+        async with TaskScope() as scope:
+            lazy.start()
+            assert len(scope) == 1
+        assert lazy.task is not None and lazy.task.cancelled()
+        # 被取消的延迟下载可以重新发起
+        assert lazy.start() is not None
+        lazy.cancel()
+
+    asyncio.run(main())
+
+
+def test_detached_scope_leaves_tasks_running():
+    async def main():
+        async with TaskScope() as scope:
+            task = asyncio.create_task(asyncio.sleep(0.01, "ok"))
+            adopt(task)
+            scope.detach()
+        assert await task == "ok"
+        assert scope.cancelled == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_bytes_are_counted_per_scope_and_globally():
+    async def main():
+        before = TaskScope.total_cancelled_bytes
+        async with TaskScope() as scope:
+            record_cancelled(300, 1000)
+            record_cancelled(50)
+        assert (scope.cancelled_bytes, scope.saved_bytes) == (350, 700)
+        assert TaskScope.total_cancelled_bytes - before == 350
+
+    asyncio.run(main())
+
+
+def test_download_cancelled_by_another_scope_is_restarted(tmp_path: Path):
+    calls = 0
+
+    async def download() -> Path:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return tmp_path / "a.jpg"
+
+    async def main():
+        content = ImageContent(LazyPath(download, "a.jpg"))
+        async with TaskScope():
+            waiter = asyncio.create_task(content.get_path())
+            while not calls:
+                await asyncio.sleep(0)
+        # 发起下载的请求已结束，另一个等待者仍拿到结果
+        assert await waiter == tmp_path / "a.jpg"
+        assert calls == 2
+
+    asyncio.run(main())
+
+
+def test_waiter_cancelled_itself_is_not_restarted(tmp_path: Path):
+    calls = 0
+
+    async def download() -> Path:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(1)
+        return tmp_path / "a.jpg"
+
+    async def main():
+        content = ImageContent(LazyPath(download, "a.jpg"))
+        waiter = asyncio.create_task(content.get_path())
+        while not calls:
+            await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # 等待者自身被取消，不会重新发起下载
+        assert calls == 1
+
+    asyncio.run(main())
+
+
+def test_released_cached_downloads_survive_scope_exit(tmp_path: Path):
+    async def download(name: str) -> Path:
+        await asyncio.sleep(0.01)
+        return tmp_path / name
+
+    async def main():
+        async with TaskScope() as scope:
+            eager = asyncio.create_task(download("a.jpg"))
+            adopt(eager)
+            lazy = LazyPath(lambda: download("b.jpg"), "b.jpg")
+            result = ParseResult(
+                platform=Platform(name="test", display_name="测试"),
+                contents=[ImageContent(eager), ImageContent(lazy)],
+            )
+            lazy.start()
+            assert list(result.iter_download_tasks()) == [eager]
+            scope.release(result.iter_download_tasks())
+        # 缓存中的结果稍后仍可直接取用已发起的下载，延迟下载照常取消
+        assert scope.cancelled == 1
+        assert await result.contents[0].get_path() == tmp_path / "a.jpg"
+        assert await result.contents[1].get_path() == tmp_path / "b.jpg"
+
+    asyncio.run(main())
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import sys
+import types
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from core.data import ImageContent, LazyPath, ParseResult, Platform, VideoContent
+from core.exception import DownloadException
+
+PLATFORM = Platform(name="test", display_name="测试")
+
+
+class Component:
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+    @classmethod
+    def fromFileSystem(cls, path: str):
+        return cls(file=Path(path).name)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.kwargs.get('file') or self.args})"
+
+
+class Nodes(Component):
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+
+@pytest.fixture
+def sender_module(monkeypatch: pytest.MonkeyPatch, astrbot_stub):
+    components = types.ModuleType("astrbot.core.message.components")
+    for name in (
+        "BaseMessageComponent",
+        "File",
+        "Image",
+        "Node",
+        "Plain",
+        "Record",
+        "Video",
+    ):
+        setattr(components, name, type(name, (Component,), {}))
+    components.Nodes = Nodes
+    event_module = types.ModuleType("astrbot.core.platform.astr_message_event")
+    event_module.AstrMessageEvent = object
+    render_module = types.ModuleType("core.render")
+    render_module.Renderer = object
+    monkeypatch.setitem(sys.modules, "astrbot.core.message.components", components)
+    monkeypatch.setitem(
+        sys.modules, "astrbot.core.platform.astr_message_event", event_module
+    )
+    monkeypatch.setitem(sys.modules, "core.render", render_module)
+
+    monkeypatch.delitem(sys.modules, "core.media_index", raising=False)
+    monkeypatch.delitem(sys.modules, "core.sender", raising=False)
+
+    return importlib.import_module("core.sender")
+
+
+class Event:
+    def __init__(self):
+        self.sent: list[list] = []
+
+    def get_self_id(self) -> str:
+        return "10000"
+
+    def chain_result(self, segs):
+        return segs
+
+    async def send(self, segs):
+        self.sent.append(segs)
+
+
+class MediaIndex:
+    def pin(self, path: Path) -> None:
+        pass
+
+    def unpin(self, path: Path) -> None:
+        pass
+
+
+def delayed(tmp_path: Path, name: str, delay: float, order: list[str]) -> LazyPath:
+    async def download() -> Path:
+        await asyncio.sleep(delay)
+        order.append(name)
+        if name.startswith("bad"):
+            raise DownloadException()
+        return tmp_path / name
+
+    return LazyPath(download, name)
+
+
+def make_sender(sender_module, **overrides):
+    cfg = SimpleNamespace(
+        single_heavy_render_card=False,
+        forward_threshold=10,
+        show_download_fail_tip=True,
+        audio_to_file=False,
+        pipeline_send=True,
+    )
+    cfg.__dict__.update(overrides)
+    return sender_module.MessageSender(cfg, None, MediaIndex())  # type: ignore[arg-type]
+
+
+def names(batch: list) -> list[str]:
+    return [seg.kwargs.get("file") or seg.args[0] for seg in batch]
+
+
+def test_pipeline_flushes_ready_prefix_in_display_order(sender_module, tmp_path):
+    order: list[str] = []
+    result = ParseResult(
+        platform=PLATFORM,
+        contents=[
+            ImageContent(delayed(tmp_path, "1.jpg", 0.03, order)),
+            ImageContent(delayed(tmp_path, "2.jpg", 0.01, order)),
+            VideoContent(delayed(tmp_path, "v.mp4", 0.05, order)),
+            ImageContent(delayed(tmp_path, "3.jpg", 0.06, order)),
+        ],
+    )
+    sender = make_sender(sender_module)
+    event = Event()
+    asyncio.run(sender.send_parse_result(event, result))
+
+    # 2.jpg 先下载完，但要等 1.jpg 一起发；图片先于视频发出
+    assert order[:2] == ["2.jpg", "1.jpg"]
+    assert [names(batch) for batch in event.sent] == [
+        ["1.jpg", "2.jpg"],
+        ["3.jpg"],
+        ["v.mp4"],
+    ]
+
+
+def test_batch_mode_sends_one_chain_and_downloads_concurrently(sender_module, tmp_path):
+    order: list[str] = []
+    result = ParseResult(
+        platform=PLATFORM,
+        contents=[
+            ImageContent(delayed(tmp_path, "slow.jpg", 0.05, order)),
+            ImageContent(delayed(tmp_path, "bad.jpg", 0.01, order)),
+            VideoContent(delayed(tmp_path, "v.mp4", 0.02, order)),
+        ],
+    )
+    sender = make_sender(sender_module, pipeline_send=False)
+    event = Event()
+    asyncio.run(sender.send_parse_result(event, result))
+
+    assert order == ["bad.jpg", "v.mp4", "slow.jpg"]
+    assert [names(batch) for batch in event.sent] == [
+        ["slow.jpg", "此项媒体下载失败", "v.mp4"]
+    ]
+
+
+def test_forward_merge_builds_nodes_in_order(sender_module, tmp_path):
+    order: list[str] = []
+    result = ParseResult(
+        platform=PLATFORM,
+        contents=[
+            ImageContent(delayed(tmp_path, f"{i}.jpg", 0.01 * (3 - i), order))
+            for i in range(3)
+        ],
+    )
+    sender = make_sender(sender_module, forward_threshold=2)
+    event = Event()
+    asyncio.run(sender.send_parse_result(event, result))
+
+    assert order == ["2.jpg", "1.jpg", "0.jpg"]
+    [[nodes]] = event.sent
+    assert [names(node.kwargs["content"]) for node in nodes.nodes] == [
+        ["0.jpg"],
+        ["1.jpg"],
+        ["2.jpg"],
+    ]
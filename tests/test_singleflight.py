@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def utils_module(monkeypatch: pytest.MonkeyPatch, astrbot_stub):
+    monkeypatch.delitem(sys.modules, "core.utils", raising=False)
+
+    return importlib.import_module("core.utils")
+
+
+def test_concurrent_calls_share_one_execution(utils_module):
+    calls = 0
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def main():
+        flight = utils_module.SingleFlight()
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        assert results == [42] * 5
+        assert "k" not in flight
+
+    asyncio.run(main())
+    assert calls == 1
+
+
+def test_finished_flight_runs_again(utils_module):
+    calls = 0
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def main():
+        flight = utils_module.SingleFlight()
+        assert await flight.do("k", work) == 1
+        assert await flight.do("k", work) == 2
+
+    asyncio.run(main())
+
+
+def test_exception_is_propagated_to_every_waiter(utils_module):
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        flight = utils_module.SingleFlight()
+        results = await asyncio.gather(
+            *(flight.do("k", work) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_cancel_other_waiters(utils_module):
+    async def work() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        flight = utils_module.SingleFlight()
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done"
+
+    asyncio.run(main())
+
+
+def test_last_cancelled_waiter_cancels_shared_task(utils_module):
+    started = asyncio.Event()
+    cancelled = False
+
+    async def work() -> str:
+        nonlocal cancelled
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return "done"
+
+    async def main():
+        flight = utils_module.SingleFlight()
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await started.wait()
+        first.cancel()
+        await asyncio.sleep(0)
+        assert not cancelled
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert cancelled
+        assert "k" not in flight
+
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+
+@pytest.fixture
+def thumbnail_module(monkeypatch: pytest.MonkeyPatch, astrbot_stub):
+    monkeypatch.delitem(sys.modules, "core.utils", raising=False)
+    monkeypatch.delitem(sys.modules, "core.thumbnail", raising=False)
+
+    return importlib.import_module("core.thumbnail")
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    path = tmp_path / "src.jpg"
+    Image.new("RGB", (1200, 900), (200, 30, 30)).save(path, quality=90)
+    return path
+
+
+class CountingBuild:
+    def __init__(self, mode: str = "RGB"):
+        self.calls = 0
+        self.mode = mode
+        self.__name__ = f"build_{mode}"
+
+    def __call__(self, src: Path | None, size: int):
+        self.calls += 1
+        if src is None or not src.exists():
+            return None
+        with Image.open(src) as img:
+            img.draft(None, (size, size))
+            return img.convert(self.mode).resize((size, size))
+
+
+def test_second_call_hits_cache(thumbnail_module, tmp_path: Path, source: Path):
+    cache = thumbnail_module.ThumbnailCache(tmp_path)
+    build = CountingBuild()
+
+    img1, path1, hit1 = cache.get_or_build(build, source, 100)
+    img2, path2, hit2 = cache.get_or_build(build, source, 100)
+
+    assert build.calls == 1
+    assert (hit1, hit2) == (False, True)
+    assert path1 == path2 and path1.suffix == ".jpg"
+    assert path1.parent == tmp_path / "thumbs"
+    assert img2.size == img1.size == (100, 100)
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_params_and_source_change_invalidate(
+    thumbnail_module, tmp_path: Path, source: Path
+):
+    cache = thumbnail_module.ThumbnailCache(tmp_path)
+    build = CountingBuild()
+
+    cache.get_or_build(build, source, 100)
+    cache.get_or_build(build, source, 120)
+    assert build.calls == 2
+
+    Image.new("RGB", (800, 600), (0, 0, 255)).save(source, quality=90)
+    st = source.stat()
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    img, _, hit = cache.get_or_build(build, source, 100)
+    assert not hit and build.calls == 3
+    assert img.getpixel((50, 50))[2] > 200
+
+
+def test_alpha_saved_as_png(thumbnail_module, tmp_path: Path, source: Path):
+    cache = thumbnail_module.ThumbnailCache(tmp_path)
+    build = CountingBuild("RGBA")
+
+    _, path, _ = cache.get_or_build(build, source, 80)
+    img, _, hit = cache.get_or_build(build, source, 80)
+
+    assert path.suffix == ".png"
+    assert hit and img.mode == "RGBA"
+
+
+def test_missing_source_and_corrupt_thumbnail(
+    thumbnail_module, tmp_path: Path, source: Path
+):
+    cache = thumbnail_module.ThumbnailCache(tmp_path)
+    build = CountingBuild()
+
+    assert cache.get_or_build(build, None, 100) == (None, None, False)
+    assert cache.get_or_build(build, tmp_path / "gone.jpg", 100)[1] is None
+
+    _, path, _ = cache.get_or_build(build, source, 100)
+    path.write_bytes(b"not an image")
+    img, path2, hit = cache.get_or_build(build, source, 100)
+    assert not hit and img is not None
+    assert path2 == path and path.stat().st_size > 100
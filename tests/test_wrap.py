@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from core.wrap import ELLIPSIS, NO_LINE_START, wrap_text
+
+
+def char_width(char: str) -> int:
+    return 5 if char.isascii() else 10
+
+
+def width(line: str) -> int:
+    return sum(map(char_width, line))
+
+
+def legacy_wrap(text: str, max_width: int) -> list[str]:
+    """旧版逐字符换行（CJK 文本上新旧实现应一致），每行最多悬挂一个禁则字符"""
+    lines: list[str] = []
+    for paragraph in text.splitlines():
+        if not paragraph:
+            lines.append("")
+            continue
+        current, current_width = "", 0
+        for char in paragraph:
+            w = char_width(char)
+            # 行首字符、放得下的字符、悬挂在行尾的第一个禁则字符都留在当前行
+            hang = char in NO_LINE_START and current_width <= max_width
+            if not current or hang or current_width + w <= max_width:
+                current += char
+                current_width += w
+            else:
+                lines.append(current)
+                current, current_width = char, w
+        lines.append(current)
+    return lines
+
+
+def test_empty():
+    assert wrap_text("", 100, char_width) == []
+    assert wrap_text(None, 100, char_width) == []
+
+
+def test_cjk_matches_legacy():
+    rng = random.Random(0)
+    alphabet = "这是一段用于测试换行的中文文本，。！？、）"
+    for _ in range(50):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 300)))
+        text = text.replace("？", "\n", 3)
+        assert wrap_text(text, 95, char_width) == legacy_wrap(text, 95)
+
+
+def test_latin_words_are_kept_together():
+    lines = wrap_text("hello world foo", 40, char_width)
+    assert lines == ["hello ", "world ", "foo"]
+
+
+def test_long_word_is_hard_broken():
+    lines = wrap_text("a" * 25, 50, char_width)
+    assert lines == ["a" * 10, "a" * 10, "a" * 5]
+
+
+def test_mixed_breaks_between_cjk_and_word():
+    lines = wrap_text("中文abc中文", 30, char_width)
+    assert lines == ["中文", "abc中", "文"]
+
+
+def test_punctuation_never_starts_a_line():
+    text = "一二三四，五六七八。" * 20
+    for line in wrap_text(text, 40, char_width)[1:]:
+        assert line[0] not in NO_LINE_START
+
+
+def test_paragraphs_and_lossless():
+    text = "first paragraph here\n\n第二段文字，比较长一点的内容"
+    lines = wrap_text(text, 60, char_width)
+    assert "" in lines
+    assert "".join(lines) == text.replace("\n", "")
+    # 除悬挂字符外，每行都不超宽
+    for line in lines:
+        assert width(line.rstrip("".join(NO_LINE_START))) <= 60
+
+
+@pytest.mark.parametrize("run", ["！" * 30, " " * 60, "……" * 15])
+def test_long_no_line_start_run_still_wraps(run: str):
+    text = "开头" + run
+    lines = wrap_text(text, 100, char_width)
+    assert "".join(lines) == text
+    assert len(lines) > 1
+    # 每行最多悬挂一个字符
+    for line in lines:
+        assert width(line[:-1]) <= 100
+
+
+@pytest.mark.parametrize("max_lines", [1, 2, 5])
+def test_max_lines_truncates_with_ellipsis(max_lines: int):
+    text = "测试" * 500 + "\n" + "more text " * 100
+    lines = wrap_text(text, 100, char_width, max_lines=max_lines)
+    assert len(lines) == max_lines
+    assert lines[-1].endswith(ELLIPSIS)
+    assert width(lines[-1]) <= 100
+
+
+def test_max_lines_not_reached():
+    assert wrap_text("短文本", 100, char_width, max_lines=3) == ["短文本"]
+    assert wrap_text("a\nb\nc", 100, char_width, max_lines=3) == ["a", "b", "c"]
+
+
+def test_max_lines_stops_measuring():
+    calls = 0
+
+    def counting_width(char: str) -> int:
+        nonlocal calls
+        calls += 1
+        return char_width(char)
+
+    wrap_text("字" * 100_000, 100, counting_width, max_lines=3)
+    assert calls < 2_000
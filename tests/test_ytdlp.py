@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import ClassVar
+
+import pytest
+
+INFO = {
+    "title": "标题",
+    "channel": "频道",
+    "uploader": "up",
+    "duration": 60,
+    "timestamp": 1700000000,
+    "thumbnail": "https://img.example/t.jpg",
+    "description": "简介",
+    "channel_id": "c1",
+    "webpage_url": "https://video.example/v/1",
+}
+
+
+class FakeYoutubeDL:
+    """记录解析 / 下载调用的 YoutubeDL 替身"""
+
+    extracted: ClassVar[list[str]] = []
+    downloaded: ClassVar[list[tuple[str, object]]] = []
+    gate: ClassVar[threading.Event | None] = None
+
+    def __init__(self, opts: dict):
+        self.params = opts
+
+    @staticmethod
+    def sanitize_info(info: dict, remove_private_keys: bool = False) -> dict:
+        return json.loads(json.dumps(info))
+
+    def extract_info(self, url: str, download: bool = True) -> dict:
+        if FakeYoutubeDL.gate is not None:
+            FakeYoutubeDL.gate.wait(5)
+        FakeYoutubeDL.extracted.append(url)
+        return dict(INFO)
+
+    def _write(self) -> int:
+        for hook in self.params.get("progress_hooks", []):
+            hook({"status": "finished", "downloaded_bytes": 5, "total_bytes": 5})
+        Path(self.params["outtmpl"]).write_bytes(b"video")
+        return 0
+
+    def download_with_info_file(self, path: str) -> int:
+        info = json.loads(Path(path).read_text("utf-8"))
+        FakeYoutubeDL.downloaded.append(("info", info["title"]))
+        return self._write()
+
+    def download(self, urls: list[str]) -> int:
+        if FakeYoutubeDL.gate is not None:
+            FakeYoutubeDL.gate.wait(5)
+        FakeYoutubeDL.extracted.extend(urls)
+        FakeYoutubeDL.downloaded.append(("url", urls[0]))
+        return self._write()
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@pytest.fixture
+def modules(monkeypatch: pytest.MonkeyPatch, astrbot_stub):
+    for name in ("core.media_index", "core.http", "core.ytdlp", "core.download"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    ytdlp = importlib.import_module("core.ytdlp")
+    FakeYoutubeDL.extracted = []
+    FakeYoutubeDL.downloaded = []
+    FakeYoutubeDL.gate = None
+    return ytdlp, importlib.import_module("core.download")
+
+
+@pytest.fixture
+def fake_ytdlp(monkeypatch: pytest.MonkeyPatch):
+    """线程模式下用 FakeYoutubeDL 代替 yt-dlp"""
+    from core import ytdlp_worker
+
+    monkeypatch.setattr(
+        ytdlp_worker, "yt_dlp", SimpleNamespace(YoutubeDL=FakeYoutubeDL)
+    )
+    monkeypatch.setattr(ytdlp_worker, "pool", ytdlp_worker.YoutubeDLPool())
+    return ytdlp_worker
+
+
+def test_info_cache_persists_and_expires(modules, tmp_path):
+    ytdlp, _ = modules
+    key = ytdlp.YtdlpInfoCache.key("https://v/1", "fp")
+
+    async def main():
+        cache = ytdlp.YtdlpInfoCache(tmp_path, ttl=60)
+        path = await cache.put(key, INFO)
+        assert path is not None and path.exists()
+
+        # 新实例（模拟重启）从磁盘读取
+        restarted = ytdlp.YtdlpInfoCache(tmp_path, ttl=60)
+        cached = await restarted.get(key)
+        assert cached is not None and cached[0]["title"] == "标题"
+
+        old = time.time() - 120
+        os.utime(path, (old, old))
+        assert await ytdlp.YtdlpInfoCache(tmp_path, ttl=60).get(key) is None
+
+    asyncio.run(main())
+
+
+def test_info_cache_prunes_oldest_entries(modules, tmp_path):
+    ytdlp, _ = modules
+
+    async def main():
+        cache = ytdlp.YtdlpInfoCache(tmp_path, ttl=60, max_entries=3)
+        for i in range(6):
+            path = await cache.put(f"k{i}", INFO)
+            assert path is not None
+            os.utime(path, (time.time() - 10 + i, time.time() - 10 + i))
+        await asyncio.to_thread(cache._prune)
+        assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["k3", "k4", "k5"]
+
+    asyncio.run(main())
+
+
+def test_pool_reuses_instances_per_option_set(fake_ytdlp, monkeypatch):
+    pool = fake_ytdlp.YoutubeDLPool(max_idle=1, max_age=60)
+    opts = {"quiet": True, "http_headers": {"a": "1"}}
+
+    created_at, first = pool.take(opts, "a")
+    pool.give("a", created_at, first)
+    created_at, again = pool.take(dict(opts), "a")
+    assert again is first
+    # 借出期间同一选项集的另一个任务拿到新实例
+    other_at, other = pool.take(opts, "a")
+    assert other is not first
+    pool.give("a", created_at, again)
+    pool.give("a", other_at, other)  # 超出 max_idle，关闭
+    _, different = pool.take({**opts, "proxy": "http://p"}, "b")
+    assert different is not first
+    assert pool.stats() == {"option_sets": 1, "idle": 1, "created": 3, "reused": 1}
+
+    # 超过 max_age 的实例不再复用
+    now = time.monotonic()
+    monkeypatch.setattr(fake_ytdlp.time, "monotonic", lambda: now + 120)
+    _, fresh = pool.take(opts, "a")
+    assert fresh is not first
+
+
+def test_extract_sanitizes_before_returning_instance(fake_ytdlp, monkeypatch):
+    idle_during_sanitize: list[int] = []
+
+    def sanitize_info(info: dict, remove_private_keys: bool = False) -> dict:
+        idle_during_sanitize.append(fake_ytdlp.pool.stats()["idle"])
+        return dict(info)
+
+    monkeypatch.setattr(FakeYoutubeDL, "sanitize_info", staticmethod(sanitize_info))
+    info = fake_ytdlp.extract({}, "https://video.example/v/1", "fp")
+
+    # 实例在用完之后才归还，其它线程不会同时用到它
+    assert info["title"] == "标题"
+    assert idle_during_sanitize == [0]
+    assert fake_ytdlp.pool.stats()["idle"] == 1
+
+
+def make_downloader(download, tmp_path: Path, ttl: float, **overrides):
+    from core.http import HttpClientFactory
+
+    cfg = SimpleNamespace(
+        cache_dir=tmp_path / "cache",
+        source_max_size=10,
+        max_duration=600,
+        download_timeout=30,
+        download_retry_times=0,
+        download_concurrency=4,
+        download_host_concurrency=4,
+        download_host_limits={},
+        download_segments=1,
+        download_host_segments={},
+        common_timeout=10,
+        http_pool_limit=10,
+        http_pool_limit_per_host=10,
+        http_dns_ttl=300,
+        http_keepalive_timeout=30,
+        ytdlp_info_dir=tmp_path / "ytdlp_info",
+        ytdlp_info_ttl=ttl,
+        ytdlp_info_cache_size=16,
+        ytdlp_process=False,
+        ytdlp_workers=2,
+        ytdlp_queue_size=4,
+        ytdlp_extract_timeout=10,
+        ytdlp_download_timeout=10,
+    )
+    cfg.__dict__.update(overrides)
+    cfg.cache_dir.mkdir()
+    return download.Downloader(
+        cfg,  # type: ignore[arg-type]
+        SimpleNamespace(record=lambda *a, **k: None, touch=lambda *a, **k: None),
+        HttpClientFactory(cfg),  # type: ignore[arg-type]
+    )
+
+
+@pytest.mark.parametrize("ttl", [3600, 0])
+def test_parse_then_download_extracts_once(modules, fake_ytdlp, tmp_path, ttl):
+    _, download = modules
+    url = "https://video.example/v/1"
+
+    async def main():
+        downloader = make_downloader(download, tmp_path, ttl)
+        info = await downloader.ytdlp_extract_info(url, node=True)
+        path = await downloader.ytdlp_download_video(url, node=True, format="best")
+        await downloader.close()
+        await downloader.http.close()
+        return info, path
+
+    info, path = asyncio.run(main())
+
+    assert info.title == "标题"
+    assert path.read_bytes() == b"video"
+    if ttl:
+        assert FakeYoutubeDL.extracted == [url]
+        assert FakeYoutubeDL.downloaded == [("info", "标题")]
+    else:
+        # 不缓存时退回旧行为：下载时再解析一次
+        assert FakeYoutubeDL.extracted == [url, url, url]
+        assert FakeYoutubeDL.downloaded == [("url", url)]
+
+
+def test_executor_queues_by_priority_and_rejects_overflow(
+    modules, fake_ytdlp, tmp_path
+):
+    ytdlp, _ = modules
+    FakeYoutubeDL.gate = threading.Event()
+
+    async def main():
+        executor = ytdlp.YtdlpExecutor(workers=1, queue_size=2, use_process=False)
+        opts = {"outtmpl": str(tmp_path / "v.mp4")}
+        running = asyncio.create_task(
+            executor.extract({}, "https://v/0", "fp", timeout=5)
+        )
+        await asyncio.sleep(0.05)
+        queued_download = asyncio.create_task(
+            executor.download(opts, "https://v/1", None, timeout=5)
+        )
+        queued_extract = asyncio.create_task(
+            executor.extract({}, "https://v/2", "fp", timeout=5)
+        )
+        await asyncio.sleep(0.05)
+        assert executor.stats()["queued"] == 2
+        with pytest.raises(ytdlp.YtdlpException, match="任务过多"):
+            await executor.extract({}, "https://v/3", "fp", timeout=5)
+
+        FakeYoutubeDL.gate.set()
+        await asyncio.gather(running, queued_download, queued_extract)
+        stats = executor.stats()
+        await executor.close()
+        return stats
+
+    stats = asyncio.run(main())
+    # 排队中的解析先于更早排队的下载执行
+    assert FakeYoutubeDL.extracted == ["https://v/0", "https://v/2", "https://v/1"]
+    assert stats["rejected"] == 1 and stats["active"] == 0
+
+
+def test_thread_executor_wraps_ytdlp_errors(modules, fake_ytdlp, monkeypatch):
+    ytdlp, _ = modules
+    from yt_dlp.utils import DownloadError
+
+    def extract_info(self, url: str, download: bool = True) -> dict:
+        raise DownloadError("ERROR: 视频不存在")
+
+    monkeypatch.setattr(FakeYoutubeDL, "extract_info", extract_info)
+
+    async def main():
+        executor = ytdlp.YtdlpExecutor(workers=1, queue_size=1, use_process=False)
+        try:
+            with pytest.raises(ytdlp.YtdlpException, match="视频不存在"):
+                await executor.extract({}, "https://v/0", "fp", timeout=5)
+        finally:
+            await executor.close()
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def media_server():
+    """提供一个直链视频的本地服务，/slow.mp4 迟迟不响应"""
+    from aiohttp import web
+
+    payload = os.urandom(200_000)
+    hits: list[str] = []
+
+    async def clip(request: web.Request) -> web.Response:
+        hits.append(request.path)
+        if request.path == "/slow.mp4":
+            await asyncio.sleep(3)
+        return web.Response(body=payload, content_type="video/mp4")
+
+    app = web.Application()
+    app.router.add_get("/clip.mp4", clip)
+    app.router.add_get("/slow.mp4", clip)
+    return app, payload, hits
+
+
+def test_process_executor_runs_jobs_in_worker(modules, media_server, tmp_path):
+    ytdlp, _ = modules
+    from core.exception import SizeLimitException
+
+    app, payload, hits = media_server
+
+    async def main():
+        from aiohttp import web
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        base = f"http://127.0.0.1:{port}"
+        executor = ytdlp.YtdlpExecutor(workers=1, queue_size=4)
+        try:
+            info = await executor.extract(
+                {"quiet": True}, f"{base}/clip.mp4", "fp", timeout=30
+            )
+            info_path = tmp_path / "info.json"
+            info_path.write_text(json.dumps(info), "utf-8")
+            progress: list[dict] = []
+            out = tmp_path / "clip.mp4"
+            await executor.download(
+                {"quiet": True, "outtmpl": str(out)},
+                f"{base}/clip.mp4",
+                info_path,
+                timeout=30,
+                on_progress=progress.append,
+            )
+            assert out.read_bytes() == payload
+            assert progress[-1]["status"] == "finished"
+            assert executor.stats()["started"] == 1
+
+            # 超时：结束卡住的工作进程，下一个任务由新进程执行
+            with pytest.raises(ytdlp.YtdlpException, match="超时"):
+                await executor.extract(
+                    {"quiet": True}, f"{base}/slow.mp4", "fp", timeout=1
+                )
+
+            # 进度回调抛出异常：中止下载并原样抛出
+            def too_large(progress: dict) -> None:
+                raise SizeLimitException
+
+            with pytest.raises(SizeLimitException):
+                await executor.download(
+                    {"quiet": True, "outtmpl": str(tmp_path / "big.mp4")},
+                    f"{base}/clip.mp4",
+                    info_path,
+                    timeout=30,
+                    on_progress=too_large,
+                )
+            return info, executor.stats()
+        finally:
+            await executor.close()
+            await runner.cleanup()
+
+    info, stats = asyncio.run(main())
+    assert info["extractor"] == "generic"
+    assert stats["timeouts"] == 1 and stats["killed"] == 2 and stats["started"] == 2
+    # 解析一次、据缓存的 info 下载一次，不再二次解析
+    assert hits[:2] == ["/clip.mp4", "/clip.mp4"]